@@ -0,0 +1,77 @@
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess as sp
+
+from termcolor import colored
+
+# Only loaded on first use (probe, summary table, progress bar, ...)
+HEAVY_MODULES = (
+    'tqdm',
+    'tabulate',
+    'asyncio',
+    'pyarrow',
+    'PIL',
+    'core.anime_or_not',
+    'core.orchestrator',
+    'core.thumbnails',
+)
+
+ENTRY_MODULES = ('core.manager', 'core.catalog', 'core.server')
+
+parser = argparse.ArgumentParser(description='Check the cold start time of the CLI against a budget')
+parser.add_argument('-n', '--runs', type=int, default=7)
+parser.add_argument('-b', '--budget-ms', type=float, default=150.,
+                    help='Median import time of the entry modules, above the bare interpreter')
+parser.add_argument('--top', type=int, default=10, help='Slowest imports to report')
+args = parser.parse_args()
+
+here = os.path.dirname(os.path.abspath(__file__))
+imports = '; '.join(f'import {m}' for m in ENTRY_MODULES)
+
+
+def _wall_ms(code: str) -> float:
+    start = time.perf_counter()
+    sp.run([sys.executable, '-c', code], cwd=here, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+# ----------------------------------
+baseline = statistics.median(_wall_ms('pass') for _ in range(args.runs))
+startup = statistics.median(_wall_ms(imports) for _ in range(args.runs)) - baseline
+
+ret = sp.run([sys.executable, '-X', 'importtime', '-c', imports],
+             cwd=here, check=True, stderr=sp.PIPE, text=True)
+rows = []
+for line in ret.stderr.splitlines():
+    if not line.startswith('import time:'):  continue
+    self_us, cumulative_us, name = line[len('import time:'):].split('|')
+    if not self_us.strip().isdigit():  continue  # header
+    rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+
+print('Slowest imports (cumulative / self, ms):')
+for cumulative_us, self_us, name in sorted(rows, reverse=True)[:args.top]:
+    print(f'{cumulative_us / 1000:8.1f} {self_us / 1000:8.1f}  {name}')
+
+ret = sp.run([sys.executable, '-c', f'import sys; {imports}; print(" ".join(sys.modules))'],
+             cwd=here, check=True, stdout=sp.PIPE, text=True)
+loaded = set(ret.stdout.split())
+eager = [m for m in HEAVY_MODULES if m in loaded]
+
+print('---------------')
+print(f'Import time of {", ".join(ENTRY_MODULES)}: {startup:.1f} ms (budget {args.budget_ms:.0f} ms)')
+
+failed = False
+if startup > args.budget_ms:
+    print(colored('Over the startup budget', 'red'))
+    failed = True
+if eager:
+    print(colored(f'Heavy modules loaded at startup: {", ".join(eager)}', 'red'))
+    failed = True
+
+if not failed:
+    print(colored('OK', 'green'))
+sys.exit(1 if failed else 0)
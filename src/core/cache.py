@@ -0,0 +1,301 @@
+#!/usr/bin/python3
+
+import os
+import pickle
+import struct
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from . import records
+
+
+CACHE_DIR = os.path.join(os.environ['HOME'], '.cache', 'my-file-organizer')
+LEGACY_CACHE_PKL = os.path.join(CACHE_DIR, 'cache.pkl')
+
+# Storage of the cache, 'none' keeps it in memory only (nothing read or written)
+BACKENDS = ('records', 'pickle', 'none')
+
+# Shard file extension of each backend, shards of the other one are still read
+SHARD_EXTS = {'records': '.rec', 'pickle': '.pkl'}
+
+# Header of the records shards, followed by the root, the shard name and the records
+SHARD_MAGIC = b'MFOR'
+_SHARD_HEADER = struct.Struct('<4sII')
+
+# Shard of the files directly under the root
+ROOT_SHARD = '.'
+
+
+def shard_of(key: str) -> str:
+    """Return the shard of a root-relative key, i.e. its top-level directory"""
+    head, sep, _ = key.partition(os.sep)
+    return head if sep else ROOT_SHARD
+
+
+class RootCache():
+    """Cache partition of a single root folder
+
+    Entries are keyed by the path relative to the root, so that the partition
+    stays valid wherever the process is started from. Each root is stored in
+    its own folder, split into one shard file per top-level directory, so
+    that only the shards of the scanned directories are read (in parallel),
+    and only the changed ones are written back. Shards are stored as binary
+    records (see core.records) by the default backend, or pickled.
+
+    Between two saves, changes could be appended to a journal, which is
+    folded into the shards the next time the root is opened or saved.
+    """
+
+    backend = 'records'
+
+    _instances: dict[str, 'RootCache'] = {}
+    _legacy_cache: dict[str, dict] | None = None
+    _lock = threading.Lock()
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+        _hash = hashlib.sha1(self.root.encode()).hexdigest()[:16]
+        self.folder = os.path.join(CACHE_DIR, 'roots', _hash)
+        self.journal_path = os.path.join(self.folder, 'journal')
+        # Single-file partition used previously
+        self._legacy_path = self.folder + '.pkl'
+
+        self.entries: dict[str, dict] = {}
+        self._loaded: set[str] = set()
+        self._dirty: set[str] = set()
+        self._save_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+        if self.backend != 'none':
+            self._migrate()
+            self._compact_journal()
+
+    @classmethod
+    def of(cls, root: str) -> 'RootCache':
+        """Return the shared cache partition of the given root"""
+        root = os.path.abspath(root)
+        cache = cls._instances.get(root)
+        if cache is None:
+            # Open outside of the lock so that different roots open concurrently
+            cache = cls(root)
+            with cls._lock:
+                cache = cls._instances.setdefault(root, cache)
+        return cache
+
+    @classmethod
+    def set_backend(cls, backend: str):
+        """Select the storage of every partition, before the first one is loaded"""
+        if backend not in BACKENDS:
+            raise ValueError(f'Unknown cache backend {backend}, expected one of {", ".join(BACKENDS)}')
+        cls.backend = backend
+
+    def __len__(self):
+        return len(self.entries)
+
+    # ----------------------------------
+    def _shard_stem(self, shard: str) -> str:
+        """Path of the shard file, without the backend extension"""
+        return os.path.join(self.folder, hashlib.sha1(shard.encode()).hexdigest()[:16])
+
+    def _stored_stems(self) -> list[str]:
+        if not os.path.isdir(self.folder):
+            return []
+
+        exts = tuple(SHARD_EXTS.values())
+        return list({os.path.join(self.folder, os.path.splitext(name)[0])
+                     for name in os.listdir(self.folder) if name.endswith(exts)})
+
+    def _read_shard(self, stem: str) -> tuple[str, str, dict[str, dict]] | None:
+        """Return (root, shard, entries), from the file of the current backend if any"""
+        exts = sorted(SHARD_EXTS.items(), key=lambda item: item[0] != self.backend)
+        for backend, ext in exts:
+            path = stem + ext
+            if not os.path.isfile(path):  continue
+
+            with open(path, 'rb') as f:
+                if backend == 'pickle':
+                    return pickle.load(f)
+                data = f.read()
+
+            magic, root_len, shard_len = _SHARD_HEADER.unpack_from(data)
+            if magic != SHARD_MAGIC:
+                raise ValueError(f'{path} is not a cache shard')
+            offset = _SHARD_HEADER.size
+            root = data[offset:offset + root_len].decode()
+            shard = data[offset + root_len:offset + root_len + shard_len].decode()
+            entries = {entry['path']: entry for entry in
+                       records.iter_decode(data[offset + root_len + shard_len:])}
+            return root, shard, entries
+        return None
+
+    def _write_shard(self, stem: str, shard: str, entries: dict[str, dict]):
+        path = stem + SHARD_EXTS[self.backend]
+        tmp_path = path + f'.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            if self.backend == 'pickle':
+                pickle.dump((self.root, shard, entries), f)
+            else:
+                root, name = self.root.encode(), shard.encode()
+                f.write(_SHARD_HEADER.pack(SHARD_MAGIC, len(root), len(name)) + root + name)
+                f.write(records.encode_batch(entries.values()))
+        os.replace(tmp_path, path)
+
+    def shards(self) -> list[str]:
+        """Names of the shards stored on disk"""
+        return [ret[1] for stem in self._stored_stems()
+                if (ret := self._read_shard(stem)) is not None]
+
+    def load(self, shards: Iterable[str] | None = None, workers: int = 8):
+        """Load the given shards (all the stored ones by default) in parallel, if not loaded yet"""
+        if self.backend == 'none':
+            return
+
+        with self._load_lock:
+            if shards is None:
+                stems = self._stored_stems()
+            else:
+                stems = [self._shard_stem(shard) for shard in set(shards)]
+            missing = [stem for stem in stems if stem not in self._loaded]
+
+            def _read(stem):
+                ret = self._read_shard(stem)
+                return stem, {} if ret is None else ret[2]
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for stem, entries in executor.map(_read, missing):
+                    self.entries.update(entries)
+                    self._loaded.add(stem)
+
+    def load_for(self, keys: Iterable[str]):
+        """Load the shards of the given keys, so that they are complete before being written"""
+        self.load({shard_of(key) for key in keys})
+
+    # ----------------------------------
+    def update(self, updated: dict[str, dict], removed: Iterable[str] = ()) -> int:
+        """Apply the changes in memory, return how many of the removed keys existed"""
+        removed = list(removed)
+        self.load_for([*updated, *removed])
+
+        count = 0
+        for key in removed:
+            count += self.entries.pop(key, None) is not None
+        self.entries.update(updated)
+
+        self._dirty.update(shard_of(key) for key in (*updated, *removed))
+        return count
+
+    def append(self, updated: dict[str, dict], removed: list[str] = []):
+        """Apply the changes and append them to the journal, without rewriting the shards"""
+        self.update(updated, removed)
+
+        if (not updated and not removed) or self.backend == 'none':
+            return
+
+        os.makedirs(self.folder, exist_ok=True)
+        with self._save_lock:
+            with open(self.journal_path, 'ab') as f:
+                pickle.dump((updated, list(removed)), f)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def save(self):
+        """Write the changed shards, each one atomically"""
+        if self.backend == 'none':
+            return
+
+        os.makedirs(self.folder, exist_ok=True)
+
+        with self._save_lock:
+            shards: dict[str, dict] = {shard: {} for shard in self._dirty}
+            for key, val in self.entries.items():
+                shard = shard_of(key)
+                if shard in shards:
+                    shards[shard][key] = val
+
+            for shard, entries in shards.items():
+                stem = self._shard_stem(shard)
+                if entries:
+                    self._write_shard(stem, shard, entries)
+
+                # The file of the other backend (or of an emptied shard) is outdated now
+                for backend, ext in SHARD_EXTS.items():
+                    if (backend != self.backend or not entries) and os.path.isfile(stem + ext):
+                        os.remove(stem + ext)
+
+            self._dirty.clear()
+
+            # Every change in the journal went through update(), so its shard was just written
+            if os.path.isfile(self.journal_path):
+                os.remove(self.journal_path)
+
+    # ----------------------------------
+    def _read_journal(self, path: str) -> list[tuple[dict, list]]:
+        records = []
+        if not os.path.isfile(path):
+            return records
+
+        with open(path, 'rb') as f:
+            while True:
+                try:
+                    records.append(pickle.load(f))
+                except EOFError:
+                    break
+                except (pickle.UnpicklingError, ValueError, TypeError):
+                    # A record cut short by a crash, the ones before it are kept
+                    break
+        return records
+
+    def _compact_journal(self):
+        """Fold the journal left by a previous run into its shards"""
+        records = self._read_journal(self.journal_path)
+        if not records:
+            return
+
+        for updated, removed in records:
+            self.update(updated, removed)
+        self.save()
+
+    def _migrate(self):
+        """Split the single-file partition, or the global cache, used previously into shards"""
+        if os.path.isdir(self.folder):
+            return
+
+        if os.path.isfile(self._legacy_path):
+            with open(self._legacy_path, 'rb') as f:
+                root, entries = pickle.load(f)
+            for updated, removed in self._read_journal(self.folder + '.journal'):
+                for key in removed:
+                    entries.pop(key, None)
+                entries.update(updated)
+        else:
+            entries = self._load_legacy()
+
+        if not entries:
+            return
+
+        self.entries.update(entries)
+        self._loaded.update(self._shard_stem(shard_of(key)) for key in entries)
+        self._dirty.update(shard_of(key) for key in entries)
+        self.save()
+
+        for path in (self._legacy_path, self.folder + '.journal'):
+            if os.path.isfile(path):  os.remove(path)
+
+    def _load_legacy(self):
+        """Migrate the entries from the single-file cache used previously"""
+        with RootCache._lock:
+            if RootCache._legacy_cache is None:
+                RootCache._legacy_cache = {}
+                if os.path.isfile(LEGACY_CACHE_PKL):
+                    with open(LEGACY_CACHE_PKL, 'rb') as f:
+                        RootCache._legacy_cache = pickle.load(f)
+
+        entries = {}
+        for key, val in RootCache._legacy_cache.get(self.root, {}).items():
+            # Non-recursive loads used to store the keys as ./<name>
+            key = os.path.normpath(key)
+            entries[key] = {**val, 'path': key}
+        return entries
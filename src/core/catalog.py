@@ -0,0 +1,245 @@
+#!/usr/bin/python3
+
+import os
+import contextlib
+import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+
+from termcolor import colored
+
+from .enums import Category
+from .manager import Manager, ManagerBase
+from .query import Query
+from .duplicates import find_duplicates
+
+
+class Catalog():
+    """Span several root folders at once
+
+    Each root is handled by its own Manager, with its own cache partition, and
+    the roots are loaded concurrently. Files keep absolute paths, so filters
+    and summaries could be run across all roots.
+    """
+
+    def __init__(self,
+                 folders: list[str],
+                 *,
+                 recursive: bool = False,
+                 auto_probe: bool | dict[Category, bool] = False,
+                 use_cache: bool | dict[Category, bool] = True,
+                 workers: int | None = None,
+                 manager_cls: type = Manager,
+                 managers: dict[str, ManagerBase] | None = None):
+
+        self.recursive = recursive
+        self.auto_probe = auto_probe
+        self.use_cache = use_cache
+        self.manager_cls = manager_cls
+
+        if managers is not None:
+            self.managers = managers
+            return
+
+        folders = list(dict.fromkeys(os.path.abspath(f) for f in folders))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            self.managers: dict[str, ManagerBase] = dict(zip(
+                folders, executor.map(self._new_manager, folders)))
+
+    def _new_manager(self, folder: str, recursive: bool | None = None):
+        return self.manager_cls(
+            folder,
+            recursive=self.recursive if recursive is None else recursive,
+            auto_probe=self.auto_probe,
+            use_cache=self.use_cache,
+            chdir=False)
+
+    def _derive(self, managers: dict[str, ManagerBase]):
+        return self.__class__(
+            [],
+            recursive=self.recursive,
+            auto_probe=self.auto_probe,
+            use_cache=self.use_cache,
+            manager_cls=self.manager_cls,
+            managers=managers)
+
+    def __getitem__(self, cat: Category):
+        """Alias to by_cat"""
+        return self.by_cat(cat)
+
+    def __len__(self):
+        return sum(len(m) for m in self.managers.values())
+
+    @property
+    def len(self):
+        return self.__len__()
+
+    @property
+    def roots(self):
+        return list(self.managers.keys())
+
+    def manager_of(self, path: str) -> ManagerBase | None:
+        """Return the manager of the deepest root containing the given path"""
+        path = os.path.abspath(path)
+        for root in sorted(self.managers, key=len, reverse=True):
+            if path == root or path.startswith(os.path.join(root, '')):
+                return self.managers[root]
+        return None
+
+    # ----------------------------------
+    def add_root(self, folder: str, recursive: bool | None = None):
+        folder = os.path.abspath(folder)
+        if folder not in self.managers:
+            self.managers[folder] = self._new_manager(folder, recursive=recursive)
+        return self.managers[folder]
+
+    def add_file(self, path: str):
+        """Add a file to the root containing it, see add_root for a file outside the roots"""
+        manager = self.manager_of(path)
+        if manager is None:
+            raise ValueError(f'Given path {path} is not under any root of the catalog')
+        manager.add_file(os.path.abspath(path))
+
+    def add_folder(self, path: str, recursive: bool = False):
+        """Add a folder to the root containing it, it becomes a new root otherwise"""
+        manager = self.manager_of(path)
+        if manager is None:
+            self.add_root(path, recursive=recursive)
+        else:
+            manager.add_folder(os.path.abspath(path), recursive=recursive)
+
+    # ----------------------------------
+    def by_cat(self, cat: Category):
+        """Return the files of given category across all roots
+
+        Each root keeps its own manager, so that organize() and quarantine_broken()
+        still move the files under their own root.
+        """
+        return self._derive({
+            root: m._derive({key: val if key is cat else val._new([]) for key, val in m.data.items()})
+            for root, m in self.managers.items()
+        })
+
+    def by_root(self, folder: str):
+        return self.managers[os.path.abspath(folder)]
+
+    def by_mdate(self, date: dt.date):
+        return self._derive({
+            root: m.by_mdate(date) for root, m in self.managers.items()
+        })
+
+    def by_folder(self, folder_prefix: str):
+        """Filter by absolute folder prefix, only the roots overlapping with it are kept"""
+        folder_prefix = os.path.abspath(folder_prefix)
+        return self._derive({
+            root: m.by_folder(folder_prefix) for root, m in self.managers.items()
+            if root.startswith(folder_prefix) or folder_prefix.startswith(root)
+        })
+
+    def query(self, query: Query | None = None, **kwargs):
+        """Filter every root with the same predicates, see Query"""
+        if query is None:
+            query = Query(**kwargs)
+        return self._derive({
+            root: m.query(query) for root, m in self.managers.items()
+        })
+
+    @property
+    def mdates(self):
+        ret = set()
+        for m in self.managers.values():
+            ret.update(m.mdates)
+        return list(sorted(ret))
+
+    @property
+    def folders(self):
+        _dict = {}
+        for m in self.managers.values():
+            _dict.update(m.folders)
+        return _dict
+
+    # ----------------------------------
+    def probe(self, force: bool = False, verbose: bool = False,
+              concurrent: bool = False, workers: int | None = None,
+              checkpoint_interval: float | None = 60.):
+        """Probe the files of every root, see Manager.probe
+
+        With concurrent=True, the files of all roots are scheduled in one
+        ProbeOrchestrator, so that the per-device limits hold across the roots
+        and the roots on different devices are probed side by side.
+        """
+        if not concurrent:
+            for m in self.managers.values():
+                m.probe(force=force, verbose=verbose, workers=workers,
+                        checkpoint_interval=checkpoint_interval)
+            return
+
+        from .orchestrator import probe_files
+
+        with contextlib.ExitStack() as stack:
+            # Each file is checkpointed to the cache of its own root
+            callbacks = {}
+            for m in self.managers.values():
+                on_probed = stack.enter_context(m._checkpointing(checkpoint_interval))
+                for fl in m.data.values():
+                    callbacks.update((id(f), on_probed) for f in fl.filelist)
+
+            try:
+                probe_files((f for m in self.managers.values() for fl in m.data.values() for f in fl.filelist),
+                            force=force, workers=workers, on_probed=lambda f: callbacks[id(f)](f))
+            finally:
+                for m in self.managers.values():
+                    for fl in m.data.values():
+                        fl._reindex()
+
+    def verify(self, force: bool = False, workers: int | None = None,
+               checkpoint_interval: float | None = 60.) -> int:
+        """Verify the media files of each root, return how many failed, see Manager.verify"""
+        return sum(m.verify(force=force, workers=workers, checkpoint_interval=checkpoint_interval)
+                   for m in self.managers.values())
+
+    @property
+    def probed(self):
+        return self._derive({root: m.probed for root, m in self.managers.items()})
+
+    @property
+    def unprobed(self):
+        return self._derive({root: m.unprobed for root, m in self.managers.items()})
+
+    def duplicates(self, verify: bool = True) -> list[list]:
+        """Return the groups of files with the same content, across all roots"""
+        return find_duplicates(
+            (f for m in self.managers.values() for fl in m.data.values() for f in fl.filelist),
+            verify=verify)
+
+    def save_cache(self):
+        """Save the cache partition of every root"""
+        for m in self.managers.values():
+            m.save_cache()
+
+    # ----------------------------------
+    def organize(self, verbose=False, dry_run=False) -> int:
+        """Organize each root into its own target folders, return the number of planned or moved files"""
+        return sum(m.organize(verbose=verbose, dry_run=dry_run) for m in self.managers.values())
+
+    def quarantine_broken(self, verbose=False, dry_run=False) -> int:
+        """Quarantine the broken files of each root into its own broken folders"""
+        return sum(m.quarantine_broken(verbose=verbose, dry_run=dry_run) for m in self.managers.values())
+
+    def du(self, depth: int | None = 1) -> dict[str, list[dict]]:
+        """Print the folder report of each root, see Manager.du"""
+        ret = {}
+        for root, m in self.managers.items():
+            print(f'========== {colored(root, "green")} ==========')
+            ret[root] = m.du(depth=depth)
+        return ret
+
+    def summary(self, cat: Category | None = None):
+        for root, m in self.managers.items():
+            print(f'========== {colored(root, "green")} ==========')
+            m.summary(cat)
+
+        stats = [m.stats for m in self.managers.values()]
+        broken = sum(s['broken'] for s in stats)
+        print('===============')
+        print(f"Total file counts across {len(self.managers)} roots: {sum(s['count'] for s in stats)}"
+              + (f", {broken} broken" if broken else ''))
@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+
+import hashlib
+from typing import Iterable
+
+from .utils import tqdm
+
+
+def content_hash(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Return the hash of the whole content, to confirm what fingerprints suggest"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def find_duplicates(files: Iterable, verify: bool = True) -> list[list]:
+    """Return the groups of files with the same content, largest waste first
+
+    Files are grouped by size, then by content fingerprint, and with
+    verify=True the groups are confirmed by hashing the whole content.
+    """
+    by_size: dict[int, list] = {}
+    for f in files:
+        by_size.setdefault(f.size, []).append(f)
+
+    groups = []
+    candidates = [files for size, files in by_size.items() if len(files) > 1 and size > 0]
+    for files in tqdm(candidates, desc='Finding duplicates'):
+        by_fp: dict[str, list] = {}
+        for f in files:
+            if (fp := f._get_fingerprint()) is not None:
+                by_fp.setdefault(fp, []).append(f)
+
+        for group in by_fp.values():
+            if len(group) < 2:  continue
+            if not verify:
+                groups.append(group)
+                continue
+
+            by_hash: dict[str, list] = {}
+            for f in group:
+                try:
+                    by_hash.setdefault(content_hash(f.path), []).append(f)
+                except OSError:
+                    continue
+            groups += [g for g in by_hash.values() if len(g) > 1]
+
+    return sorted(groups, key=lambda g: g[0].size * (len(g) - 1), reverse=True)
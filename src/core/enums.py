@@ -15,10 +15,11 @@ class Category(Enum):
     def infer(name):
 
         _, ext = os.path.splitext(name)
-        ext = ext.lower()
-        for cat in Category:
-            if ext in cat.value:  return cat
-        return Category.NA
+        return EXTENSIONS.get(ext.lower(), Category.NA)
+
+
+# Single lookup from extension to category, extended through core.registry.register
+EXTENSIONS: dict[str, Category] = {ext: cat for cat in Category for ext in cat.value}
 
 @total_ordering
 class OrderedEnum(Enum):
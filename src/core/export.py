@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+
+import os
+import csv
+import json
+import datetime as dt
+from enum import Enum
+from itertools import islice
+from typing import Iterable, Iterator
+
+from .files import File
+
+
+# Exported fields, in column order, with their (python) types
+FIELDS = {
+    'path': str,
+    'category': str,
+    'size': int,
+    'mtime': float,  # timestamp
+    'duration': float,
+    'width': int,
+    'height': int,
+    'orientation': str,
+    'length_type': str,
+    'image_type': str,
+    'broken': bool,
+    'probed': bool,
+}
+
+FORMATS = {
+    '.parquet': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+}
+
+CHUNK_SIZE = 10000
+
+
+def infer_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f'Cannot infer the export format of {path},'
+                         f' supported extensions are {", ".join(FORMATS)}')
+    return FORMATS[ext]
+
+
+def _import_pyarrow(fmt):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        import pyarrow.ipc  # noqa: F401, make pa.ipc available
+    except ImportError:
+        raise ImportError(f'pyarrow is needed for the {fmt} format, use csv or ndjson instead')
+    return pa, pq
+
+
+def _arrow_schema(pa):
+    types = {str: pa.string(), int: pa.int64(), float: pa.float64(), bool: pa.bool_()}
+    return pa.schema([(k, types[t]) for k, t in FIELDS.items()])
+
+
+# ----------------------------------
+def to_record(f: File) -> dict:
+    """Return the exported fields of a file, missing attributes are None"""
+    rec = {
+        'path': f.path,
+        'category': f.cat.name,
+        'size': f.size,
+        'mtime': f.mtime.timestamp(),
+        'probed': f.probed,
+    }
+    for k in ('duration', 'width', 'height', 'orientation', 'length_type', 'image_type', 'broken'):
+        v = getattr(f, k, None)
+        rec[k] = v.name if isinstance(v, Enum) else v
+    return rec
+
+
+def from_record(rec: dict) -> dict:
+    """Return the File.to_dict() equivalent of an exported record
+
+    Fields that are None are dropped, as they don't exist in every File type
+    """
+    ret = {
+        'path': rec['path'],
+        'name': os.path.basename(rec['path']),
+        'cat': rec['category'],
+        'probed': bool(rec['probed']),
+        'fstat': {
+            'st_size': int(rec['size']),
+            'st_mtime': dt.datetime.fromtimestamp(float(rec['mtime'])),
+        },
+    }
+    for k in ('duration', 'width', 'height', 'orientation', 'length_type', 'image_type', 'broken'):
+        if rec.get(k) is not None:
+            ret[k] = rec[k]
+    return ret
+
+
+def _chunks(files: Iterable[File], size: int = CHUNK_SIZE) -> Iterator[list[dict]]:
+    it = iter(files)
+    while chunk := [to_record(f) for f in islice(it, size)]:
+        yield chunk
+
+
+# ----------------------------------
+def export_files(files: Iterable[File], path: str, fmt: str | None = None) -> int:
+    """Stream the metadata of files to path, chunk by chunk. Return the file count"""
+    fmt = fmt or infer_format(path)
+    count = 0
+
+    if fmt in ('parquet', 'arrow'):
+        pa, pq = _import_pyarrow(fmt)
+        schema = _arrow_schema(pa)
+        writer = (pq.ParquetWriter(path, schema) if fmt == 'parquet'
+                  else pa.ipc.new_file(path, schema))
+        try:
+            for chunk in _chunks(files):
+                writer.write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+                count += len(chunk)
+        finally:
+            writer.close()
+
+    elif fmt == 'csv':
+        with open(path, 'w', newline='') as fp:
+            writer = csv.DictWriter(fp, fieldnames=list(FIELDS))
+            writer.writeheader()
+            for chunk in _chunks(files):
+                writer.writerows(chunk)
+                count += len(chunk)
+
+    elif fmt == 'ndjson':
+        with open(path, 'w') as fp:
+            for chunk in _chunks(files):
+                fp.writelines(json.dumps(rec) + '\n' for rec in chunk)
+                count += len(chunk)
+
+    else:
+        raise ValueError(f'Unknown export format {fmt}')
+
+    return count
+
+
+def _parse_csv_row(row: dict) -> dict:
+    rec = {}
+    for k, _type in FIELDS.items():
+        v = row.get(k, '')
+        if v == '':
+            rec[k] = None
+        elif _type is bool:
+            rec[k] = v == 'True'
+        else:
+            rec[k] = _type(v)
+    return rec
+
+
+def read_records(path: str, fmt: str | None = None) -> Iterator[dict]:
+    """Stream the exported records back, in File.to_dict() form"""
+    fmt = fmt or infer_format(path)
+
+    if fmt == 'parquet':
+        pa, pq = _import_pyarrow(fmt)
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=CHUNK_SIZE):
+            yield from map(from_record, batch.to_pylist())
+
+    elif fmt == 'arrow':
+        pa, pq = _import_pyarrow(fmt)
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            for idx in range(reader.num_record_batches):
+                yield from map(from_record, reader.get_batch(idx).to_pylist())
+
+    elif fmt == 'csv':
+        with open(path, newline='') as fp:
+            for row in csv.DictReader(fp):
+                yield from_record(_parse_csv_row(row))
+
+    elif fmt == 'ndjson':
+        with open(path) as fp:
+            for line in fp:
+                if line.strip():
+                    yield from_record(json.loads(line))
+
+    else:
+        raise ValueError(f'Unknown export format {fmt}')
@@ -1,24 +1,32 @@
-import os
-from tabulate import tabulate
+from operator import attrgetter
 
 
 from .filelist import FileList
 from ..enums import Category, MediaLengthType
 from ..utils import parse_sec_to_str
 from ..files import AudioFile
+from ..sorted_index import SortedIndex
 
 class AudioFileList(FileList):
 
     _category = Category.AUDIO
     _target_folder = "@audio"
+    _broken_folder = "@broken-audios"
     _open_file_cmd_lst = ['vlc', '--']
     _file_type: type = AudioFile
 
-    def __init__(self, filelist: list[AudioFile] = []):
-        self.length_type_map: dict[MediaLengthType, list[AudioFile]] = {
-            lt: [] for lt in MediaLengthType
-        }
-        super().__init__(filelist)
+    _summary_rows = (
+        'length_type', {
+            MediaLengthType.S: 'Short',
+            MediaLengthType.M: 'Medium',
+            MediaLengthType.L: 'Long',
+            MediaLengthType.XL: 'Ex-Long',
+            MediaLengthType.NA: 'Unknown Length',
+        })
+    _summary_duration = True
+
+    def __init__(self, filelist: list[AudioFile] = [], root: str = '.'):
+        super().__init__(filelist, root=root)
 
         self.filelist: list[AudioFile]
 
@@ -43,72 +51,58 @@ class AudioFileList(FileList):
              top: None | int = None,
              random: bool = False,
              *,
-             path_lst: None | list[str] = None
+             path_lst: None | list[str] = None,
+             **kwargs
              ):
         """Open first <top> / all files in default app"""
 
         if length_type is None:
-            super().open(top=top, random=random, path_lst=path_lst)
+            super().open(top=top, random=random, path_lst=path_lst, **kwargs)
         elif length_type is not None:
             self.by_length_type(length_type)\
-                .open(top=top, random=random, path_lst=path_lst)
+                .open(top=top, random=random, path_lst=path_lst, **kwargs)
         else:
             raise ValueError('Something wrong with the input')
 
-    def _add_file(self, f: AudioFile):
-
-        if f.probed and f.broken:
-            _folder = '@broken-audios'
-            self._prepare_dir(_folder)
-            dst = self.get_uniq_dst(os.path.join(_folder, f.name))
-            f.move(os.path.join(dst))
-
-        else:
-            super()._add_file(f)
-            self.length_type_map[f.length_type].append(f)
-
-    def by_length_type(self, length_type: MediaLengthType):
-        return self.__class__(self.length_type_map[length_type])
-
-    def summary(self):
-
-        print('Audio files summary:')
-        summary_table = [
-            ["", "Sum"],
-            ["Short", 0],
-            ["Medium", 0],
-            ["Long", 0],
-            ["Ex-Long", 0],
-            ["Unknown Length", 0],
-            ["Sum", 0]]
-
-        row_map = {
-            MediaLengthType.S: 1,
-            MediaLengthType.M: 2,
-            MediaLengthType.L: 3,
-            MediaLengthType.XL: 4,
-            MediaLengthType.NA: 5
+    def _reset_indexes(self):
+        super()._reset_indexes()
+        self.length_type_map: dict[MediaLengthType, list[AudioFile]] = {
+            lt: [] for lt in MediaLengthType
         }
+        self.duration_index = SortedIndex(attrgetter('duration'))
 
-        for f in self.filelist:
-           row = row_map[f.length_type]
+    def _index_file(self, f: AudioFile):
+        super()._index_file(f)
+        self.length_type_map[f.length_type].append(f)
+        self.duration_index.add(f)
 
-           summary_table[row][1] += 1
-           summary_table[-1][1] += 1
+    def _indexes(self):
+        return {**super()._indexes(), 'length_type': self.length_type_map}
 
-        print(tabulate(summary_table))
+    def _range_indexes(self):
+        return {**super()._range_indexes(), 'duration': self.duration_index}
 
-    def _get_details_to_show(self, show_path, color):
-        data_dict, total_dict = super()._get_details_to_show(show_path, color)
+    def by_length_type(self, length_type: MediaLengthType):
+        return self._new(self.length_type_map[length_type])
+
+    def by_duration(self, lower_bound: float | None = None, upper_bound: float | None = None):
+        """Return the probed files with lower_bound <= duration <= upper_bound (in seconds)"""
+        return self._new(self.duration_index.range(lower_bound, upper_bound))
 
-        data_dict['Duration'] = []
-        for f in self.filelist:
-            data_dict['Duration'].append(parse_sec_to_str(f.duration) if f.duration else "")
+    def longest(self, n: int = 10):
+        return self._new(self.duration_index.top(n))
 
-        total_dict['Duration'] = parse_sec_to_str(sum(
-            f.duration if f.duration else 0
-            for f in self.filelist
-        ))
+    def shortest(self, n: int = 10):
+        return self._new(self.duration_index.bottom(n))
 
-        return data_dict, total_dict
+    def _get_details_columns(self, show_path):
+        columns = super()._get_details_columns(show_path)
+        columns.append(
+            ('Duration', lambda f: parse_sec_to_str(f.duration) if f.duration else "", None, '<'))
+        return columns
 
+    def _get_details_totals(self):
+        return {
+            **super()._get_details_totals(),
+            'Duration': (lambda f: f.duration if f.duration else 0, parse_sec_to_str)
+        }
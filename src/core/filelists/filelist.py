@@ -1,18 +1,25 @@
 
 import os
+import sys
 import abc
-from random import shuffle
+import weakref
+from itertools import chain, islice
+from operator import attrgetter
+import heapq
+from random import Random, shuffle
 import datetime as dt
-from tqdm import tqdm
 from termcolor import colored
 import subprocess as sp
-from tabulate import SEPARATING_LINE, tabulate
+from typing import Callable, Iterable, Sequence
 
 from ..enums import Category, SortAttr
 from ..files import File
-from ..utils import MinType, get_readable_filesize 
+from ..query import Query
+from ..sorted_index import SortedIndex
+from ..sort_keys import key_column, key_func, sort_order
+from ..export import export_files
+from ..utils import ask, tqdm, get_readable_filesize, parse_sec_to_str
 
-# TODO - support general query search
 # TODO - add random play support for open
 # TODO - the popen needs re-work, it doesn't has any use in its current stage
 
@@ -20,26 +27,53 @@ class FileList(abc.ABC):
 
     _category: Category = Category.NA
     _open_file_cmd_lst: list[str] = []
+    _open_thumbnail_cmd_lst = ['feh', '-g', '1680x1050', '--scale-down', '--auto-zoom']
+    _thumbnails = False  # whether open() could show thumbnails, i.e. the files have frames
     _target_folder = '.'
+    _broken_folder = '@broken'  # where quarantine_broken() moves the broken files
     _file_type: type = File
 
-    _large_file_lower_bound = 5 * 1024 * 1024  # 5M
-    _small_file_upper_bound = 5 * 1024 ** 3  # 1G
+    _large_file_lower_bound = 1024 ** 3  # 1G
+    _small_file_upper_bound = 5 * 1024 * 1024  # 5M
 
     process_list: list[sp.Popen] = []
+
+    # Crosstab shown by summary(), as (attribute, {member: label}) for rows / columns
+    _summary_rows: tuple[str, dict] | None = None
+    _summary_cols: tuple[str, dict] | None = None
+    _summary_hide_empty_na = False  # hide the NA row / column if empty
+    _summary_duration = False  # whether to report the total duration
+
+    _details_sample_size = 200  # rows used to fix the column widths
+    _details_page_size = 100
+
+    _dry_run_listing_limit = 50  # moves listed one by one by a dry run, folders above it
+
+    # Lists with built folder aggregates, told about the moved files, see _on_file_moved
+    _aggregating: 'weakref.WeakSet[FileList]' = weakref.WeakSet()
     
-    def __init__(self, filelist: list[File] = []):
+    def __init__(self, filelist: list[File] = [], root: str = '.'):
 
+        self.root = root  # the folder that target folders are relative to
         self.filelist: list[File] = []
-        self._folder_keys = {}  # use a dictionary for easier autocomplete
-        self.mdate_map: dict[dt.date, list[File]] = {}
+        self._version = 0  # bumped whenever files or their indexed attributes change
+        self._reset_indexes()
 
         for f in filelist:
             self.add_file(f)
 
+    def _new(self, filelist: list[File]):
+        """Return a new list of the same type and root with given files"""
+        return self.__class__(filelist=filelist, root=self.root)
+
     def to_dict(self):
         return {f.path: f.to_dict() for f in self.filelist}
 
+    def export(self, path: str, fmt: str | None = None):
+        """Stream the metadata of all files to parquet / arrow / csv / ndjson"""
+        count = export_files(self.filelist, path, fmt=fmt)
+        print(f'Exported {count} {self.category} files to {colored(path, "green")}')
+
     @property
     def category(self):
         if self._category is None:
@@ -64,11 +98,13 @@ class FileList(abc.ABC):
     def add_file(self,
                  path_or_file: str | File,
                  auto_probe: bool = False,
+                 cat: Category | None = None,
                  **kwargs):
+        """Add a path or File, cat could be given when already inferred by the caller"""
 
         if isinstance(path_or_file, str):
             if os.path.isfile(path_or_file):
-                f = self._file_type(path_or_file, auto_probe=auto_probe)
+                f = self._file_type(path_or_file, auto_probe=auto_probe, cat=cat)
             else:
                 raise ValueError(f"Given path {path_or_file} doesn't exist")
 
@@ -80,22 +116,83 @@ class FileList(abc.ABC):
 
         self._add_file(f)
 
-    def probe(self, force: bool = False, verbose: bool = False):
+    def probe(self, force: bool = False, verbose: bool = False,
+              concurrent: bool = False, workers: int | None = None,
+              on_probed: Callable[[File], None] | None = None):
+        """Probe the metadata of the files, see ProbeOrchestrator for concurrent=True
+
+        on_probed is called after each file, e.g. to checkpoint the results
+        """
+        if concurrent:
+            from ..orchestrator import probe_files
+
+            try:
+                probe_files(self.filelist, force=force, workers=workers, on_probed=on_probed,
+                            desc=f'[{self.category}] Probing metadata')
+            finally:
+                self._reindex()
+            return
+
         _iter = (tqdm(self.filelist,
                       desc=f'[{self.category}] Probing metadata')
                  if not verbose else self.filelist
                  )
 
-        for f in _iter:
-            f.probe(force=force, verbose=verbose)
+        try:
+            for f in _iter:
+                try:
+                    f.probe(force=force, verbose=verbose)
+                except OSError as e:
+                    # Not the file's fault, e.g. no ffprobe installed, the rest would fail alike
+                    print(colored(f'Warning: could not run the prober ({type(e).__name__}: {e}),'
+                                  f' the files are left unprobed', 'yellow'))
+                    break
+                if on_probed is not None:  on_probed(f)
+        finally:
+            # Probing changes the indexed attributes, rebuilding is O(n) overall
+            self._reindex()
+
+    @property
+    def broken(self):
+        return self._new(self.broken_list)
+
+    @property
+    def healthy(self):
+        """The files not found broken, the unprobed ones included"""
+        if not self.broken_list:
+            return self
+        broken = set(map(id, self.broken_list))
+        return self._new([f for f in self.filelist if id(f) not in broken])
+
+    def verify(self, force: bool = False, workers: int | None = None,
+               device_limits: dict[str, int] | None = None,
+               on_verified: Callable[[File], None] | None = None) -> int:
+        """Fully decode the files to find the corrupted ones, return how many failed
+
+        Runs in a pool bounded per device, see VerifyOrchestrator. The files
+        unchanged since their last verification are skipped unless force=True.
+        """
+        from ..orchestrator import verify_files
+
+        try:
+            ret = verify_files(self.filelist, force=force, workers=workers, device_limits=device_limits,
+                               on_probed=on_verified, desc=f'[{self.category}] Verifying media')
+        finally:
+            self._reindex()
+
+        if ret.done:
+            print(f'[{self.category}] Verified {ret.verified_count} files'
+                  f' ({ret.skipped} unchanged, {ret.unverified} not verified),'
+                  f' {colored(ret.errors, "red" if ret.errors else "green")} with errors')
+        return ret.errors
 
     @property
     def unprobed(self):
-        return self.__class__(filelist=[f for f in self.filelist if not f.probed])
+        return self._new([f for f in self.filelist if not f.probed])
 
     @property
     def probed(self):
-        return self.__class__(filelist=[f for f in self.filelist if f.probed])
+        return self._new([f for f in self.filelist if f.probed])
 
     def add_file_from_cache(self, _dict):
         self._add_file(self._file_type.from_dict(_dict))
@@ -103,27 +200,150 @@ class FileList(abc.ABC):
     # ----------------------------------
     def _add_file(self, f: File):
         self.filelist.append(f)
+        self._version += 1
+        self._index_file(f)
 
-        # add the folder path to be used in 
-        _folder = os.path.dirname(f.path).split(os.sep)
-        
-        for idx in range(1, len(_folder)+1):
-            k = os.sep.join(_folder[:idx])
-            self._folder_keys[k] = k
+    def _reset_indexes(self):
+        """Create the empty indexes, subclasses add their own maps"""
+        self._version += 1
+        self._sort_cache = None
+        self.mdate_map: dict[dt.date, list[File]] = {}
+        self.size_index = SortedIndex(attrgetter('size'))
+        self.mtime_index = SortedIndex(attrgetter('mtime'))
+
+        # [count, size, duration] of each summary cell, and of the broken files kept out of the cells
+        self._summary_stats: dict[tuple, list] = {}
+        self._broken_stats = [0, 0, 0.]
+
+        # [count, size, duration, probed, broken] of each folder, built on first use, and the ids of the files in it
+        self._folder_index: dict[str, list] | None = None
+        self._folder_ids: set[int] = set()
+        self._folder_chains: dict[str, tuple[str, ...]] = {}
+
+        # Files found broken by the probe or verify(), kept in the list until quarantine_broken()
+        self.broken_list: list[File] = []
+
+    def _index_file(self, f: File):
+        if self._folder_index is not None:
+            self._folder_ids.add(id(f))
+            self._index_folders(f)
 
         self.mdate_map.setdefault(f.mdate, [])
         self.mdate_map[f.mdate].append(f)
 
+        self.size_index.add(f)
+        self.mtime_index.add(f)
+
+        if getattr(f, 'broken', False):
+            self.broken_list.append(f)
+            stat = self._broken_stats
+        else:
+            stat = self._summary_stats.get(key := self._summary_key(f))
+            if stat is None:
+                stat = self._summary_stats[key] = [0, 0, 0.]
+        stat[0] += 1
+        stat[1] += f.size
+        stat[2] += getattr(f, 'duration', None) or 0.
+
+    def _reindex(self):
+        """Rebuild all indexes, e.g. after the indexed attributes changed"""
+        self._reset_indexes()
+        for f in self.filelist:
+            self._index_file(f)
+
+    @property
+    def _folder_stats(self) -> dict[str, list]:
+        """[count, size, duration, probed, broken] of each folder, subfolders included
+
+        Kept up to date on adds, and on the moves of its files through any list
+        (e.g. a derived one), see _on_file_moved.
+        """
+        if self._folder_index is None:
+            self._folder_index = {}
+            self._folder_ids = set(map(id, self.filelist))
+            for f in self.filelist:
+                self._index_folders(f)
+            FileList._aggregating.add(self)
+        return self._folder_index
+
+    @staticmethod
+    def _on_file_moved(f: File, src: str):
+        """Move the file from its old folder to the new one, in the aggregates of the lists holding it"""
+        for fl in list(FileList._aggregating):
+            if fl._folder_index is not None and id(f) in fl._folder_ids:
+                fl._index_folders(f, -1, path=src)
+                fl._index_folders(f)
+
+    def _folder_chain(self, folder: str) -> tuple[str, ...]:
+        """The folder and its ancestors up to the root, only the folder itself when outside the root"""
+        chain = self._folder_chains.get(folder)
+        if chain is None:
+            root = os.path.abspath(self.root)
+            k = os.path.abspath(folder)
+            chain = [k]
+            if k.startswith(os.path.join(root, '')):
+                while k != root:
+                    k = os.path.dirname(k)
+                    chain.append(k)
+            chain = self._folder_chains[folder] = tuple(chain)
+        return chain
+
+    def _index_folders(self, f: File, sign: int = 1, path: str | None = None):
+        """Add (sign=1) or remove (sign=-1) the file in the aggregates of its folder and ancestors"""
+        size = sign * f.size
+        duration = sign * (getattr(f, 'duration', None) or 0.)
+        probed = sign * f.probed
+        broken = sign * bool(getattr(f, 'broken', False))
+
+        index = self._folder_index
+        for k in self._folder_chain(os.path.dirname(f.path if path is None else path)):
+            stat = index.get(k)
+            if stat is None:
+                stat = index[k] = [0, 0, 0., 0, 0]
+
+            stat[0] += sign
+            stat[1] += size
+            stat[2] += duration
+            stat[3] += probed
+            stat[4] += broken
+
+            if not stat[0]:  del index[k]
+
     @property
     def folders(self):
-        return self._folder_keys
+        # use a dictionary for easier autocomplete
+        return {k: k for k in self._folder_stats}
+
+    def folder_stats(self, folder: str = '.') -> dict:
+        """Return the file count, size, duration, probed and broken counts under the folder
+
+        A relative folder is resolved against the root, subfolders are included
+        """
+        folder = os.path.abspath(os.path.join(self.root, folder))
+        count, size, duration, probed, broken = self._folder_stats.get(folder, (0, 0, 0., 0, 0))
+        return {'count': count, 'size': size, 'duration': duration,
+                'probed': probed, 'broken': broken}
+
+    def _indexes(self) -> dict[str, dict]:
+        """Return the maps from attribute value to files, used to plan queries"""
+        return {'mdate': self.mdate_map}
+
+    def _range_indexes(self) -> dict[str, SortedIndex]:
+        """Return the sorted indexes, used to plan range queries"""
+        return {'size': self.size_index, 'mtime': self.mtime_index}
+
+    def query(self, query: Query | None = None, **kwargs):
+        """Return the files matching all given predicates, see Query for the arguments"""
+        if query is None:
+            query = Query(**kwargs)
+        return query.run(self)
 
     def _get_filelist_by_folder(self, folder_prefix):
         # NOTE Could be optimized if organize it as a tree, but we may want to keep the order as used in .sort()
         return [f for f in self.filelist if f.path.startswith(folder_prefix)]
     
     def by_folder(self, folder_prefix):
-        return self.__class__(self._get_filelist_by_folder(folder_prefix))
+        return self._new(self._get_filelist_by_folder(folder_prefix))
 
     # ----------------------------------
     # Date time related methods
@@ -142,7 +362,7 @@ class FileList(abc.ABC):
         if not filelist:
            print('Found no file on the given list of dates')
 
-        return self.__class__(filelist=filelist)
+        return self._new(filelist)
 
     @property
     def mdates(self):
@@ -163,15 +383,58 @@ class FileList(abc.ABC):
         """Return the files from first X existing days"""
         return self.by_mdates(self.mdates[:days])
 
+    def by_mtime(self, start: dt.datetime | None = None, end: dt.datetime | None = None):
+        """Return the files modified between start and end (inclusive), in mtime order"""
+        return self._new(self.mtime_index.range(start, end))
+
     def recent(self, days=5):
         """Return the files from last X days from today"""
         today = dt.datetime.today().date()
-        recent_days = [today - dt.timedelta(days=day) for day in range(days+1)]
-        return self.by_mdates(recent_days)
+        start = dt.datetime.combine(today - dt.timedelta(days=days), dt.time.min)
+        return self.by_mtime(start)
 
     # ----------------------------------
     # Size related methods
-    
+    def by_size(self, lower_bound: int | None = None, upper_bound: int | None = None):
+        """Return the files with lower_bound <= size <= upper_bound, in size order"""
+        return self._new(self.size_index.range(lower_bound, upper_bound))
+
+    def large_files(self, lower_bound: int | None = None):
+        if lower_bound is None:  lower_bound = self._large_file_lower_bound
+        return self.by_size(lower_bound=lower_bound)
+
+    def small_files(self, upper_bound: int | None = None):
+        if upper_bound is None:  upper_bound = self._small_file_upper_bound
+        return self.by_size(upper_bound=upper_bound)
+
+    def largest(self, n: int = 10):
+        return self._new(self.size_index.top(n))
+
+    def smallest(self, n: int = 10):
+        return self._new(self.size_index.bottom(n))
+
+    def top(self, n: int = 10, attr: SortAttr = SortAttr.SIZE, reverse: bool = True):
+        """Return the n files with the largest keys, largest first (smallest with reverse=False)
+
+        Served by the sorted index of the attribute if any, by a heap of n files
+        otherwise, so the list is never sorted nor copied. Either way, the files
+        missing the attribute (e.g. not probed yet) are left out.
+        """
+        index = self._range_indexes().get(attr.value)
+        if index is not None:
+            return self._new(index.top(n) if reverse else index.bottom(n))
+
+        select = heapq.nlargest if reverse else heapq.nsmallest
+        files = (f for f in self.filelist if getattr(f, attr.value, None) is not None)
+        return self._new(select(n, files, key=key_func(attr)))
+
+    def _sample_files(self, n: int, seed: int | None = None) -> list[File]:
+        return Random(seed).sample(self.filelist, min(n, len(self.filelist)))
+
+    def sample(self, n: int = 10, seed: int | None = None):
+        """Return n files picked uniformly at random, only the picked ones are copied"""
+        return self._new(self._sample_files(n, seed))
+
     # File opening related methods
     @classmethod
     def _popen(cls, cmd):
@@ -198,38 +461,103 @@ class FileList(abc.ABC):
              random: bool = False,
              *,
              path_lst: None | list[str] = None,
+             thumbnails: bool = False,
+             contact_sheet: bool = False,
              **kwargs):
-        """Open first <top> / all files in default app"""
-        if self._open_file_cmd_lst:
-            self._open(self._open_file_cmd_lst, top=top, random=random, path_lst=path_lst)
-        else:
+        """Open first <top> / all files in default app
+
+        thumbnails opens the cached thumbnails (keyframe strips for videos)
+        instead of the originals, contact_sheet tiles them into a few sheets.
+        """
+        if not self._open_file_cmd_lst:
             raise NotImplementedError(f'Open file command not defined for class {self.__class__}')
 
+        if path_lst is None and (thumbnails or contact_sheet):
+            if not self._thumbnails:
+                raise ValueError(f'No thumbnails for the {self.category} files, only for videos and images')
+            path_lst = self._get_thumbnails_to_open(top=top, random=random, contact_sheet=contact_sheet)
+            if path_lst:
+                self._open(self._open_thumbnail_cmd_lst, path_lst=path_lst)
+            return
+
+        self._open(self._open_file_cmd_lst, top=top, random=random, path_lst=path_lst)
+
+    def _get_filelist_to_open(
+            self,
+            top: None | int = None,
+            random: bool = False
+    ) -> list[File]:
+        if not random:
+            return self.filelist[:top]
+        if top is not None:
+            return self._sample_files(top)
+
+        _lst = list(self.filelist)
+        shuffle(_lst)
+        return _lst
+
     def _get_pathlist_to_open(
             self,
             top: None | int = None,
             random: bool = False
     ) -> list[str]:
-        _lst = list(self._path_iter())[:top]
-        if random:  shuffle(_lst)
-        return _lst
+        return [f.path for f in self._get_filelist_to_open(top=top, random=random)]
+
+    def _get_thumbnails_to_open(
+            self,
+            top: None | int = None,
+            random: bool = False,
+            contact_sheet: bool = False
+    ) -> list[str]:
+        from ..thumbnails import SHEET_COLUMNS, ThumbnailCache
+
+        cache = ThumbnailCache.shared()
+        paths = [p for p in cache.build(self._get_filelist_to_open(top=top, random=random))
+                 if p is not None]
+        if contact_sheet:
+            # Keyframe strips are wide already, one per row
+            columns = 1 if self._category is Category.VIDEO else SHEET_COLUMNS
+            return cache.contact_sheets(paths, columns=columns)
+        return paths
 
     # File move / organize related methods
 
     def _get_dst(self, f: File, dst_folder: str):
         return os.path.join(dst_folder, f.name)
 
-    def organize(self, verbose: bool = False, dry_run: bool = False):
+    def _get_target_subfolders(self, f: File) -> tuple[str, ...]:
+        """Subfolders of the target folder the file is organized into"""
+        return ()
+
+    def organize(self, verbose: bool = False, dry_run: bool = False) -> int:
+        """Move the files into their target folders, return the number of planned or moved files"""
         if self._target_folder is None:
             print("No target folder defined to organize the file into")
-        else:
-            self._organize(verbose, dry_run)
+            return 0
+        return self._organize(verbose, dry_run)
+
+    def _get_target_folder(self, *subfolders: str):
+        return os.path.normpath(os.path.join(self.root, self._target_folder, *subfolders))
+
+    def _organize(self, verbose: bool = False, dry_run: bool = False) -> int:
+        """Default organize behaviour, a single pass working out each destination
+
+        Broken files are left for quarantine_broken()
+        """
+        broken = set(map(id, self.broken_list))
+        folders: dict[tuple, str] = {}
+
+        moves = []
+        for f in self.filelist:
+            if id(f) in broken:  continue
 
-    def _organize(self, verbose: bool = False, dry_run: bool = False):
-        """Default organize behaviour"""
+            sub = self._get_target_subfolders(f)
+            folder = folders.get(sub)
+            if folder is None:
+                folder = folders[sub] = self._get_target_folder(*sub)
+            moves.append((f, self._get_dst(f, folder)))
 
-        dst_folder = self._target_folder
-        self.move_to(dst_folder, verbose=verbose, dry_run=dry_run)
+        return self._move_files(moves, verbose=verbose, dry_run=dry_run)
 
     @staticmethod
     def _prepare_dir(folder):
@@ -238,19 +566,47 @@ class FileList(abc.ABC):
             os.makedirs(folder)
 
     def move_to(self, dst_folder: str, verbose: bool = True, dry_run: bool = False):
+        self._move_files(((f, self._get_dst(f, dst_folder)) for f in self.filelist),
+                         verbose=verbose, dry_run=dry_run)
+
+    def _move_files(self,
+                    moves: Iterable[tuple[File, str]],
+                    verbose: bool = False,
+                    dry_run: bool = False,
+                    rename_existing: bool = False,
+                    desc: str | None = None) -> int:
+        """Move the files to their destinations as one batch, return the number of moves
+
+        The whole plan is worked out first: a destination taken by another file
+        of the batch gets a unique name, and for the ones already on disk the
+        user is asked to skip or rename them (renamed if rename_existing). Each
+        destination folder is listed once and created once, never in a dry run.
+        """
+        listings: dict[str, set[str]] = {}
+
+        def _exists(dst):
+            folder, name = os.path.split(dst)
+            names = listings.get(folder)
+            if names is None:
+                names = listings[folder] = set(os.listdir(folder)) if os.path.isdir(folder) else set()
+            return name in names
+
+        plan = []
         existed_file_list = []
-        to_move_list = []
-        for f in self.filelist:
-            dst = self._get_dst(f, dst_folder)
-
+        taken = set()
+        for f, dst in moves:
             if f.path == dst:  continue
 
-            if os.path.isfile(dst):
-                existed_file_list.append((f, dst))
-            else:
-                to_move_list.append((f, dst))
-            
-        # TODO - refactor the overwriting logic here
+            if dst in taken:
+                dst = self.get_uniq_dst(dst, taken)
+            elif _exists(dst):
+                if not rename_existing:
+                    existed_file_list.append((f, dst))
+                    continue
+                dst = self.get_uniq_dst(dst, taken)
+            taken.add(dst)
+            plan.append((f, dst))
+
         if existed_file_list:
             print("The following files already exists:")
             for f, dst in existed_file_list:
@@ -258,108 +614,333 @@ class FileList(abc.ABC):
                 print(f'   - [{f.size_human}] {f.path}')
                 print(f'   + [{f.size_human}] {dst}')
 
-            prompt = input('What action wolud you like? *[S]kip / [R]ename / [Q]uit').lower()
+            prompt = ask('What action wolud you like? *[S]kip / [R]ename / [Q]uit', 's').lower()
 
             if prompt in ['s', '']:
                 pass  # Do nothing
             elif prompt == 'r':
                 print('Duplicated files will be renamed as')
                 for f, dst in existed_file_list:
-                    new_dst = self.get_uniq_dst(dst)
-                    to_move_list.append((f, new_dst))
+                    new_dst = self.get_uniq_dst(dst, taken)
+                    taken.add(new_dst)
+                    plan.append((f, new_dst))
                     print(f.path)
                     print('  -->', new_dst)
             else:
                 exit()
 
-        if to_move_list:
-            self._prepare_dir(dst_folder)
-
-            for f, dst in tqdm(to_move_list, desc=f"{self.category} moving"):
-                f.move(dst, dry_run=dry_run, verbose=verbose)
-
-        return
+        if not plan:
+            return 0
+
+        groups: dict[str, list[tuple[File, str]]] = {}
+        for f, dst in plan:
+            groups.setdefault(os.path.dirname(dst), []).append((f, dst))
+
+        if dry_run:
+            self._print_move_plan(groups, verbose)
+            return len(plan)
+
+        with tqdm(total=len(plan), desc=desc or f"{self.category} moving") as pbar:
+            for folder, group in groups.items():
+                self._prepare_dir(folder)
+                for f, dst in group:
+                    self._move_file(f, dst, verbose=verbose)
+                    pbar.update()
+        return len(plan)
+
+    def _print_move_plan(self, groups: dict[str, list[tuple[File, str]]], verbose: bool = False):
+        """Print every move of a small plan (or with verbose), a line per folder otherwise"""
+        count = sum(map(len, groups.values()))
+        if verbose or count <= self._dry_run_listing_limit:
+            for group in groups.values():
+                for f, dst in group:
+                    f.move(dst, dry_run=True)
+            return
+
+        print(f'Will move {count} {self.category} files into {len(groups)} folders:')
+        for folder in sorted(groups)[:self._dry_run_listing_limit]:
+            group = groups[folder]
+            size = get_readable_filesize(sum(f.size for f, _ in group)).strip()
+            print(f'    {colored(os.path.relpath(folder, self.root), "green")}: {len(group)} files [{size}]')
+        if len(groups) > self._dry_run_listing_limit:
+            print(f'    ... and {len(groups) - self._dry_run_listing_limit} more folders')
+
+    def _move_file(self, f: File, dst: str, verbose: bool = False, dry_run: bool = False):
+        """Move a file of the list, the folder aggregates follow through File._path_listeners"""
+        f.move(dst, dry_run=dry_run, verbose=verbose)
 
     @staticmethod
-    def get_uniq_dst(dst):
-        """Add suffix to dst to create unique filename"""
+    def get_uniq_dst(dst, taken: set[str] | frozenset = frozenset()):
+        """Add suffix to dst to create unique filename, also avoiding the paths in taken"""
 
         folder = os.path.dirname(dst)
         base, ext = os.path.splitext(os.path.basename(dst))
 
         suffix = 0
-        while os.path.isfile(os.path.join(folder, f"{base}-{suffix}{ext}")):
+        while (_dst := os.path.join(folder, f"{base}-{suffix}{ext}")) in taken or os.path.isfile(_dst):
             suffix += 1
 
-        return os.path.join(folder, f"{base}-{suffix}{ext}")
-
-    # Content (stats) show related methods
-    def summary(self):
-        print(f"{self.category} file counts: {len(self.filelist)}")
-
-    def details(self, show_path=False, color=True):
-
-        data_dict, total_dict = self._get_details_to_show(show_path=show_path, color=color)
-
-        header = list(data_dict.keys())
-        data = []
-
-        for idx in range(len(data_dict[header[0]])):
-            row = [data_dict[col][idx] for col in header]
-            data.append(row)
-
-        # Add total summary
-        data.append(SEPARATING_LINE)
-        data.append([total_dict.get(col, '') for col in header])
+        return _dst
 
+    # ----------------------------------
+    # Broken files
+    def quarantine_broken(self, verbose: bool = False, dry_run: bool = False) -> int:
+        """Move the broken files into the broken folder as one planned batch, return the count
+
+        Same-named files get unique names, in a dry run as well.
+        """
+        dst_folder = os.path.normpath(os.path.join(self.root, self._broken_folder))
+        return self._move_files(
+            ((f, os.path.join(dst_folder, f.name)) for f in self.broken_list
+             if os.path.dirname(f.path) != dst_folder),
+            verbose=verbose, dry_run=dry_run, rename_existing=True,
+            desc=f'[{self.category}] Quarantining broken files')
+
+    def broken_report(self, show: bool = True) -> list[dict]:
+        """Return (and print) the broken files with the error found by the probe"""
+        rows = [{'path': f.path, 'size': f.size,
+                 'error': getattr(f, 'probe_error', None) or f.verify_error}
+                for f in self.broken_list]
+        if show and rows:
+            from tabulate import tabulate
+            print(tabulate(
+                [[os.path.relpath(row['path'], self.root), get_readable_filesize(row['size']).strip(),
+                  row['error'] or ''] for row in rows],
+                headers=[f'Broken {self.category} file', 'Size', 'Error']))
+        return rows
 
-        print(tabulate(data, headers=header))
+    # Content (stats) show related methods
+    def _summary_key(self, f: File) -> tuple:
+        return (
+            getattr(f, self._summary_rows[0]) if self._summary_rows else None,
+            getattr(f, self._summary_cols[0]) if self._summary_cols else None,
+        )
+
+    def _sum_stats(self, row=None, col=None) -> list:
+        """Sum the summary cells matching given row / column member (None for all)"""
+        ret = [0, 0, 0.]
+        for (r, c), stat in self._summary_stats.items():
+            if (row is None or r == row) and (col is None or c == col):
+                ret = [x + y for x, y in zip(ret, stat)]
+        return ret
 
-    def _get_details_to_show(self, show_path, color):
-        data_dict = {
-            'Filename': [],
-            'Size': [],
-            'Date': []
+    @property
+    def stats(self) -> dict:
+        """Return the file count, total size and duration, overall and per summary cell
+
+        The broken files are counted apart, not in the cells nor the totals
+        """
+        def _name(member):
+            return None if member is None else member.name
+
+        count, size, duration = self._sum_stats()
+        broken_count, broken_size, broken_duration = self._broken_stats
+        return {
+            'category': self.category,
+            'count': count,
+            'size': size,
+            'duration': duration,
+            'cells': [
+                {'row': _name(r), 'col': _name(c), 'count': n, 'size': s, 'duration': d}
+                for (r, c), (n, s, d) in self._summary_stats.items()
+            ],
+            'broken': {'count': broken_count, 'size': broken_size, 'duration': broken_duration},
         }
 
-        total_dict = {
-            'Filename': f"Total {self.len} files",
-            'Size': get_readable_filesize(sum(f.size for f in self.filelist))
-        }
-        
-        if show_path:  data_dict['Path'] = []
+    def _format_stat(self, stat: list) -> str:
+        count, size, duration = stat
+        if not count:  return '0'
 
-        for f in self.filelist:
-            data_dict['Filename'].append(
-                f.name if not color else colored(f.name, 'green')
-            )
+        extra = get_readable_filesize(size).strip()
+        if self._summary_duration:
+            extra += f' / {parse_sec_to_str(duration)}'
+        return f'{count} [{extra}]'
 
-            data_dict['Size'].append(
-                f.size_human if not color else colored(f.size_human, 'yellow')
-            )
+    def summary(self):
+        """Print the counts, sizes (and durations) served from the incremental stats"""
+        if self._summary_rows is None:
+            count, size, _ = self._sum_stats()
+            print(f"{self.category} file counts: {count} [{get_readable_filesize(size).strip()}]")
+            if self._broken_stats[0]:
+                print(f"{self.category} broken files: {self._format_stat(self._broken_stats)}")
+            return
+
+        print(f'{self.category.capitalize()} files summary:')
+
+        row_attr, row_labels = self._summary_rows
+        col_labels = self._summary_cols[1] if self._summary_cols else {}
+        rows = list(row_labels)
+        cols = list(col_labels)
+
+        if self._summary_hide_empty_na:
+            if rows and rows[-1].name == 'NA' and not self._sum_stats(row=rows[-1])[0]:
+                rows.pop()
+            if cols and cols[-1].name == 'NA' and not self._sum_stats(col=cols[-1])[0]:
+                cols.pop()
+
+        summary_table = [["", *(col_labels[c] for c in cols), "Sum"]]
+        for r in rows:
+            summary_table.append([
+                row_labels[r],
+                *(self._format_stat(self._sum_stats(row=r, col=c)) for c in cols),
+                self._format_stat(self._sum_stats(row=r))
+            ])
+        summary_table.append([
+            "Sum",
+            *(self._format_stat(self._sum_stats(col=c)) for c in cols),
+            self._format_stat(self._sum_stats())
+        ])
+        if self._broken_stats[0]:
+            summary_table.append(["Broken", *('' for _ in cols), self._format_stat(self._broken_stats)])
+
+        from tabulate import tabulate
+        print(tabulate(summary_table))
+
+    def details(self,
+                show_path: bool = False,
+                color: bool = True,
+                limit: None | int = None,
+                offset: int = 0,
+                page_size: None | int = None,
+                pager: bool = False,
+                sample: None | int = None):
+        """Print the files as a table, streaming the rows
+
+        Column widths are fixed from the header and the first rows, so printing
+        starts right away and memory stays flat for huge lists. Longer cells
+        in later rows are not truncated. Rows are flushed every page_size rows
+        and, with pager=True, the user is asked before each new page.
+
+        sample shows that many files picked at random instead, see top() for
+        the largest / longest ones. The broken files are totalled on a line of
+        their own.
+        """
+
+        columns = self._get_details_columns(show_path)
+        totals = self._get_details_totals()
+        header = [col[0] for col in columns]
+
+        stop = None if limit is None else offset + limit
+        rows = (
+            (f, [getter(f) for _, getter, _, _ in columns])
+            for f in islice(self.filelist if sample is None else self._sample_files(sample),
+                            offset, stop)
+        )
+        head_rows = list(islice(rows, self._details_sample_size))
+
+        # The total label is the only cell known to be long beforehand
+        widths = [len(h) for h in header]
+        widths[0] = max(widths[0], len(f"Total {self.len} of {self.len} files"))
+        for _, cells in head_rows:
+            widths = [max(w, len(c)) for w, c in zip(widths, cells)]
+
+        sep = '  '.join('-' * w for w in widths)
+        print('  '.join(h.ljust(w) for h, w in zip(header, widths)).rstrip())
+        print(sep)
+
+        if page_size is None:  page_size = self._details_page_size
+        broken = set(map(id, self.broken_list))
+        count = 0
+        total_vals = {h: 0 for h in totals}
+        broken_count = 0
+        broken_vals = {h: 0 for h in totals}
+        for f, cells in chain(head_rows, rows):
+            if id(f) in broken:
+                broken_count += 1
+                vals = broken_vals
+            else:
+                count += 1
+                vals = total_vals
+            for h, (key, _) in totals.items():
+                vals[h] += key(f)
 
-            data_dict['Date'].append(
-                str(f.mdate) if not color else colored(str(f.mdate), 'blue')
-            )
-            if show_path:  data_dict['Path'].append(f.path)
+            print('  '.join(
+                self._format_cell(cell, w, align, cell_color if color else None)
+                for cell, w, (_, _, cell_color, align) in zip(cells, widths, columns)
+            ).rstrip())
 
-        return data_dict, total_dict
+            if (count + broken_count) % page_size == 0:
+                sys.stdout.flush()
+                if pager and input('-- more (q to quit) --').lower() == 'q':
+                    break
 
-    # two alias to details()
-    def list(self):
-        return self.details()
+        # Add total summary
+        healthy = self.len - len(self.broken_list)
+        total_lines = [(f"Total {count} files" if count == healthy
+                        else f"Total {count} of {healthy} files", total_vals)]
+        if broken_count:  total_lines.append((f"Broken {broken_count} files", broken_vals))
+
+        print(sep)
+        for label, vals in total_lines:
+            total_cells = {h: fmt(vals[h]) for h, (_, fmt) in totals.items()}
+            total_cells[header[0]] = label
+            print('  '.join(
+                self._format_cell(total_cells.get(h, ''), w, align)
+                for h, w, (_, _, _, align) in zip(header, widths, columns)
+            ).rstrip())
 
-    def ls(self):
-        return self.details()
+    @staticmethod
+    def _format_cell(cell: str, width: int, align: str = '<', cell_color: None | str = None):
+        cell = cell.rjust(width) if align == '>' else cell.ljust(width)
+        return cell if cell_color is None else colored(cell, cell_color)
+
+    def _get_details_columns(self, show_path: bool) -> list[tuple]:
+        """Return the columns to show as (header, getter -> str, color, align)"""
+        columns = [
+            ('Filename', attrgetter('name'), 'green', '<'),
+            ('Size', attrgetter('size_human'), 'yellow', '<'),
+            ('Date', lambda f: str(f.mdate), 'blue', '<'),
+        ]
+        if show_path:  columns.append(('Path', attrgetter('path'), None, '<'))
+        return columns
+
+    def _get_details_totals(self) -> dict[str, tuple]:
+        """Return the column totals as {header: (value to sum, formatter of the sum)}"""
+        return {'Size': (attrgetter('size'), get_readable_filesize)}
 
-    def sort(self, attr:SortAttr = SortAttr.NAME):
-        def sorter(f):
-            if not hasattr(f, attr.value):
-                return MinType()
-            else:
-                return getattr(f, attr.value)
-        self.filelist.sort(key=sorter)
+    # two alias to details()
+    def list(self, **kwargs):
+        return self.details(**kwargs)
+
+    def ls(self, **kwargs):
+        return self.details(**kwargs)
+
+    def sort(self, *attrs: SortAttr, reverse: bool | Sequence[bool] = False):
+        """Stable sort on one or more attributes, the first one being the primary key
+
+        reverse could be given per attribute. Ties keep the current order, so
+        chained sorts compose like list.sort. The key columns are cached until
+        files are added or re-indexed (e.g. after probing). Files missing an
+        attribute come first (last when reversed).
+        """
+        if not attrs:  attrs = (SortAttr.NAME,)
+        if isinstance(reverse, bool):  reverse = [reverse] * len(attrs)
+
+        cache = self._sort_cache
+        if cache is not None and cache['version'] == self._version:
+            # Columns are aligned on the snapshot, map the current order onto it
+            pos = cache['pos']
+            try:
+                order = [pos[id(f)] for f in self.filelist]
+            except KeyError:
+                cache = None
+
+        if cache is None or cache['version'] != self._version:
+            files = list(self.filelist)
+            cache = self._sort_cache = {
+                'version': self._version, 'files': files, 'columns': {},
+                'pos': {id(f): idx for idx, f in enumerate(files)}}
+            order = list(range(len(files)))
+
+        columns = []
+        for attr in attrs:
+            if attr not in cache['columns']:
+                cache['columns'][attr] = key_column(cache['files'], attr)
+            columns.append(cache['columns'][attr])
+
+        files = cache['files']
+        self.filelist = [files[idx] for idx in sort_order(columns, list(reverse), order)]
         return self
 
 
-
+File._path_listeners.append(FileList._on_file_moved)
@@ -1,5 +1,4 @@
 import os
-from tabulate import tabulate
 
 
 from .filelist import FileList
@@ -10,17 +9,27 @@ class ImageFileList(FileList):
 
     _category = Category.IMAGE
     _target_folder = '@image'
+    _broken_folder = '@broken-images'
     _open_file_cmd_lst = ['feh', '-g', '1680x1050', '--scale-down', '--auto-zoom']
     _file_type = ImageFile
-
-    def __init__(self, filelist: list[ImageFile] = []):
-        self.orientation_map: dict[Orientation, list[ImageFile]] = {
-            ori: [] for ori in Orientation
-        }
-        self.image_type_map: dict[ImageType, list[ImageFile]] = {
-            _type: [] for _type in ImageType
-        }
-        super().__init__(filelist)
+    _thumbnails = True
+
+    _summary_rows = (
+        'image_type', {
+            ImageType.ILLUST: 'Illustration',
+            ImageType.PHOTO: 'Photo',
+            ImageType.NOTSURE: 'Uncertain',
+            ImageType.NA: 'Type Not Set',
+        })
+    _summary_cols = (
+        'orientation', {
+            Orientation.PORT: 'Portrait',
+            Orientation.LAND: 'Landscape',
+            Orientation.NA: 'Unknown Ratio',
+        })
+
+    def __init__(self, filelist: list[ImageFile] = [], root: str = '.'):
+        super().__init__(filelist, root=root)
 
         self.filelist: list[ImageFile]
 
@@ -54,92 +63,63 @@ class ImageFileList(FileList):
              top: None | int = None,
              random: bool = False,
              *,
-             path_lst: None | list[str] = None
+             path_lst: None | list[str] = None,
+             **kwargs
              ):
-        """Open first <top> / all files in default app"""
+        """Open first <top> / all files in default app, see FileList.open for the thumbnails"""
         
         if orientation is None and image_type is None:
-            super().open(top=top, random=random, path_lst=path_lst)
+            super().open(top=top, random=random, path_lst=path_lst, **kwargs)
         elif orientation is None and image_type is not None:
             self.by_image_type(image_type)\
-                .open(top=top, random=random, path_lst=path_lst)
+                .open(top=top, random=random, path_lst=path_lst, **kwargs)
         elif orientation is not None and image_type is None:
             self.by_orientation(orientation)\
-                .open(top=top, random=random, path_lst=path_lst)
+                .open(top=top, random=random, path_lst=path_lst, **kwargs)
         elif orientation is not None and image_type is not None:
             self.by_image_type(image_type)\
                 .by_orientation(orientation)\
-                .open(top=top, random=random, path_lst=path_lst)
+                .open(top=top, random=random, path_lst=path_lst, **kwargs)
         else:
             raise ValueError('Something wrong with the input')
 
-    def _organize(self, verbose: bool, dry_run: bool):
+    def _get_target_subfolders(self, f: ImageFile):
+        return (f.image_type.value, str(f.mdate))
 
-        for mdate in self.mdates:
-            for image_type in ImageType:
-                dst_folder = os.path.join(self._target_folder, image_type.value, str(mdate))
-                self.by_mdate(mdate)\
-                    .by_image_type(image_type)\
-                    .move_to(dst_folder, verbose=verbose, dry_run=dry_run)
-        
-    def _add_file(self, f: ImageFile):
-        super()._add_file(f)
+    def _reset_indexes(self):
+        super()._reset_indexes()
+        self.orientation_map: dict[Orientation, list[ImageFile]] = {
+            ori: [] for ori in Orientation
+        }
+        self.image_type_map: dict[ImageType, list[ImageFile]] = {
+            _type: [] for _type in ImageType
+        }
+
+    def _index_file(self, f: ImageFile):
+        super()._index_file(f)
         self.orientation_map[f.orientation].append(f)
         self.image_type_map[f.image_type].append(f)
 
+    def _indexes(self):
+        return {
+            **super()._indexes(),
+            'orientation': self.orientation_map,
+            'image_type': self.image_type_map
+        }
+
     # TODO - make this accept general arguments (like a few types)
     def by_image_type(self, image_type: ImageType):
-        return self.__class__(self.image_type_map[image_type])
+        return self._new(self.image_type_map[image_type])
 
     def by_orientation(self, orientation: Orientation):
-        return self.__class__(self.orientation_map[orientation])
-
-    def summary(self):
-
-        print('Image files summary:')
-        summary_table = [
-            ["", "Portrait", "Landscape", "Unknown Ratio", "Sum"],
-            ["Illustration", 0, 0, 0, 0],
-            ["Photo", 0, 0, 0, 0],
-            ["Uncertain", 0, 0, 0, 0],
-            ["Type Not Set", 0, 0, 0, 0],
-            ["Sum", 0, 0, 0, 0]]
-
-        row_map = {
-            ImageType.ILLUST: 1,
-            ImageType.PHOTO: 2,
-            ImageType.NOTSURE: 3,
-            ImageType.NA: 4
-        }
-
-        col_map = {
-            Orientation.PORT: 1,
-            Orientation.LAND: 2,
-            Orientation.NA: 3
-        }
-
-        for f in self.filelist:
-           row = row_map[f.image_type]
-           col = col_map[f.orientation]
-
-           summary_table[row][col] += 1
-           summary_table[row][-1] += 1
-           summary_table[-1][col] += 1
-           summary_table[-1][-1] += 1
-
-        print(tabulate(summary_table))
-
-    def _get_details_to_show(self, show_path, color):
-        data_dict, total_dict = super()._get_details_to_show(show_path, color)
-
-        data_dict['Height'] = []
-        data_dict['Width'] = []
-        data_dict['Port/Land'] = []
-        data_dict['Image Type'] = []
-        for f in self.filelist:
-            data_dict['Height'].append(f.height if f.height else "")
-            data_dict['Width'].append(f.width if f.width else "")
-            data_dict['Port/Land'].append(f.orientation.value)
-            data_dict['Image Type'].append(f.image_type.name if f.image_type is not ImageType.NA else "")
-
-        return data_dict, total_dict
+        return self._new(self.orientation_map[orientation])
+
+    def _get_details_columns(self, show_path):
+        columns = super()._get_details_columns(show_path)
+        columns += [
+            ('Height', lambda f: str(f.height) if f.height else "", None, '>'),
+            ('Width', lambda f: str(f.width) if f.width else "", None, '>'),
+            ('Port/Land', lambda f: f.orientation.value, None, '<'),
+            ('Image Type', lambda f: f.image_type.name if f.image_type is not ImageType.NA else "", None, '<'),
+        ]
+        return columns
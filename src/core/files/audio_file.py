@@ -1,5 +1,7 @@
 
-import ffmpeg
+import json
+import tempfile
+import subprocess as sp
 from termcolor import colored
 
 from .file import File
@@ -7,6 +9,21 @@ from ..enums import Category, MediaLengthType, Orientation
 
 class AudioFile(File):
 
+    _probe_attrs = ('duration', 'length_type', 'broken')
+
+    # Only the stream fields read by _parse_probe_info(), the full ffprobe
+    # output could be hundreds of KB for files with many streams or chapters
+    _probe_entries = 'stream=codec_type,width,height,coded_width,coded_height,duration'
+
+    # Upper bound of the ffprobe output kept in memory, and of its error output
+    _probe_payload_limit = 256 * 1024
+    _probe_error_limit = 4096
+
+    # Why the file is broken. A class default, so that only the broken files store it
+    probe_error: str | None = None
+
+    _verifiable = True
+
     duration_def = [
         ((0, 300), MediaLengthType.S),  # < 5m
         ((300, 600), MediaLengthType.M),  # 5m <= d < 10m
@@ -19,23 +36,71 @@ class AudioFile(File):
             path: str,
             *,
             auto_probe: bool = False,
-            preassigned_attrs = {}
+            preassigned_attrs = {},
+            cat: Category | None = None
     ):
 
         self.duration: None | float = None
         self.length_type: MediaLengthType = MediaLengthType.NA
         self.broken: bool = False
 
-        super().__init__(path, auto_probe=auto_probe, preassigned_attrs=preassigned_attrs)
+        super().__init__(path, auto_probe=auto_probe, preassigned_attrs=preassigned_attrs, cat=cat)
 
     def _probe(self):
         """Populate the media metadata fields"""
+        probe = None
         try:
-            probe = ffmpeg.probe(self.path)
-        except:
+            out, err, returncode = self._run_ffprobe()
+        except OSError:
+            # ffprobe could not be started, the file is left unprobed, see File.probe
+            raise
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+        else:
+            if out is None:
+                error = f'ffprobe output over {self._probe_payload_limit} bytes'
+            elif returncode != 0:
+                error = self._error_snippet(err) or f'ffprobe exited with code {returncode}'
+            else:
+                try:
+                    probe, error = json.loads(out), None
+                except ValueError:
+                    error = 'invalid ffprobe output'
+
+        self._apply_probe_info(probe, error)
+
+    def _run_ffprobe(self) -> tuple[bytes | None, bytes, int]:
+        """Run ffprobe, return its output (None if over the payload limit), error output and exit code
+
+        Both outputs are capped, the error output is spooled to a temporary
+        file so that reading one pipe never blocks on the other.
+        """
+        with tempfile.TemporaryFile() as err_file, \
+                sp.Popen(self._probe_args(), stdin=sp.DEVNULL, stdout=sp.PIPE, stderr=err_file) as proc:
+            out = proc.stdout.read(self._probe_payload_limit + 1)
+            if len(out) > self._probe_payload_limit:
+                proc.kill()
+                out = None
+            proc.wait()
+
+            err_file.seek(0)
+            return out, err_file.read(self._probe_error_limit), proc.returncode
+
+    def _probe_args(self) -> list[str]:
+        """The ffprobe command line, shared with the async callers"""
+        return ['ffprobe', '-v', 'error', '-show_entries', self._probe_entries,
+                '-of', 'json', self.path]
+
+    def _probe_cost(self) -> int:
+        return self._probe_payload_limit
+
+    def _apply_probe_info(self, probe: dict | None, error: str | None = None):
+        """Populate the fields from the ffprobe output, None if ffprobe failed with error"""
+        if probe is None:
             print(f'Warning: failed to probe the information of media file'
                   f' {colored(self.path, "yellow")}')
             self.broken = True
+            self.probe_error = error or 'ffprobe failed'
         else:
             self._parse_probe_info(probe)
 
@@ -53,6 +118,7 @@ class AudioFile(File):
             print(f'Warning: failed to find audio stream in file {colored(self.path, "yellow")},'
                     ' skip this file')
             self.broken = True
+            self.probe_error = 'no audio stream'
             return
 
         stream = audio_streams[0]
@@ -5,6 +5,8 @@ import datetime as dt
 from termcolor import colored
 
 from ..utils import get_readable_filesize
+from ..probe_cache import ProbeCache, fingerprint
+from .. import records
 
 from ..enums import Category, Enum
 
@@ -12,13 +14,35 @@ from ..enums import Category, Enum
 
 class File():
 
+    # Attributes filled by _probe(), shared through the content-keyed probe cache
+    _probe_attrs: tuple[str, ...] = ()
+
+    # Bookkeeping for the cache, not stored in it
+    _transient_attrs = ('_dirty', '_moved_from')
+
+    # Whether verify() could fully decode the file with ffmpeg
+    _verifiable = False
+
+    # Fingerprint of the content last checked by verify() and the error found if any.
+    # Class defaults, so that only the verified files store them
+    verified: str | None = None
+    verify_error: str | None = None
+
+    # Called as listener(f, old_path) on every path change, e.g. by the lists keeping folder aggregates
+    _path_listeners: list = []
+
+    # First error of running the external prober on an automatic probe, only warned about once
+    _probe_launch_error: str | None = None
+
     def __init__(
             self,
             path: str,
             *,
             auto_probe: bool = False,
-            preassigned_attrs = {}
+            preassigned_attrs = {},
+            cat: Category | None = None
     ):
+        """Create the file, cat could be given when the caller already inferred it"""
 
         self.path: str = path
         self.probed: bool = False
@@ -27,16 +51,22 @@ class File():
         self.cat: Category = Category.NA
 
         self.fstat: dict = {}
+        self.fingerprint: str | None = None
+
+        # Whether the cache entry needs to be (re)written, and the path it was saved under
+        self._dirty: bool = True
+        self._moved_from: str | None = None
 
         if not preassigned_attrs:
-            self._probe_base_info()
-            if auto_probe:  self._probe()
+            self._probe_base_info(cat)
+            if auto_probe:  self._auto_probe()
         else:
             for attr, val in preassigned_attrs.items():
                 # NOTE - Let it crash if the attr not defined
                 default_attr = getattr(self, attr)
                 setattr(self, attr,
                         type(default_attr)[val] if isinstance(default_attr, Enum) else val)
+            self._dirty = False
 
 
     @property
@@ -55,10 +85,10 @@ class File():
     def size_human(self):
         return get_readable_filesize(self.fstat['st_size'])
     
-    def _probe_base_info(self):
+    def _probe_base_info(self, cat: Category | None = None):
 
         self.name: str = os.path.basename(self.path)
-        self.cat: Category = Category.infer(self.name)
+        self.cat: Category = Category.infer(self.name) if cat is None else cat
 
         # save as dict to allow parsing
         _fstat = os.stat(self.path)
@@ -74,15 +104,111 @@ class File():
         """Populate other meta info fields"""
         return
 
+    def _probe_args(self) -> list[str] | None:
+        """Command line of an external prober, None when _probe() runs in process"""
+        return None
+
+    def _probe_cost(self) -> int:
+        """Estimated peak memory of _probe() in bytes, charged against the probe memory budget"""
+        return 0
+
     def probe(self, force: bool = False, verbose: bool = False):
+        """Probe the metadata, from the probe cache if the content is known
+
+        Raises OSError if the external prober could not be run, the file is
+        then left unprobed and nothing is cached.
+        """
         if force or not self.probed:
+            if not force and self._load_probe_result():
+                self._dirty = True
+                if verbose:  print(f'Found probe result for file {self.name}')
+                return
+
             if verbose:  print(f'Probing for file {self.name}')
             self._probe()
+            self._dirty = True
+            self._save_probe_result()
+
+    def _auto_probe(self):
+        """probe() when the file is added, a prober that could not be run leaves it unprobed"""
+        try:
+            self.probe()
+        except OSError as e:
+            if File._probe_launch_error is None:
+                File._probe_launch_error = f'{type(e).__name__}: {e}'
+                print(colored(f'Warning: could not run the prober ({File._probe_launch_error}),'
+                              f' the files are left unprobed', 'yellow'))
+
+    def _verify_args(self) -> list[str] | None:
+        """Command line decoding the whole file, errors are printed to stderr"""
+        if not self._verifiable:
+            return None
+        return ['ffmpeg', '-v', 'error', '-nostdin', '-i', self.path, '-f', 'null', '-']
+
+    @staticmethod
+    def _error_snippet(stderr: bytes | None, limit: int = 200) -> str:
+        """Last line of an ffmpeg / ffprobe error output, cut to limit chars"""
+        lines = (stderr or b'').decode(errors='replace').strip().splitlines()
+        return lines[-1][:limit] if lines else ''
+
+    def _apply_verify_result(self, fp: str, error: str | None):
+        """Record the result of a full decode of the content with fingerprint fp
+
+        A clean decode clears a broken flag set by an earlier verify, not the
+        one set by the probe.
+        """
+        self.verified = fp
+        self.verify_error = error
+        if hasattr(self, 'broken'):
+            self.broken = error is not None or getattr(self, 'probe_error', None) is not None
+        self._dirty = True
+
+    def _get_fingerprint(self) -> str | None:
+        if self.fingerprint is None:
+            try:
+                self.fingerprint = fingerprint(self.path, self.size)
+            except OSError:
+                return None
+        return self.fingerprint
+
+    def _load_probe_result(self) -> bool:
+        """Fill the probe attributes from the shared probe cache, return if found"""
+        if not self._probe_attrs or (fp := self._get_fingerprint()) is None:
+            return False
+
+        result = ProbeCache.shared().get(fp)
+        if result is None:
+            return False
+
+        for attr, val in result.items():
+            default_attr = getattr(self, attr)
+            setattr(self, attr,
+                    type(default_attr)[val] if isinstance(default_attr, Enum) else val)
+        self.probed = True
+        return True
+
+    def _save_probe_result(self):
+        # A broken file is not cached, so that it could be retried, e.g. with another ffprobe
+        if not self.probed or not self._probe_attrs or getattr(self, 'broken', False):
+            return
+        if (fp := self._get_fingerprint()) is None:
+            return
+
+        ProbeCache.shared().put(fp, {
+            attr: v.name if isinstance(v := getattr(self, attr), Enum) else v
+            for attr in self._probe_attrs
+        })
     
     def update_path(self, new_path):
-        self.path = new_path
+        old_path, self.path = self.path, new_path
+        for listener in File._path_listeners:
+            listener(self, old_path)
 
     def move(self, dst, verbose=False, dry_run=False):
+        # Make sure the probe result could be found again at the new location
+        if not dry_run and self.probed and self.fingerprint is None:
+            self._save_probe_result()
+
         if dry_run:
             print(f'Will move {colored(self.path, "yellow")}\n    -> {colored(dst, "green")}')
 
@@ -90,8 +216,16 @@ class File():
             if verbose:
                 print(f'Moving {self.path} -> {dst}')
             shutil.move(self.path, dst)
+
+            if self._moved_from is None:  self._moved_from = self.path
+            self._dirty = True
             self.update_path(dst)
 
+    def mark_saved(self):
+        """Called once the cache entry is written at the current path"""
+        self._dirty = False
+        self._moved_from = None
+
     def __eq__(self, other):
         return ((self.name == other.name)
                 and (self.mtime == other.mtime)
@@ -101,7 +235,8 @@ class File():
     def to_dict(self):
         """Store attribute in form of dictionary for pickling"""
         # return {attr: getattr(self, attr) for attr in self._attr_register}
-        return {k: v.name if isinstance(v, Enum) else v for k, v in self.__dict__.items()}
+        return {k: v.name if isinstance(v, Enum) else v for k, v in self.__dict__.items()
+                if k not in self._transient_attrs}
 
     @classmethod
     def from_dict(cls, prop_dict):
@@ -110,4 +245,12 @@ class File():
                         if k not in ['path']}
         return cls(path, preassigned_attrs=other_fields)
 
+    def to_record(self) -> bytes:
+        """Store the to_dict() attributes as a compact binary record, see core.records"""
+        return records.encode(self.to_dict())
+
+    @classmethod
+    def from_record(cls, data: bytes):
+        return cls.from_dict(records.decode(data))
+
 
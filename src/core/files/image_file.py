@@ -2,17 +2,25 @@
 from termcolor import colored
 
 from .file import File
-from ..enums import Orientation, ImageType
-from ..anime_or_not.anime_or_not import analysis_image
+from ..enums import Category, Orientation, ImageType
 
 class ImageFile(File):
 
+    _probe_attrs = ('height', 'width', 'image_type', '_image_type_prob', 'orientation')
+
+    # The decoded pixels are about this many times the compressed file size
+    _decode_ratio = 12
+    _decode_cost_bounds = (1024 ** 2, 512 * 1024 ** 2)
+
+    _verifiable = True
+
     def __init__(
             self,
             path: str,
             *,
             auto_probe: bool = False,
-            preassigned_attrs = {}
+            preassigned_attrs = {},
+            cat: Category | None = None
     ):
 
         self.height: None | int = None
@@ -22,13 +30,19 @@ class ImageFile(File):
         self._image_type_prob: float = 0.
         self.orientation: Orientation = Orientation.NA
 
-        super().__init__(path, auto_probe=auto_probe, preassigned_attrs=preassigned_attrs)
+        # Only set by verify(), the probe doesn't tell a broken image
+        self.broken: bool = False
+
+        super().__init__(path, auto_probe=auto_probe, preassigned_attrs=preassigned_attrs, cat=cat)
         
     def _probe(self):
         """Populate the video metadata fields"""
+        # The classifier brings its ML dependencies, only load it when probing
+        from ..anime_or_not.anime_or_not import analysis_image
+
         try:
             prob, width, height = analysis_image(self.path)
-        except:
+        except Exception:
             print(f'Warning: failed to probe the information of image'
                   f' {colored(self.path, "yellow")}')
         else:
@@ -46,6 +60,12 @@ class ImageFile(File):
         self._set_orientation()
         self.probed = True
 
+    def _probe_cost(self) -> int:
+        lo, hi = self._decode_cost_bounds
+        if self.width and self.height:
+            return min(max(self.width * self.height * 4, lo), hi)
+        return min(max(self.size * self._decode_ratio, lo), hi)
+
     def _set_orientation(self):
 
         if self.height is None or self.width is None:
@@ -2,10 +2,12 @@
 from termcolor import colored
 
 from .audio_file import AudioFile
-from ..enums import MediaLengthType, Orientation
+from ..enums import Category, MediaLengthType, Orientation
 
 class VideoFile(AudioFile):
 
+    _probe_attrs = AudioFile._probe_attrs + ('height', 'width', 'orientation')
+
     duration_def = [
         ((0, 300), MediaLengthType.S),  # < 5m
         ((300, 1800), MediaLengthType.M),  # 5m <= d < 30m
@@ -18,13 +20,14 @@ class VideoFile(AudioFile):
             path: str,
             *,
             auto_probe: bool = False,
-            preassigned_attrs = {}
+            preassigned_attrs = {},
+            cat: Category | None = None
     ):
         self.height: None | int = None
         self.width: None | int = None
         self.orientation: Orientation = Orientation.NA
 
-        super().__init__(path, auto_probe=auto_probe, preassigned_attrs=preassigned_attrs)
+        super().__init__(path, auto_probe=auto_probe, preassigned_attrs=preassigned_attrs, cat=cat)
 
 
     def _parse_probe_info(self, probe):
@@ -41,6 +44,7 @@ class VideoFile(AudioFile):
             print(f'Warning: failed to find video stream in file {colored(self.path, "yellow")},'
                     ' skip this file')
             self.broken = True
+            self.probe_error = 'no video stream'
             return
 
         vs = video_streams[0]
@@ -2,59 +2,114 @@
 
 import abc
 import os
-import pickle
-from tqdm import tqdm
+import time
+import contextlib
+import heapq
+from itertools import islice
+from random import Random
 import datetime as dt
 
 from termcolor import colored
 
-from .utils import need_confirm
-from .enums import Category
-from .filelists import AudioFileList, VideoFileList, DocFileList, CompressedFileList
-from .filelists import ImageFileList, FileList
+from .utils import need_confirm, tqdm, reservoir_sample, get_readable_filesize, parse_sec_to_str
+from .cache import ROOT_SHARD, RootCache
+from .probe_cache import ProbeCache
+from .duplicates import find_duplicates
+from .query import Query
+from .export import export_files, read_records
+from . import registry
+from .sniff import sniff_files
+from .enums import Category, SortAttr
+from .sort_keys import key_func
+from .filelists import FileList
 
 
-CACHE_PKL = os.path.join(os.environ['HOME'], '.cache', 'my-file-organizer', 'cache.pkl')
-
 # TODO - the probe could be put into a later stage (after creating the file list)
 # TODO - refactor the cache: save all data in native data structure
 # TODO - add fast mode, i.e. don't walk through the real filelist but using the cached dict, and could check if existed in lazily
-# TODO - the chdir thing limit one feature: for example, we may want to add files interactively from a different directory, need to comb through the logic here
-# TODO - move cache to be "base-folder" based so that it could work for multiple projects
 
 # TODO - create a base Manager to support multiple-purpose reuse
 
 
 class ManagerBase(abc.ABC):
 
-    cache_all: dict[str, dict] = {}
-    if os.path.isfile(CACHE_PKL):
-        with open(CACHE_PKL, 'rb') as f:
-            cache_all = pickle.load(f)
-            print(f'Found cache for {len(cache_all)} locations')
-            for k, v in cache_all.items():
-                print(f'    - {k} ({len(v)} entries)')
-
     @property
     def cache(self) -> dict[str, dict]:
-        return self.cache_all.get(self.cwd, {})
+        """Cache entries of the root folder, keyed by path relative to the root"""
+        return self._cache.entries
+
+    def _cache_key(self, path: str) -> str:
+        if path.startswith(self._root_prefix):
+            return path[len(self._root_prefix):]
+        return os.path.relpath(path, self.cwd)
 
     def save_cache(self):
-        """Save file list, the path is used as key"""
-        _dict = {}
-        for fl in self.data.values():
-            _dict.update(fl.to_dict())
+        """Save the changed files, the path relative to the root is used as key
+
+        Only new, probed or moved files are written. A moved file takes over its
+        entry under the new key, and the entries of files that disappeared from
+        the scanned folders are dropped, so organize() never leaves stale keys.
+        """
+        files = [f for fl in self.data.values() for f in fl.filelist if f._dirty]
+
+        _dict, moved = self._cache_changes(files)
+        renamed = self._cache.update({}, [key for key in moved if key not in _dict])
+        pruned = self._cache.update({}, [key for key in self._stale_keys if key not in _dict])
+        self._stale_keys = []
 
+        self._cache.load_for(_dict)
         self._check_conflicting_cache(_dict)
-        self.cache.update(_dict)
-        self.cache_all[self.cwd] = self.cache
+        self._cache.update(_dict)
+        self._cache.save()
+        ProbeCache.shared().save()
 
-        folder = os.path.dirname(CACHE_PKL)
-        os.makedirs(folder, exist_ok=True)
-        with open(CACHE_PKL, 'wb') as f:
-            pickle.dump(self.cache_all, f)
+        for f in files:
+            f.mark_saved()
 
-        print(f'File cache saved successfully!')
+        print(f'File cache saved successfully! ({len(_dict)} updated, {renamed} renamed, {pruned} pruned)')
+
+    def _cache_changes(self, files) -> tuple[dict[str, dict], list[str]]:
+        """Return the entries of the given dirty files, and the old keys of the moved ones"""
+        _dict = {}
+        moved = []
+        for f in files:
+            if f._moved_from is not None:
+                moved.append(self._cache_key(f._moved_from))
+            key = self._cache_key(f.path)
+            _dict[key] = {**f.to_dict(), 'path': key}
+        return _dict, moved
+
+    def checkpoint(self, files):
+        """Append the changed files to the cache journal, cheaper than a full save_cache"""
+        files = [f for f in files if f._dirty]
+        _dict, moved = self._cache_changes(files)
+        self._cache.append(_dict, [key for key in moved if key not in _dict])
+
+        for f in files:
+            f.mark_saved()
+
+    def prune_cache(self):
+        """Drop the cache entries whose file no longer exists, in any folder"""
+        self._cache.load()
+        stale = [key for key in self.cache if not os.path.exists(os.path.join(self.cwd, key))]
+        self._cache.update({}, stale)
+        if stale:  self._cache.save()
+        print(f'Pruned {len(stale)} cache entries')
+
+    def export(self, path: str, fmt: str | None = None):
+        """Stream the metadata of all files to parquet / arrow / csv / ndjson"""
+        count = export_files(
+            (f for fl in self.data.values() for f in fl.filelist), path, fmt=fmt)
+        print(f'Exported {count} files to {colored(path, "green")}')
+
+    @classmethod
+    def from_export(cls, folder: str, path: str, fmt: str | None = None, **kwargs):
+        """Rebuild a manager from an exported file, without walking or probing"""
+        manager = cls(folder, managed_data={}, chdir=False, **kwargs)
+        manager.data = manager._init_data()
+        for _dict in tqdm(read_records(path, fmt=fmt), desc='Importing files'):
+            manager._add_file_from_cache(_dict, Category[_dict['cat']])
+        return manager
 
     @need_confirm('Do you want to save cache?')
     def save_cache_with_confirm(self):
@@ -86,14 +141,25 @@ class ManagerBase(abc.ABC):
                  recursive: bool = False,
                  auto_probe: bool | dict[Category, bool] = False,
                  use_cache: bool | dict[Category, bool] = True,
-                 managed_data: dict[Category, FileList] | None = None):
+                 managed_data: dict[Category, FileList] | None = None,
+                 chdir: bool = True,
+                 sniff_extensionless: bool = False):
+        """Manage the files under the given root folder
+
+        File paths are kept absolute, so the working directory is only changed
+        for convenience (chdir=True) in interactive use.
+        """
 
         folder = os.path.abspath(folder)
-        os.chdir(folder)
+        if chdir:  os.chdir(folder)
         self.cwd = folder
+        self._root_prefix = os.path.join(folder, '')
 
         self.use_cache = use_cache
         self.auto_probe = auto_probe
+        self.sniff_extensionless = sniff_extensionless
+        self._cache = RootCache.of(folder)
+        self._stale_keys: list[str] = []
 
         if managed_data is None:
             self.data = self._init_data()
@@ -101,6 +167,16 @@ class ManagerBase(abc.ABC):
         else:
             self.data = managed_data
 
+    def _derive(self, managed_data: dict[Category, FileList]):
+        """Return a manager of the same root over the given data"""
+        return self.__class__(
+            self.cwd,
+            auto_probe=self.auto_probe,
+            use_cache=self.use_cache,
+            managed_data=managed_data,
+            chdir=False,
+            sniff_extensionless=self.sniff_extensionless)
+
     def __getitem__(self, cat: Category):
         """Aliast to by_cat"""
         return self.by_cat(cat)
@@ -119,27 +195,59 @@ class ManagerBase(abc.ABC):
     def _load(self, recursive: bool = False):
         """Load the initial folder content"""
 
-        # We only use this function internally so that the cwd is already set
-        pathlist = self._prepare_pathlist('.', recursive=recursive)
-        
+        pathlist = self._prepare_pathlist(self.cwd, recursive=recursive)
+
+        # Only the shards of the walked directories are read
+        self._cache.load(None if recursive else [ROOT_SHARD])
+        if self.cache:
+            print(f'Found cache for {self.cwd} ({len(self.cache)} entries)')
+
+        # Cached keys inside the scanned folders but not found on disk anymore
+        seen = set()
+
         for path in tqdm(pathlist, desc="Loading files"):
-            cat = Category.infer(os.path.basename(path))
+            # The extensionless files are sniffed in one concurrent pass below
+            cat = registry.infer(path)
+
+            key = self._cache_key(path)
+            seen.add(key)
+            cached = self.cache.get(key)
+            if cat is Category.NA and cached is not None:
+                # The category may have been found by sniffing in a previous run
+                cat = Category[cached['cat']]
 
             use_cache = (self.use_cache if isinstance(self.use_cache, bool)
                           else self.use_cache.get(cat, True))
 
-            if not use_cache or path not in self.cache:
+            if not use_cache or cached is None:
                 self._add_file(path, cat)
             else:
-                self._add_file_from_cache(self.cache[path], cat)
+                self._add_file_from_cache({**cached, 'path': path}, cat)
+
+        self._stale_keys = [
+            key for key in self.cache
+            if key not in seen and self._in_scan(key, recursive)
+        ]
+
+        if self.sniff_extensionless:
+            self.sniff_unknown(extensionless_only=True)
         return 
+
+    def _in_scan(self, key: str, recursive: bool) -> bool:
+        """Whether a cache key lies in the folders walked by _load"""
+        if key.startswith('..'):  return False
+        if not recursive:  return os.sep not in key
+
+        return not any(self._exclude_folder(d) for d in key.split(os.sep)[:-1])
  
     def _prepare_pathlist(self, base_folder: str, recursive: bool = False):
-        """Return a list of file paths (relative) under the given base_folder path"""
+        """Return a list of absolute file paths under the given base_folder path
+
+        A relative base_folder is resolved against the root folder
+        """
      
-        base_folder = os.path.relpath(base_folder, '.')
+        base_folder = os.path.join(self.cwd, base_folder)
 
-        # Note that we assume the working directory has been changed already
         if not recursive:
             pathlist = list(filter(
                 os.path.isfile,
@@ -148,15 +256,9 @@ class ManagerBase(abc.ABC):
         else:
             pathlist = []
             for (root, dirs, files) in os.walk(base_folder, topdown=True):
-                root = os.path.relpath(root, base_folder)
-
                 # Prune the dirs
                 dirs[:] = [d for d in dirs if not self._exclude_folder(d)]
-                if root == '.':  # if root is current
-                    pathlist += files
-                else:
-                    assert not (root.startswith('#') and root.startswith('.'))
-                    pathlist += [os.path.join(root, f) for f in files]
+                pathlist += [os.path.join(root, f) for f in files]
 
         return pathlist
 
@@ -166,21 +268,63 @@ class ManagerBase(abc.ABC):
 
         return False
 
-    def _add_file(self, path_or_file, cat):
-        auto_probe = (
-            self.auto_probe if isinstance(self.auto_probe, bool)
-            else self.auto_probe.get(cat, True))
+    def _auto_probe(self, cat: Category) -> bool:
+        return (self.auto_probe if isinstance(self.auto_probe, bool)
+                else self.auto_probe.get(cat, True))
 
-        self.data[cat].add_file(path_or_file, auto_probe=auto_probe)
+    def _add_file(self, path_or_file, cat):
+        self.data[cat].add_file(path_or_file, auto_probe=self._auto_probe(cat), cat=cat)
 
     def _add_file_from_cache(self, cache_dict, cat):
         self.data[cat].add_file_from_cache(cache_dict)
 
+    def sniff_unknown(self, extensionless_only: bool = False, workers: int = 16):
+        """Classify the files in Category.NA from their magic bytes
+
+        The headers are read in batch from a thread pool, and the recognized
+        files are moved into their typed FileList, to be probed and organized
+        like the rest.
+        """
+        na = self.data[Category.NA]
+        files = [f for f in na.filelist
+                 if not extensionless_only or not os.path.splitext(f.name)[1]]
+        if not files:
+            return
+
+        found: dict[int, Category] = {}
+        _iter = sniff_files([f.path for f in files], workers=workers)
+        for f, (_, cat) in zip(files, tqdm(_iter, total=len(files), desc='Sniffing unknown files')):
+            if cat is not Category.NA:
+                found[id(f)] = cat
+
+        if not found:
+            return
+
+        na.filelist = [f for f in na.filelist if id(f) not in found]
+        na._reindex()
+
+        for f in files:
+            cat = found.get(id(f))
+            if cat is None:  continue
+
+            new_f = registry.file_type(cat).from_dict({**f.to_dict(), 'cat': cat.name})
+            new_f._dirty = True
+            self._add_file(new_f, cat)
+            if self._auto_probe(cat):  new_f._auto_probe()
+
+        counts = {}
+        for cat in found.values():
+            counts[cat.name] = counts.get(cat.name, 0) + 1
+        print(f'Re-homed {len(found)} unknown files: '
+              + ', '.join(f'{k} {v}' for k, v in counts.items()))
+
     def add_file(self, path: str):
-        cat = Category.infer(os.path.basename(path))
+        path = os.path.join(self.cwd, path)
+        cat = registry.infer(path, self.sniff_extensionless)
         return self._add_file(path, cat)
 
     def add_folder(self, path: str, recursive: bool = False):
+        path = os.path.join(self.cwd, path)
         if not os.path.isdir(path):
             print(f'Given path {path} is not a folder')
             return
@@ -192,7 +336,7 @@ class ManagerBase(abc.ABC):
     # ----------------------------------
     def _by(self, key:  Category | dt.date, target: dict):
         if key in target:
-            return FileList(filelist=target[key])
+            return FileList(filelist=target[key], root=self.cwd)
         else:
             raise ValueError(f"There are no files in given key: {key}")
 
@@ -200,18 +344,30 @@ class ManagerBase(abc.ABC):
         return self.data[cat]
 
     def by_mdate(self, date: dt.date):
-        return self.__class__(
-            self.cwd,
-            managed_data={
-                key: val.by_mdate(date) for key, val in self.data.items()
-            })
+        return self._derive({
+            key: val.by_mdate(date) for key, val in self.data.items()
+        })
 
     def by_folder(self, folder_prefix):
-        return self.__class__(
-            self.cwd,
-            managed_data={
-                key: val.by_folder(folder_prefix) for key, val in self.data.items()
-            })
+        """Filter by folder prefix, a relative prefix is resolved against the root"""
+        folder_prefix = os.path.join(self.cwd, folder_prefix)
+        return self._derive({
+            key: val.by_folder(folder_prefix) for key, val in self.data.items()
+        })
+
+    def query(self, query: Query | None = None, **kwargs):
+        """Return the files matching all given predicates, see Query for the arguments
+
+        A relative folder prefix is resolved against the root
+        """
+        if query is None:
+            query = Query(**kwargs)
+        if query.folder is not None:
+            query = query.with_folder(os.path.join(self.cwd, query.folder))
+
+        return self._derive({
+            key: val.query(query) for key, val in self.data.items()
+        })
 
     @property
     def mdates(self):
@@ -230,49 +386,149 @@ class ManagerBase(abc.ABC):
 
     # ----------------------------------
     # Dates related alias
+    def by_mtime(self, start: dt.datetime | None = None, end: dt.datetime | None = None):
+        return self._derive({
+            key: val.by_mtime(start, end) for key, val in self.data.items()
+        })
+
+    def recent(self, days=5):
+        return self._derive({
+            key: val.recent(days) for key, val in self.data.items()
+        })
     
     # ----------------------------------
     # Filesize related alias
-    def large_files(self):
-        pass
-
-    def small_files(self):
-        pass
+    def by_size(self, lower_bound: int | None = None, upper_bound: int | None = None):
+        return self._derive({
+            key: val.by_size(lower_bound, upper_bound) for key, val in self.data.items()
+        })
+
+    def large_files(self, lower_bound: int | None = None):
+        return self._derive({
+            key: val.large_files(lower_bound) for key, val in self.data.items()
+        })
+
+    def small_files(self, upper_bound: int | None = None):
+        return self._derive({
+            key: val.small_files(upper_bound) for key, val in self.data.items()
+        })
+
+    def top(self, n: int = 10, attr: SortAttr = SortAttr.SIZE, reverse: bool = True):
+        """Return the n files of all categories with the largest keys, see FileList.top"""
+        files = heapq.merge(
+            *(fl.top(n, attr, reverse).filelist for fl in self.data.values()),
+            key=key_func(attr), reverse=reverse)
+        return FileList(filelist=list(islice(files, n)), root=self.cwd)
+
+    def sample(self, n: int = 10, seed: int | None = None):
+        """Return n files of all categories picked uniformly at random, in a single pass"""
+        files = reservoir_sample(
+            (f for fl in self.data.values() for f in fl.filelist), n, Random(seed))
+        return FileList(filelist=files, root=self.cwd)
 
     # ----------------------------------
-    def probe(self, force: bool = False, verbose: bool = False):
-        for fl in self.data.values():
-            fl.probe(force=force, verbose=verbose)
+    def probe(self, force: bool = False, verbose: bool = False,
+              concurrent: bool = False, workers: int | None = None,
+              checkpoint_interval: float | None = 60.):
+        """Probe all files
+
+        With concurrent=True, all categories are scheduled in one ProbeOrchestrator,
+        so that the per-device limits hold across the whole root.
+
+        The results are checkpointed to the cache every checkpoint_interval
+        seconds and when probing stops, even on an interrupt, so that a re-run
+        skips the files already done. None disables the checkpoints.
+        """
+        with self._checkpointing(checkpoint_interval) as on_probed:
+            if not concurrent:
+                for fl in self.data.values():
+                    fl.probe(force=force, verbose=verbose, on_probed=on_probed)
+            else:
+                from .orchestrator import probe_files
+
+                try:
+                    probe_files((f for fl in self.data.values() for f in fl.filelist),
+                                force=force, workers=workers, on_probed=on_probed)
+                finally:
+                    for fl in self.data.values():
+                        fl._reindex()
+
+    def verify(self, force: bool = False, workers: int | None = None,
+               device_limits: dict[str, int] | None = None,
+               checkpoint_interval: float | None = 60.) -> int:
+        """Fully decode the media files to find the corrupted ones, return how many failed
+
+        All categories share one VerifyOrchestrator, so the per-device limits
+        hold across the root. The results are stored in the cache and
+        checkpointed like probe(), a re-run skips the unchanged files.
+        """
+        from .orchestrator import verify_files
+
+        with self._checkpointing(checkpoint_interval) as on_verified:
+            try:
+                ret = verify_files((f for fl in self.data.values() for f in fl.filelist),
+                                   force=force, workers=workers, device_limits=device_limits,
+                                   on_probed=on_verified)
+            finally:
+                for fl in self.data.values():
+                    fl._reindex()
+
+        print(f'Verified {ret.verified_count} files ({ret.skipped} unchanged, {ret.unverified} not verified),'
+              f' {colored(ret.errors, "red" if ret.errors else "green")} with errors')
+        return ret.errors
+
+    @contextlib.contextmanager
+    def _checkpointing(self, checkpoint_interval: float | None):
+        """Yield the callback run after each finished file, which checkpoints the files
+
+        They are appended to the cache journal every checkpoint_interval seconds
+        and on exit, even on an interrupt. None disables the checkpoints.
+        """
+        pending = []
+        last_flush = time.monotonic()
+
+        def on_done(f):
+            nonlocal last_flush
+            if checkpoint_interval is None:  return
+
+            pending.append(f)
+            if time.monotonic() - last_flush >= checkpoint_interval:
+                self.checkpoint(pending)
+                pending.clear()
+                last_flush = time.monotonic()
+
+        try:
+            yield on_done
+        finally:
+            if checkpoint_interval is not None:
+                self.checkpoint(pending)
+                ProbeCache.shared().save()
     
     @property
     def probed(self):
-        return self.__class__(
-            self.cwd,
-            managed_data={
-                key: val.probed for key, val in self.data.items()
-            })
+        return self._derive({
+            key: val.probed for key, val in self.data.items()
+        })
 
     @property
     def unprobed(self):
-        return self.__class__(
-            self.cwd,
-            managed_data={
-                key: val.unprobed for key, val in self.data.items()
-            })
+        return self._derive({
+            key: val.unprobed for key, val in self.data.items()
+        })
 
     # ----------------------------------
-    def organize(self, verbose=False, dry_run=False):
+    def organize(self, verbose=False, dry_run=False) -> int:
+        """Organize every category, return the number of planned (dry_run) or moved files"""
         if dry_run:
-            self._organize(verbose=verbose, dry_run=dry_run)
-        else:
-            self._organize_with_confirm(verbose=verbose, dry_run=dry_run)
+            return self._organize(verbose=verbose, dry_run=dry_run)
+        return self._organize_with_confirm(verbose=verbose, dry_run=dry_run) or 0
 
-    def _organize(self, verbose=False, dry_run=False):
-        for fl in self.data.values():
-            fl.organize(verbose=verbose, dry_run=dry_run)
+    def _organize(self, verbose=False, dry_run=False) -> int:
+        count = sum(fl.organize(verbose=verbose, dry_run=dry_run) for fl in self.data.values())
 
         if not dry_run:
             self.save_cache_with_confirm()
+        return count
 
     @need_confirm('Are you sure to organize all files automatically?')
     def _organize_with_confirm(self, verbose=False, dry_run=False):
@@ -286,15 +542,94 @@ class ManagerBase(abc.ABC):
         if not dry_run:
             self.save_cache_with_confirm()
 
+    @property
+    def broken(self):
+        return self._derive({
+            key: val.broken for key, val in self.data.items()
+        })
+
+    def quarantine_broken(self, verbose=False, dry_run=False) -> int:
+        """Move the broken files of every category into their broken folder, see FileList.quarantine_broken"""
+        count = sum(fl.quarantine_broken(verbose=verbose, dry_run=dry_run) for fl in self.data.values())
+        if count and not dry_run:
+            self.save_cache_with_confirm()
+        return count
+
+    def broken_report(self, show: bool = True) -> list[dict]:
+        """Return (and print) the broken files of every category with their probe error"""
+        return [row for fl in self.data.values() for row in fl.broken_report(show=show)]
+
     # ----------------------------------
+    @property
+    def stats(self) -> dict:
+        """Return the file count and total size, overall and per category, the broken files apart"""
+        cats = {cat.name: fl.stats for cat, fl in self.data.items()}
+        return {
+            'root': self.cwd,
+            'count': sum(s['count'] for s in cats.values()),
+            'size': sum(s['size'] for s in cats.values()),
+            'broken': sum(s['broken']['count'] for s in cats.values()),
+            'categories': cats
+        }
+
+    def du(self, folder: str = '.', depth: int | None = 1, show: bool = True) -> list[dict]:
+        """Report the file count, size, duration, unprobed and broken files of each folder
+
+        Served from the folder aggregates kept by each file list, so the whole
+        tree is covered in a single pass over the folders, not the files. Rows
+        are the given folder (relative to the root) and its subfolders down to
+        depth levels (all of them with depth=None), largest first.
+        """
+        base = os.path.normpath(os.path.join(self.cwd, folder))
+        prefix = base.rstrip(os.sep) + os.sep
+
+        rows: dict[str, dict] = {}
+        for cat, fl in self.data.items():
+            for k, (count, size, duration, probed, broken) in fl._folder_stats.items():
+                if k != base and not k.startswith(prefix):  continue
+                rel = k[len(prefix):] if k != base else '.'
+                if depth is not None and rel != '.' and rel.count(os.sep) >= depth:  continue
+
+                row = rows.get(rel)
+                if row is None:
+                    row = rows[rel] = {'folder': rel, 'count': 0, 'size': 0, 'duration': 0.,
+                                       'unprobed': 0, 'broken': 0, 'categories': {}}
+                row['count'] += count
+                row['size'] += size
+                row['duration'] += duration
+                row['unprobed'] += count - probed
+                row['broken'] += broken
+                row['categories'][cat.name] = count
+
+        ret = sorted(rows.values(), key=lambda row: row['size'], reverse=True)
+        if show:  self._print_du(ret)
+        return ret
+
+    @staticmethod
+    def _print_du(rows: list[dict]):
+        from tabulate import tabulate
+
+        cats = [cat.name for cat in Category if any(cat.name in row['categories'] for row in rows)]
+        print(tabulate(
+            [[row['folder'], *(row['categories'].get(cat, 0) for cat in cats), row['count'],
+              get_readable_filesize(row['size']).strip(),
+              parse_sec_to_str(row['duration']) if row['duration'] else '',
+              row['unprobed'], row['broken']]
+             for row in rows],
+            headers=['Folder', *cats, 'Files', 'Size', 'Duration', 'Unprobed', 'Broken']))
+
+    def duplicates(self, verify: bool = True) -> list[list]:
+        """Return the groups of files with the same content, see find_duplicates"""
+        return find_duplicates((f for fl in self.data.values() for f in fl.filelist), verify=verify)
+
     def summary(self, cat: Category | None = None):
         if cat is None:
-            _tot_len = 0
             for fl in self.data.values():
                 fl.summary()
-                _tot_len += len(fl)
+            stats = self.stats
             print('---------------')
-            print(f"Total file counts: {_tot_len}")
+            print(f"Total file counts: {stats['count']} [{get_readable_filesize(stats['size']).strip()}]"
+                  + (f", {stats['broken']} broken" if stats['broken'] else ''))
         else:
             self.data[cat].summary()
 
@@ -303,12 +638,7 @@ class Manager(ManagerBase):
 
     def _init_data(self):
         return {
-            Category.VIDEO: VideoFileList(),
-            Category.IMAGE: ImageFileList(),
-            Category.AUDIO: AudioFileList(),
-            Category.TXT: DocFileList(),
-            Category.ZIP: CompressedFileList(),
-            Category.NA: FileList()
+            cat: registry.filelist_type(cat)(root=self.cwd) for cat in Category
         }
 
     # Category alias
@@ -0,0 +1,415 @@
+#!/usr/bin/python3
+
+import os
+import json
+import asyncio
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable
+
+from termcolor import colored
+
+from .files import File
+from .probe_cache import fingerprint
+from .utils import tqdm
+
+
+# Concurrent probes allowed on a single device, by device kind
+DEVICE_LIMITS = {
+    'ssd': 16,
+    'hdd': 2,
+    'network': 4,
+}
+
+# Concurrent full decodes allowed on a single device, they are CPU bound and read whole files
+VERIFY_DEVICE_LIMITS = {
+    'ssd': os.cpu_count() or 1,
+    'hdd': 1,
+    'network': 2,
+}
+
+# Error output of a probe or a decode kept for the report
+ERROR_OUTPUT_LIMIT = 4096
+
+# Estimated peak memory of the probes in flight, see File._probe_cost()
+MEMORY_BUDGET = 512 * 1024 ** 2
+
+NETWORK_FS = {
+    'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', '9p', 'afs', 'ceph', 'glusterfs',
+    'fuse.sshfs', 'fuse.rclone', 'davfs', 'fuse.davfs2',
+}
+
+
+# ----------------------------------
+def _read_mounts() -> list[tuple[str, str]]:
+    """Return (mount point, fs type) of the mounted file systems, longest first"""
+    try:
+        with open('/proc/mounts') as fp:
+            mounts = [line.split()[1:3] for line in fp if line.strip()]
+    except OSError:
+        return []
+
+    mounts = [(point.replace('\\040', ' '), fstype) for point, fstype in mounts]
+    return sorted(mounts, key=lambda x: len(x[0]), reverse=True)
+
+
+def _is_rotational(st_dev: int) -> bool | None:
+    """Read the rotational flag of the block device, None if unknown"""
+    base = f'/sys/dev/block/{os.major(st_dev)}:{os.minor(st_dev)}'
+
+    # A partition has no queue of its own, it is found on the parent disk
+    for path in (os.path.join(base, 'queue', 'rotational'),
+                 os.path.join(base, '..', 'queue', 'rotational')):
+        try:
+            with open(path) as fp:
+                return fp.read().strip() == '1'
+        except OSError:
+            continue
+    return None
+
+
+def device_kind(path: str, mounts: list[tuple[str, str]] | None = None) -> str:
+    """Guess if the path is on a network share, an HDD or an SSD
+
+    Unknown devices (tmpfs, overlay, ...) are treated as SSD.
+    """
+    if mounts is None:  mounts = _read_mounts()
+
+    path = os.path.abspath(path)
+    for point, fstype in mounts:
+        if path == point or path.startswith(os.path.join(point, '')):
+            if fstype in NETWORK_FS:  return 'network'
+            break
+
+    if _is_rotational(os.stat(path).st_dev):
+        return 'hdd'
+    return 'ssd'
+
+
+async def _read_capped(stream: asyncio.StreamReader, limit: int) -> bytes:
+    """Read the stream to the end so that the process never blocks, keep only its head"""
+    buf = bytearray()
+    while chunk := await stream.read(64 * 1024):
+        buf += chunk[:limit - len(buf)]
+    return bytes(buf)
+
+
+# ----------------------------------
+class MemoryBudget():
+    """Byte-weighted semaphore, a request larger than the budget waits for an idle pipeline"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._cond = asyncio.Condition()
+
+    @contextlib.asynccontextmanager
+    async def reserve(self, nbytes: int):
+        nbytes = min(nbytes, self.limit)
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.used + nbytes <= self.limit)
+            self.used += nbytes
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self.used -= nbytes
+                self._cond.notify_all()
+
+
+class ProbeOrchestrator():
+    """Probe files concurrently from an asyncio loop
+
+    ffprobe runs as async subprocesses, and the in-process probes (e.g. image
+    analysis) are handed to an executor. Each device gets its own concurrency
+    limit according to its kind, and at most `window` files are in flight so
+    memory stays bounded on large lists. On interruption the running probes
+    are cancelled, and the files finished so far keep their results.
+
+    Memory is bounded by `memory_budget`: each probe reserves its estimated
+    peak (decoded image, ffprobe output) before it starts, and the ffprobe
+    output is only requested for the parsed fields and capped in size. Files
+    with the same content are served by the probe cache, see File.probe().
+
+    If ffprobe could not be started at all (e.g. not installed), this is
+    warned about once, no more files are scheduled, and the files are left
+    unprobed rather than marked broken.
+    """
+
+    def __init__(self,
+                 files: Iterable[File],
+                 *,
+                 force: bool = False,
+                 workers: int | None = None,
+                 device_limits: dict[str, int] | None = None,
+                 window: int | None = None,
+                 memory_budget: int = MEMORY_BUDGET,
+                 on_probed: Callable[[File], None] | None = None,
+                 desc: str = 'Probing metadata'):
+
+        self.files = [f for f in files if force or not f.probed]
+        self.force = force
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.device_limits = {**DEVICE_LIMITS, **(device_limits or {})}
+        self.window = window or 4 * max(self.device_limits.values())
+        self.memory_budget = memory_budget
+        self.on_probed = on_probed
+        self.desc = desc
+
+        self.done = 0
+        self.failed = 0
+
+        # Files left unprobed as the prober could not be run
+        self.unprobed = 0
+        self.launch_error: str | None = None
+
+        self._mounts = _read_mounts()
+        self._devices: dict[int, asyncio.Semaphore] = {}
+        self._kinds: dict[int, str] = {}
+
+    def _semaphore(self, f: File) -> asyncio.Semaphore:
+        try:
+            st_dev = os.stat(f.path).st_dev
+        except OSError:
+            st_dev = -1
+
+        if st_dev not in self._devices:
+            kind = 'ssd' if st_dev == -1 else device_kind(f.path, self._mounts)
+            self._kinds[st_dev] = kind
+            self._devices[st_dev] = asyncio.Semaphore(self.device_limits[kind])
+        return self._devices[st_dev]
+
+    def run(self) -> int:
+        """Probe all files, return the number of probed ones"""
+        if not self.files:
+            return 0
+
+        try:
+            asyncio.run(self._run())
+        except KeyboardInterrupt:
+            print(colored(f'{self.desc} interrupted, {self.done} of {len(self.files)} files done', 'yellow'))
+
+        return self.done - self.unprobed
+
+    def _leave(self, n: int = 1):
+        """Count files finished without being probed, as the prober could not be run"""
+        self.unprobed += n
+
+    def _on_launch_error(self, e: OSError, tool: str, state: str):
+        """Keep the first error of starting the external tool, and warn about it once"""
+        if self.launch_error is None:
+            self.launch_error = f'{type(e).__name__}: {e}'
+            print(colored(f'Warning: could not run {tool} ({self.launch_error}),'
+                          f' the files are left {state}', 'yellow'))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        window = asyncio.Semaphore(self.window)
+        self._budget = MemoryBudget(self.memory_budget)
+        tasks: dict[asyncio.Task, File] = {}
+
+        pbar = tqdm(total=len(self.files), desc=self.desc)
+
+        def _on_done(task):
+            f = tasks.pop(task)
+            window.release()
+            if task.cancelled():
+                self.failed += 1
+            elif (exc := task.exception()) is not None:
+                self.failed += 1
+                print(f'Warning: {self.desc} failed with {exc!r}')
+            else:
+                self.done += 1
+                if self.on_probed is not None:  self.on_probed(f)
+            pbar.update()
+            pbar.set_postfix(inflight=len(tasks), failed=self.failed,
+                             mem=f'{self._budget.used >> 20}M', refresh=False)
+
+        try:
+            for i, f in enumerate(self.files):
+                # Backpressure: wait for a slot before scheduling the next file
+                await window.acquire()
+                if self.launch_error is not None:
+                    # The files left are finished as they are
+                    window.release()
+                    self.done += len(self.files) - i
+                    self._leave(len(self.files) - i)
+                    pbar.update(len(self.files) - i)
+                    break
+                task = asyncio.create_task(self._run_one(f, loop, executor))
+                tasks[task] = f
+                task.add_done_callback(_on_done)
+
+            while tasks:
+                await asyncio.wait(set(tasks))
+        finally:
+            for task in list(tasks):
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*list(tasks), return_exceptions=True)
+            executor.shutdown(wait=False, cancel_futures=True)
+            pbar.close()
+
+    async def _run_one(self, f: File, loop, executor):
+        async with self._semaphore(f), self._budget.reserve(f._probe_cost()):
+            args = f._probe_args()
+            if args is None:
+                await loop.run_in_executor(executor, f.probe, self.force)
+                return
+
+            # Same steps as File.probe(), with ffprobe awaited instead of blocking
+            if not self.force and await loop.run_in_executor(executor, f._load_probe_result):
+                f._dirty = True
+                return
+
+            if self.launch_error is not None:
+                self._leave()
+                return
+            try:
+                probe, error = await self._run_ffprobe(args, getattr(f, '_probe_payload_limit', None))
+            except OSError as e:
+                # Not the file's fault, nothing is recorded
+                self._on_launch_error(e, 'ffprobe', 'unprobed')
+                self._leave()
+                return
+
+            f._dirty = True
+            f._apply_probe_info(probe, error)
+            await loop.run_in_executor(executor, f._save_probe_result)
+
+    @staticmethod
+    async def _run_ffprobe(args: list[str], limit: int | None = None) -> tuple[dict | None, str | None]:
+        """Run ffprobe and parse its json output, return (None, error) if it failed or the output exceeds limit
+
+        The error is the last line of the ffprobe error output, as File._error_snippet.
+        Raises OSError if ffprobe could not be started.
+        """
+        proc = await asyncio.create_subprocess_exec(
+            *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+
+        stderr = asyncio.create_task(_read_capped(proc.stderr, ERROR_OUTPUT_LIMIT))
+        try:
+            out = bytearray()
+            while chunk := await proc.stdout.read(64 * 1024):
+                out += chunk
+                if limit is not None and len(out) > limit:
+                    proc.kill()
+                    break
+            err = await stderr
+            await proc.wait()
+        except asyncio.CancelledError:
+            stderr.cancel()
+            proc.kill()
+            await proc.wait()
+            raise
+
+        if limit is not None and len(out) > limit:
+            return None, f'ffprobe output over {limit} bytes'
+        if proc.returncode != 0:
+            return None, File._error_snippet(err) or f'ffprobe exited with code {proc.returncode}'
+        try:
+            return json.loads(out), None
+        except ValueError:
+            return None, 'invalid ffprobe output'
+
+
+def probe_files(files: Iterable[File], **kwargs) -> int:
+    """Shortcut of ProbeOrchestrator(files, **kwargs).run()"""
+    return ProbeOrchestrator(files, **kwargs).run()
+
+
+# ----------------------------------
+class VerifyOrchestrator(ProbeOrchestrator):
+    """Fully decode files with ffmpeg to find the truncated or corrupted ones
+
+    Runs with the same per-device limits and backpressure as the probes,
+    from VERIFY_DEVICE_LIMITS by default. A file whose content fingerprint
+    matches the last verified one is skipped unless force=True.
+    """
+
+    def __init__(self,
+                 files: Iterable[File],
+                 *,
+                 force: bool = False,
+                 device_limits: dict[str, int] | None = None,
+                 desc: str = 'Verifying media',
+                 **kwargs):
+        # Every file is scheduled, the unchanged ones are told apart by their fingerprint
+        super().__init__((f for f in files if f._verify_args() is not None), force=True,
+                         device_limits={**VERIFY_DEVICE_LIMITS, **(device_limits or {})},
+                         desc=desc, **kwargs)
+        self.force = force
+        self.skipped = 0
+        self.errors = 0
+
+        # Files left as they were, unreadable or not decoded as ffmpeg could not be run
+        self.unverified = 0
+
+    async def _run_one(self, f: File, loop, executor):
+        async with self._semaphore(f):
+            if self.launch_error is not None:
+                self.unverified += 1
+                return
+
+            try:
+                fp = await loop.run_in_executor(executor, fingerprint, f.path)
+            except OSError:
+                self.unverified += 1
+                return
+
+            if not self.force and f.verified == fp:
+                self.skipped += 1
+                return
+
+            try:
+                error = await self._run_decode(f._verify_args())
+            except OSError as e:
+                # Not the file's fault, e.g. no ffmpeg installed, nothing is recorded
+                self._on_launch_error(e, 'the decoder', 'unverified')
+                self.unverified += 1
+                return
+
+            if error is not None:  self.errors += 1
+            f._apply_verify_result(fp, error)
+
+    def _leave(self, n: int = 1):
+        self.unverified += n
+
+    @property
+    def verified_count(self) -> int:
+        """Files actually decoded by this run"""
+        return self.done - self.skipped - self.unverified
+
+    @staticmethod
+    async def _run_decode(args: list[str], limit: int = ERROR_OUTPUT_LIMIT) -> str | None:
+        """Run the decode, return its first error line, None if the file decoded cleanly
+
+        ffmpeg may exit with 0 on a corrupted stream, so any error output counts.
+        Raises OSError if ffmpeg could not be started.
+        """
+        proc = await asyncio.create_subprocess_exec(
+            *args, stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE)
+
+        try:
+            err = await _read_capped(proc.stderr, limit)
+            await proc.wait()
+        except asyncio.CancelledError:
+            proc.kill()
+            await proc.wait()
+            raise
+
+        lines = err.decode(errors='replace').strip().splitlines()
+        if lines:
+            return lines[0][:200]
+        if proc.returncode != 0:
+            return f'ffmpeg exited with code {proc.returncode}'
+        return None
+
+
+def verify_files(files: Iterable[File], **kwargs) -> VerifyOrchestrator:
+    """Verify the files, return the finished orchestrator with its counts"""
+    orchestrator = VerifyOrchestrator(files, **kwargs)
+    orchestrator.run()
+    return orchestrator
@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+
+import os
+import fcntl
+import pickle
+import hashlib
+import threading
+
+from .cache import CACHE_DIR, RootCache
+
+
+PROBE_CACHE_PKL = os.path.join(CACHE_DIR, 'probe.pkl')
+
+_SAMPLE_SIZE = 64 * 1024  # bytes hashed at both ends of the file
+
+
+def fingerprint(path: str, size: int | None = None) -> str:
+    """Return a content fingerprint from the size and the first / last blocks
+
+    Cheap enough to compute before a probe, and stable across renames, moves
+    and copies to other roots.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if size is None:  size = os.fstat(fd).st_size
+
+        h = hashlib.blake2b(str(size).encode(), digest_size=16)
+        h.update(os.pread(fd, _SAMPLE_SIZE, 0))
+        if size > _SAMPLE_SIZE:
+            h.update(os.pread(fd, _SAMPLE_SIZE, max(_SAMPLE_SIZE, size - _SAMPLE_SIZE)))
+    finally:
+        os.close(fd)
+
+    return f'{size}-{h.hexdigest()}'
+
+
+class ProbeCache():
+    """Probe results keyed by content fingerprint, shared by every root"""
+
+    _shared: 'ProbeCache | None' = None
+    _lock = threading.Lock()
+
+    def __init__(self, path: str = PROBE_CACHE_PKL):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        self.dirty = False
+
+        if RootCache.backend != 'none':
+            self.entries = self._read()
+
+    def _read(self) -> dict[str, dict]:
+        if not os.path.isfile(self.path):
+            return {}
+        with open(self.path, 'rb') as f:
+            return pickle.load(f)
+
+    @classmethod
+    def shared(cls) -> 'ProbeCache':
+        """Return the process-wide probe cache, loaded on first use"""
+        with cls._lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, fp: str) -> dict | None:
+        return self.entries.get(fp)
+
+    def put(self, fp: str, result: dict):
+        with self._lock:
+            self.entries[fp] = result
+            self.dirty = True
+
+    def save(self):
+        """Merge the entries into the file, which other processes may have updated meanwhile
+
+        The file is re-read and replaced under an exclusive lock, so that the
+        results saved by another root or process since it was loaded are kept.
+        """
+        if not self.dirty or RootCache.backend == 'none':
+            return
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._lock, open(self.path + '.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                entries = self._read()
+                entries.update(self.entries)
+                self.entries = entries
+
+                tmp_path = self.path + f'.{os.getpid()}.tmp'
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(self.entries, f)
+                os.replace(tmp_path, self.path)
+                self.dirty = False
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+
+import re
+import copy
+import fnmatch
+import datetime as dt
+from enum import Enum
+from typing import Callable
+
+from .enums import Category, MediaLengthType, Orientation, ImageType
+
+
+class Query():
+    """Combined predicates to select files, planned against the FileList indexes
+
+    Ranges are given as (lo, hi) tuples with both ends inclusive, and either end
+    could be None to leave it open. Enum predicates accept a single member or
+    an iterable of members. All predicates must match.
+    """
+
+    def __init__(self,
+                 *,
+                 category: None | Category | list[Category] = None,
+                 mdate: None | dt.date | tuple[dt.date | None, dt.date | None] = None,
+                 size: None | tuple[int | None, int | None] = None,
+                 duration: None | tuple[float | None, float | None] = None,
+                 length_type: None | MediaLengthType | list[MediaLengthType] = None,
+                 orientation: None | Orientation | list[Orientation] = None,
+                 image_type: None | ImageType | list[ImageType] = None,
+                 folder: None | str = None,
+                 name: None | str = None):
+
+        self.category = self._as_set(category)
+        self.mdate = (mdate, mdate) if isinstance(mdate, dt.date) else mdate
+        self.size = size
+        self.duration = duration
+        self.enums = {
+            attr: self._as_set(val) for attr, val in (
+                ('length_type', length_type),
+                ('orientation', orientation),
+                ('image_type', image_type))
+            if val is not None
+        }
+        self.folder = folder
+        self.name = name
+        self._name_match = re.compile(fnmatch.translate(name)).match if name else None
+
+    @staticmethod
+    def _as_set(val):
+        if val is None:  return None
+        return {val} if isinstance(val, Enum) else set(val)
+
+    @staticmethod
+    def _in_range(val, _range):
+        lo, hi = _range
+        if val is None:  return False
+        return (lo is None or val >= lo) and (hi is None or val <= hi)
+
+    def with_folder(self, folder: str):
+        """Return a copy with the folder prefix replaced"""
+        ret = copy.copy(self)
+        ret.folder = folder
+        return ret
+
+    # ----------------------------------
+    def match(self, f) -> bool:
+        """Check a single file against all predicates"""
+        if self.category is not None and f.cat not in self.category:
+            return False
+        if self.mdate is not None and not self._in_range(f.mdate, self.mdate):
+            return False
+        if self.size is not None and not self._in_range(f.size, self.size):
+            return False
+        if self.duration is not None and not self._in_range(getattr(f, 'duration', None), self.duration):
+            return False
+        for attr, vals in self.enums.items():
+            if getattr(f, attr, None) not in vals:
+                return False
+        if self.folder is not None and not f.path.startswith(self.folder):
+            return False
+        if self._name_match is not None and not self._name_match(f.name):
+            return False
+        return True
+
+    def _mtime_range(self):
+        lo, hi = self.mdate
+        return (None if lo is None else dt.datetime.combine(lo, dt.time.min),
+                None if hi is None else dt.datetime.combine(hi, dt.time.max))
+
+    def _candidates(self, fl) -> list[tuple[str, int, Callable[[], list]]]:
+        """Return (name, count, getter) of the candidates given by each indexed predicate
+
+        Counts are cheap to get (bucket sizes or bisect), the candidate list is
+        only built for the chosen one.
+        """
+        indexes = fl._indexes()
+        range_indexes = fl._range_indexes()
+        ret = []
+
+        def _from_range(index, lo, hi):
+            return index.count(lo, hi), lambda: index.range(lo, hi)
+
+        def _from_buckets(buckets):
+            def getter():
+                files = []
+                for bucket in buckets:
+                    files += bucket
+                return files
+            return sum(len(b) for b in buckets), getter
+
+        if self.mdate is not None and 'mtime' in range_indexes:
+            ret.append(('mtime', *_from_range(range_indexes['mtime'], *self._mtime_range())))
+        elif self.mdate is not None and 'mdate' in indexes:
+            ret.append(('mdate', *_from_buckets(
+                [files for mdate, files in sorted(indexes['mdate'].items())
+                 if self._in_range(mdate, self.mdate)])))
+
+        for attr in ('size', 'duration'):
+            _range = getattr(self, attr)
+            if _range is not None and attr in range_indexes:
+                ret.append((attr, *_from_range(range_indexes[attr], *_range)))
+
+        for attr, vals in self.enums.items():
+            if attr in indexes:
+                ret.append((attr, *_from_buckets(
+                    [indexes[attr].get(val, []) for val in vals])))
+            else:
+                # The list does not hold this attribute at all
+                ret.append((attr, 0, list))
+
+        return ret
+
+    def plan(self, fl) -> tuple[str, list]:
+        """Choose the most selective index to drive the scan
+
+        The other predicates are checked on each row of the driver, which is
+        cheaper than materializing and intersecting the larger candidate sets.
+        """
+        if self.category is not None and fl._category not in self.category:
+            return 'category', []
+
+        candidates = self._candidates(fl)
+        if not candidates:
+            return 'scan', fl.filelist
+
+        name, _, getter = min(candidates, key=lambda x: x[1])
+        return name, getter()
+
+    def run(self, fl):
+        """Return a new list of the same type with the matching files"""
+        _, rows = self.plan(fl)
+        return fl._new([f for f in rows if self.match(f)])
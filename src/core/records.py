@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+
+import os
+import json
+import struct
+import datetime as dt
+from typing import Iterable, Iterator
+
+from .enums import Category, MediaLengthType, Orientation, ImageType
+
+
+# Bumped whenever the layout below changes, older records are then refused
+RECORD_VERSION = 1
+
+# Fixed fields of the fstat dict, as plain ints and as timestamps
+STAT_INTS = ('st_size', 'st_mode', 'st_ino', 'st_dev', 'st_nlink', 'st_uid', 'st_gid',
+             'st_rdev', 'st_blksize', 'st_blocks')
+STAT_TIMES = ('st_mtime', 'st_atime', 'st_ctime', 'st_mtime_ns', 'st_atime_ns', 'st_ctime_ns')
+
+# Fixed File attributes, enums are stored as their declaration index
+ENUM_ATTRS = {
+    'cat': Category,
+    'length_type': MediaLengthType,
+    'orientation': Orientation,
+    'image_type': ImageType,
+}
+ATTRS: tuple[tuple[str, str], ...] = (
+    ('probed', '?'),
+    ('broken', '?'),
+    ('duration', 'd'),
+    ('width', 'q'),
+    ('height', 'q'),
+    ('_image_type_prob', 'd'),
+    *((k, 'B') for k in ENUM_ATTRS),
+)
+
+# version, presence mask, None mask, fixed fields, then the lengths of the
+# path, the fingerprint and the JSON extras which follow the fixed part
+_RECORD = struct.Struct('<BII' + 'Q' * len(STAT_INTS) + 'd' * len(STAT_TIMES)
+                        + ''.join(code for _, code in ATTRS) + 'III')
+
+# Bit of each field in the masks, fstat fields first
+_STAT_KEYS = STAT_INTS + STAT_TIMES
+_N_INTS = len(STAT_INTS)
+_N_STATS = len(_STAT_KEYS)
+_STAT_MASK = (1 << _N_STATS) - 1
+_FINGERPRINT_BIT = 1 << (_N_STATS + len(ATTRS))
+
+_members = {attr: list(enum) for attr, enum in ENUM_ATTRS.items()}
+_ordinals = {attr: {m.name: idx for idx, m in enumerate(enum)} for attr, enum in ENUM_ATTRS.items()}
+_ATTR_PLAN = [(1 << (_N_STATS + idx), k, _ordinals[k].__getitem__ if k in _ordinals else None)
+              for idx, (k, _) in enumerate(ATTRS)]
+_KNOWN_KEYS = {'path', 'name', 'fstat', 'fingerprint', *(k for k, _ in ATTRS)}
+_ABSENT = object()
+
+
+def encode(entry: dict) -> bytes:
+    """Pack a File.to_dict() entry into a record
+
+    The fixed fields are followed by the path, the fingerprint and the other
+    attributes (name if it differs from the basename, plugin attributes) as
+    JSON. Platform specific fstat keys not listed above are not kept.
+    """
+    fstat = entry.get('fstat') or {}
+    stats = [fstat.get(k) for k in _STAT_KEYS]
+    stats[_N_INTS:] = [None if t is None else t.timestamp() for t in stats[_N_INTS:]]
+    if None in stats:
+        # e.g. the entries rebuilt from an export only have the size and mtime
+        mask = sum(1 << idx for idx, v in enumerate(stats) if v is not None)
+        stats = [0 if v is None else v for v in stats]
+    else:
+        mask = _STAT_MASK
+
+    nulls = 0
+    attrs = []
+    for bit, k, conv in _ATTR_PLAN:
+        v = entry.get(k, _ABSENT)
+        if v is _ABSENT or v is None:
+            if v is None:
+                mask |= bit
+                nulls |= bit
+            attrs.append(0)
+            continue
+        mask |= bit
+        attrs.append(v if conv is None else conv(v))
+
+    fingerprint = b''
+    if 'fingerprint' in entry:
+        mask |= _FINGERPRINT_BIT
+        if entry['fingerprint'] is None:
+            nulls |= _FINGERPRINT_BIT
+        else:
+            fingerprint = entry['fingerprint'].encode()
+
+    extras = b''
+    if entry.keys() - _KNOWN_KEYS or entry.get('name') != entry['path'].rpartition(os.sep)[2]:
+        extras = {k: v for k, v in entry.items() if k not in _KNOWN_KEYS or k == 'name'}
+        extras = json.dumps(extras, separators=(',', ':')).encode()
+
+    path = entry['path'].encode()
+    return b''.join((
+        _RECORD.pack(RECORD_VERSION, mask, nulls, *stats, *attrs,
+                     len(path), len(fingerprint), len(extras)),
+        path, fingerprint, extras
+    ))
+
+
+def _decode_from(data, offset: int) -> tuple[dict, int]:
+    version, mask, nulls, *values, path_len, fp_len, extras_len = _RECORD.unpack_from(data, offset)
+    if version != RECORD_VERSION:
+        raise ValueError(f'Unsupported record version {version}, expected {RECORD_VERSION}')
+
+    fromtimestamp = dt.datetime.fromtimestamp
+    stats = values[:_N_INTS] + [fromtimestamp(t) for t in values[_N_INTS:_N_STATS]]
+    if mask & _STAT_MASK == _STAT_MASK:
+        fstat = dict(zip(_STAT_KEYS, stats))
+    else:
+        fstat = {k: v for idx, (k, v) in enumerate(zip(_STAT_KEYS, stats)) if mask & (1 << idx)}
+
+    offset += _RECORD.size
+    path = bytes(data[offset:offset + path_len]).decode()
+    offset += path_len
+    entry = {'path': path, 'name': path.rpartition(os.sep)[2], 'fstat': fstat}
+
+    for (bit, k, conv), v in zip(_ATTR_PLAN, values[_N_STATS:]):
+        if not mask & bit:  continue
+        if nulls & bit:
+            v = None
+        elif conv is not None:
+            v = _members[k][v].name
+        entry[k] = v
+
+    if mask & _FINGERPRINT_BIT:
+        entry['fingerprint'] = (None if nulls & _FINGERPRINT_BIT
+                                else bytes(data[offset:offset + fp_len]).decode())
+    offset += fp_len
+
+    if extras_len:
+        entry.update(json.loads(bytes(data[offset:offset + extras_len])))
+        offset += extras_len
+    return entry, offset
+
+
+def decode(data: bytes) -> dict:
+    """Unpack a record back into its File.to_dict() entry"""
+    return _decode_from(data, 0)[0]
+
+
+# ----------------------------------
+def encode_batch(entries: Iterable[dict]) -> bytes:
+    """Pack the entries back to back, records are self-delimiting"""
+    return b''.join(map(encode, entries))
+
+
+def iter_decode(data: bytes) -> Iterator[dict]:
+    """Unpack the entries of encode_batch() one by one"""
+    view = memoryview(data)
+    offset = 0
+    while offset < len(view):
+        entry, offset = _decode_from(view, offset)
+        yield entry
+
+
+def decode_batch(data: bytes) -> list[dict]:
+    return list(iter_decode(data))
+
+
+def dumps_files(files: Iterable) -> bytes:
+    """Pack the files for another process, much smaller and faster than pickling them"""
+    return encode_batch(f.to_dict() for f in files)
+
+
+def loads_files(data: bytes) -> list:
+    """Rebuild the files of dumps_files(), each one with the File type of its category"""
+    from . import registry
+    return [registry.file_type(Category[entry['cat']]).from_dict(entry)
+            for entry in iter_decode(data)]
@@ -0,0 +1,103 @@
+#!/usr/bin/python3
+
+import os
+
+from .enums import Category, EXTENSIONS
+from .files import File, AudioFile, VideoFile, ImageFile
+from .filelists import FileList, AudioFileList, VideoFileList, ImageFileList
+from .filelists import DocFileList, CompressedFileList
+
+
+# The File / FileList types used for each category
+TYPES: dict[Category, tuple[type, type]] = {
+    Category.VIDEO: (VideoFile, VideoFileList),
+    Category.IMAGE: (ImageFile, ImageFileList),
+    Category.AUDIO: (AudioFile, AudioFileList),
+    Category.TXT: (File, DocFileList),
+    Category.ZIP: (File, CompressedFileList),
+    Category.NA: (File, FileList),
+}
+
+# Magic bytes of the formats listed in Category, as (offset, signature, category)
+SIGNATURES: list[tuple[int, bytes, Category]] = [
+    (0, b'\xff\xd8\xff', Category.IMAGE),  # jpeg
+    (0, b'\x89PNG\r\n\x1a\n', Category.IMAGE),
+    (0, b'GIF87a', Category.IMAGE),
+    (0, b'GIF89a', Category.IMAGE),
+    (4, b'ftyp', Category.VIDEO),  # mp4 / m4v / mov
+    (4, b'moov', Category.VIDEO),  # old mov
+    (0, b'\x1a\x45\xdf\xa3', Category.VIDEO),  # mkv
+    (0, b'\x30\x26\xb2\x75\x8e\x66\xcf\x11', Category.VIDEO),  # asf / wmv
+    (0, b'.RMF', Category.VIDEO),  # rm
+    (0, b'ID3', Category.AUDIO),  # mp3 with id3 tag
+    (0, b'\xff\xfb', Category.AUDIO),  # mp3 frame sync
+    (0, b'\xff\xf3', Category.AUDIO),
+    (0, b'\xff\xf2', Category.AUDIO),
+    (0, b'%PDF', Category.TXT),
+    (0, b'PK\x03\x04', Category.ZIP),
+    (0, b'Rar!\x1a\x07', Category.ZIP),
+    (0, b'7z\xbc\xaf\x27\x1c', Category.ZIP),
+]
+
+
+def register(category: Category,
+             extensions: list[str] = [],
+             file_type: type | None = None,
+             filelist_type: type | None = None):
+    """Map more extensions to a category, or change the types used for it"""
+    for ext in extensions:
+        ext = ext.lower()
+        EXTENSIONS[ext if ext.startswith('.') else '.' + ext] = category
+
+    _file_type, _filelist_type = TYPES[category]
+    if file_type is not None and filelist_type is None:
+        # FileLists create their files from their _file_type
+        filelist_type = type(_filelist_type.__name__, (_filelist_type,), {'_file_type': file_type})
+
+    TYPES[category] = (file_type or _file_type, filelist_type or _filelist_type)
+
+
+def register_signature(signature: bytes, category: Category, offset: int = 0):
+    SIGNATURES.append((offset, signature, category))
+
+
+def file_type(category: Category) -> type:
+    return TYPES[category][0]
+
+
+def filelist_type(category: Category) -> type:
+    return TYPES[category][1]
+
+
+def sniff_header(header: bytes) -> Category:
+    """Match the first bytes of a file against the known signatures"""
+    for offset, signature, category in SIGNATURES:
+        if header.startswith(signature, offset):
+            return category
+    return Category.NA
+
+
+def header_size() -> int:
+    return max(offset + len(signature) for offset, signature, _ in SIGNATURES)
+
+
+def sniff(path: str) -> Category:
+    """Guess the category from the content of the file"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(header_size())
+    except OSError:
+        return Category.NA
+    return sniff_header(header)
+
+
+def infer(path: str, sniff_extensionless: bool = False) -> Category:
+    """Infer the category from the extension, in a single dict lookup
+
+    Files without any extension could be sniffed from their magic bytes
+    """
+    name = os.path.basename(path)
+    _, ext = os.path.splitext(name)
+    if not ext and sniff_extensionless:
+        return sniff(path)
+    return EXTENSIONS.get(ext.lower(), Category.NA)
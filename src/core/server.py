@@ -0,0 +1,249 @@
+#!/usr/bin/python3
+
+import io
+import os
+import sys
+import json
+import socket
+import socketserver
+import contextlib
+import datetime as dt
+
+from termcolor import colored
+
+from .enums import Category, SortAttr, Orientation, MediaLengthType, ImageType
+
+
+SOCKET_PATH = os.path.join(os.environ['HOME'], '.cache', 'my-file-organizer', 'daemon.sock')
+
+# Filters allowed in a query, mapped to the converters of their (json) arguments
+# None means the filter is a property rather than a method
+FILTERS = {
+    'by_cat': (Category.__getitem__,),
+    'by_mdate': (dt.date.fromisoformat,),
+    'by_folder': (str,),
+    'by_orientation': (Orientation.__getitem__,),
+    'by_length_type': (MediaLengthType.__getitem__,),
+    'by_image_type': (ImageType.__getitem__,),
+    'recent': (int,),
+    'last_days': (int,),
+    'first_days': (int,),
+    'probed': None,
+    'unprobed': None,
+}
+
+
+class QueryError(Exception):
+    """Raised when a request cannot be served"""
+
+
+class TriageServer(socketserver.UnixStreamServer):
+    """Keep loaded Managers in memory and serve queries over a Unix socket
+
+    Each request / response is a single line of json. Requests are served one
+    at a time, as the Managers are not meant to be shared between threads.
+    """
+
+    def __init__(self, socket_path: str = SOCKET_PATH, recursive: bool = False):
+
+        from .manager import Manager  # deferred so that the client stays light
+
+        self.manager_cls = Manager
+        self.managers = {}
+        self.recursive = recursive
+        self.stopped = False
+
+        os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+        super().__init__(socket_path, TriageRequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+    # ----------------------------------
+    def load(self, root: str, recursive: bool | None = None, reload: bool = False):
+        root = os.path.abspath(root)
+        if reload or root not in self.managers:
+            self.managers[root] = self.manager_cls(
+                folder=root,
+                recursive=self.recursive if recursive is None else recursive,
+                auto_probe=False,
+                chdir=False)
+        return self.managers[root]
+
+    def dispatch(self, request: dict):
+        op = request.get('op')
+
+        if op == 'ping':
+            return {}
+        elif op == 'roots':
+            return {'roots': {root: len(m) for root, m in self.managers.items()}}
+        elif op == 'drop':
+            self.managers.pop(os.path.abspath(request['root']), None)
+            return {}
+        elif op == 'stop':
+            self.stopped = True
+            return {}
+        elif op in ('load', 'summary', 'details', 'organize'):
+            if not request.get('root'):
+                raise QueryError(f'Operation {op} needs a root folder')
+
+            manager = self.load(request['root'],
+                                recursive=request.get('recursive'),
+                                reload=request.get('reload', False) and op == 'load')
+
+            if op == 'load':
+                return {'count': len(manager)}
+
+            return self._run(op, manager, request)
+        else:
+            raise QueryError(f'Unknown operation {op}')
+
+    @staticmethod
+    def _apply_filters(target, filters: list):
+        for name, *args in filters:
+            if name not in FILTERS:
+                raise QueryError(f'Unknown filter {name}')
+            if not hasattr(target, name):
+                raise QueryError(f'Filter {name} is not supported on {target.__class__.__name__},'
+                                 ' select a category with by_cat first')
+
+            converters = FILTERS[name]
+            if converters is None:
+                target = getattr(target, name)
+            else:
+                if len(args) != len(converters):
+                    raise QueryError(f'Filter {name} expects {len(converters)} argument(s)')
+                target = getattr(target, name)(*(conv(arg) for conv, arg in zip(converters, args)))
+
+            if target is None:  # e.g. today() found nothing
+                raise QueryError(f'Filter {name} found no file')
+        return target
+
+    @staticmethod
+    def _apply_sort(target, attr: SortAttr):
+        """Return a sorted copy, the lists of the resident Manager keep their order for other clients"""
+        if hasattr(target, 'sort'):
+            return target._new(target.filelist).sort(attr)
+        return target._derive({key: fl._new(fl.filelist).sort(attr) for key, fl in target.data.items()})
+
+    def _run(self, op: str, manager, request: dict):
+        show_path = request.get('show_path', False)
+        color = request.get('color', True)
+
+        # Answer any prompt with its default choice, we are not attached to a terminal
+        stdin, sys.stdin = sys.stdin, io.StringIO('\n' * 64)
+        buf = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(buf):
+                target = self._apply_filters(manager, request.get('filters', []))
+                if request.get('sort'):
+                    target = self._apply_sort(target, SortAttr(request['sort']))
+
+                if op == 'summary':
+                    target.summary()
+                elif op == 'details':
+                    if hasattr(target, 'details'):
+                        target.details(show_path=show_path, color=color)
+                    else:
+                        for fl in target.data.values():
+                            if len(fl):  fl.details(show_path=show_path, color=color)
+                elif op == 'organize':
+                    # Only dry run is served, the real move should be done interactively
+                    target.organize(dry_run=True)
+        finally:
+            sys.stdin = stdin
+
+        return {'count': len(target), 'output': buf.getvalue()}
+
+
+class TriageRequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():  continue
+
+            try:
+                response = self.server.dispatch(json.loads(line))
+            except Exception as e:
+                # e.g. an unreadable root, the connection is kept for the next request
+                response = {'ok': False, 'error': f'{e.__class__.__name__}: {e}'}
+            else:
+                response['ok'] = True
+
+            self.wfile.write(json.dumps(response).encode() + b'\n')
+            self.wfile.flush()
+
+
+class TriageClient():
+    """Thin client to query a running TriageServer"""
+
+    def __init__(self, socket_path: str = SOCKET_PATH):
+        self.socket_path = socket_path
+        self._sock = None
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def connect(self):
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.connect(self.socket_path)
+            self._file = self._sock.makefile('rwb')
+
+    def close(self):
+        if self._sock is not None:
+            self._file.close()
+            self._sock.close()
+            self._sock = self._file = None
+
+    def request(self, op: str, **kwargs) -> dict:
+        self.connect()
+        self._file.write(json.dumps({'op': op, **kwargs}).encode() + b'\n')
+        self._file.flush()
+
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError('Connection closed by the triage server')
+        return json.loads(line)
+
+    # ----------------------------------
+    def load(self, root: str, recursive: bool | None = None, reload: bool = False):
+        return self.request('load', root=os.path.abspath(root), recursive=recursive, reload=reload)
+
+    def roots(self):
+        return self.request('roots')
+
+    def summary(self, root: str, filters: list = [], **kwargs):
+        return self.request('summary', root=os.path.abspath(root), filters=filters, **kwargs)
+
+    def details(self, root: str, filters: list = [], **kwargs):
+        return self.request('details', root=os.path.abspath(root), filters=filters, **kwargs)
+
+    def organize(self, root: str, filters: list = [], **kwargs):
+        return self.request('organize', root=os.path.abspath(root), filters=filters, **kwargs)
+
+    def stop(self):
+        return self.request('stop')
+
+
+def serve(socket_path: str = SOCKET_PATH, roots: list[str] = [], recursive: bool = False):
+    with TriageServer(socket_path, recursive=recursive) as server:
+        for root in roots:
+            print('Loading', colored(root, 'green'))
+            server.load(root)
+
+        print(f'Serving on {colored(socket_path, "green")}')
+        try:
+            while not server.stopped:
+                server.handle_request()
+        except KeyboardInterrupt:
+            pass
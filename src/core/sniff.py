@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator
+
+from .enums import Category
+from . import registry
+
+
+def read_header(path: str, size: int) -> bytes:
+    """Read the first bytes of a file, empty if it could not be read
+
+    A single pread is cheaper than mapping the file for such small reads
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return b''
+    try:
+        return os.pread(fd, size, 0)
+    except OSError:
+        return b''
+    finally:
+        os.close(fd)
+
+
+def read_headers(paths: Iterable[str], size: int, workers: int = 16) -> Iterator[bytes]:
+    """Read the headers of many files in a thread pool, in the order of paths"""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(lambda path: read_header(path, size), paths)
+
+
+def sniff_files(paths: list[str], workers: int = 16) -> Iterator[tuple[str, Category]]:
+    """Yield (path, category) for each path, NA when no signature matched"""
+    size = registry.header_size()
+    for path, header in zip(paths, read_headers(paths, size, workers=workers)):
+        yield path, registry.sniff_header(header)
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+
+import datetime as dt
+from enum import Enum
+
+from .enums import SortAttr
+
+
+# Keys of the files missing the attribute, smaller than any other key
+MISSING_NUMBER = float('-inf')
+MISSING_STR = ''
+
+_ordinals: dict[type, dict[Enum, int]] = {}
+
+
+def _ordinal(member: Enum) -> int:
+    """Declaration order of the member, compared as a plain int"""
+    table = _ordinals.get(type(member))
+    if table is None:
+        table = _ordinals[type(member)] = {m: idx for idx, m in enumerate(type(member))}
+    return table[member]
+
+
+def _typed(val):
+    if isinstance(val, Enum):
+        return _ordinal(val)
+    if isinstance(val, dt.datetime):
+        return val.timestamp()
+    if isinstance(val, dt.date):
+        return val.toordinal()
+    return val
+
+
+def key_func(attr: SortAttr):
+    """Return the function giving the typed sort key of a single file, see key_column"""
+    if attr is SortAttr.SIZE:
+        return lambda f: f.fstat['st_size']
+    if attr is SortAttr.TIME:
+        return lambda f: f.fstat['st_mtime'].timestamp()
+    if attr is SortAttr.DATE:
+        return lambda f: f.fstat['st_mtime'].toordinal()
+    if attr is SortAttr.NAME:
+        return lambda f: f.name
+
+    # Every other sort attribute is numeric, an enum or a date
+    name = attr.value
+    def _key(f):
+        k = _typed(getattr(f, name, None))
+        return MISSING_NUMBER if k is None else k
+    return _key
+
+
+def key_column(files: list, attr: SortAttr) -> list:
+    """Return the sort keys of the files as plain ints / floats / strs
+
+    The fstat based attributes skip the property lookups, and the missing
+    values get a sentinel of the column type, so that the keys are compared
+    by the C implementation of their builtin type.
+    """
+    if attr is SortAttr.SIZE:
+        return [f.fstat['st_size'] for f in files]
+    if attr is SortAttr.TIME:
+        return [f.fstat['st_mtime'].timestamp() for f in files]
+    if attr is SortAttr.DATE:
+        return [f.fstat['st_mtime'].toordinal() for f in files]
+    if attr is SortAttr.NAME:
+        return [f.name for f in files]
+
+    return list(map(key_func(attr), files))
+
+
+def sort_order(columns: list[list], reverse: list[bool], order: list[int] | None = None) -> list[int]:
+    """Return the stable multi-key order of the rows, the first column being the primary key
+
+    Sorts once per key from the last one, as a stable sort keeps the order
+    given by the previous keys on ties. The rows are taken in the given
+    order (row index order by default), which is kept on full ties.
+    """
+    if order is None:
+        order = list(range(len(columns[0]) if columns else 0))
+    else:
+        order = list(order)
+    for column, rev in zip(reversed(columns), reversed(reverse)):
+        order.sort(key=column.__getitem__, reverse=rev)
+    return order
@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+
+
+class SortedIndex():
+    """Keep files sorted by a key to answer range and top-N queries with bisect
+
+    Files whose key is None are not indexed. Added files are buffered and
+    merged on the next lookup, so loading a large list stays O(n log n)
+    instead of shifting the sorted list for every single file.
+    """
+
+    _insort_limit = 16  # below this many pending files, insert them one by one
+
+    def __init__(self, key):
+        self._key = key
+        self._keys: list = []
+        self._files: list = []
+        self._pending: list = []
+
+    def __len__(self):
+        return len(self._keys) + len(self._pending)
+
+    def add(self, f):
+        k = self._key(f)
+        if k is not None:
+            self._pending.append((k, f))
+
+    def _flush(self):
+        if not self._pending:
+            return
+
+        if len(self._pending) <= self._insort_limit:
+            for k, f in self._pending:
+                idx = bisect_right(self._keys, k)
+                self._keys.insert(idx, k)
+                self._files.insert(idx, f)
+        else:
+            # Timsort merges the two sorted runs in about linear time
+            pairs = list(zip(self._keys, self._files)) + self._pending
+            pairs.sort(key=itemgetter(0))
+            self._keys = [k for k, _ in pairs]
+            self._files = [f for _, f in pairs]
+
+        self._pending = []
+
+    def _bounds(self, lo=None, hi=None) -> tuple[int, int]:
+        self._flush()
+        start = 0 if lo is None else bisect_left(self._keys, lo)
+        end = len(self._keys) if hi is None else bisect_right(self._keys, hi)
+        return start, max(start, end)
+
+    def count(self, lo=None, hi=None) -> int:
+        """Number of files with lo <= key <= hi"""
+        start, end = self._bounds(lo, hi)
+        return end - start
+
+    def range(self, lo=None, hi=None) -> list:
+        """Files with lo <= key <= hi (either end could be None), in key order"""
+        start, end = self._bounds(lo, hi)
+        return self._files[start:end]
+
+    def top(self, n: int) -> list:
+        """Files with the n largest keys, largest first"""
+        self._flush()
+        return self._files[:-n-1:-1] if n > 0 else []
+
+    def bottom(self, n: int) -> list:
+        """Files with the n smallest keys, smallest first"""
+        self._flush()
+        return self._files[:max(n, 0)]
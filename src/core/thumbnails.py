@@ -0,0 +1,206 @@
+#!/usr/bin/python3
+
+import os
+import hashlib
+import tempfile
+import threading
+import subprocess as sp
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from termcolor import colored
+
+from .cache import CACHE_DIR
+from .enums import Category
+from .files import File
+from .utils import tqdm
+
+
+THUMBNAIL_DIR = os.path.join(CACHE_DIR, 'thumbnails')
+THUMBNAIL_CACHE_SIZE = 1024 ** 3  # 1G
+
+# Every thumbnail is letterboxed into the same box, so they could be tiled
+THUMBNAIL_BOX = (320, 240)
+VIDEO_KEYFRAMES = 4
+SHEET_COLUMNS = 6
+SHEET_MAX_CELLS = 48
+
+
+class ThumbnailCache():
+    """Downscaled images and video keyframe strips, rendered with ffmpeg
+
+    Thumbnails are keyed by the content fingerprint of the file, so they
+    survive renames, moves and copies. The least recently used ones are
+    evicted once the folder grows over max_bytes.
+    """
+
+    _shared: 'ThumbnailCache | None' = None
+
+    def __init__(self,
+                 path: str = THUMBNAIL_DIR,
+                 max_bytes: int = THUMBNAIL_CACHE_SIZE,
+                 box: tuple[int, int] = THUMBNAIL_BOX,
+                 keyframes: int = VIDEO_KEYFRAMES):
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.box = box
+        self.keyframes = keyframes
+
+        self._nbytes: int | None = None  # computed on first write
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> 'ThumbnailCache':
+        """Return the process-wide thumbnail cache"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _path_of(self, key: str) -> str:
+        # Keys start with '<size>-' or 'sheet-', shard on the hash digits after it
+        return os.path.join(self.path, key.partition('-')[2][:2], key + '.jpg')
+
+    def _key(self, f: File) -> str | None:
+        # The other files have no frame to show
+        if f.cat not in (Category.VIDEO, Category.IMAGE):
+            return None
+
+        fp = f._get_fingerprint()
+        if fp is None:
+            return None
+        w, h = self.box
+        suffix = f'v{self.keyframes}' if f.cat is Category.VIDEO else 'i'
+        return f'{fp}-{w}x{h}-{suffix}'
+
+    # ----------------------------------
+    def _scale_filter(self) -> str:
+        w, h = self.box
+        return (f'scale={w}:{h}:force_original_aspect_ratio=decrease,'
+                f'pad={w}:{h}:(ow-iw)/2:(oh-ih)/2')
+
+    def _render_args(self, f: File, dst: str) -> list[str]:
+        if f.cat is not Category.VIDEO:
+            return ['ffmpeg', '-v', 'error', '-y', '-i', f.path,
+                    '-vf', self._scale_filter(), '-frames:v', '1', '-q:v', '4', dst]
+
+        # Only the keyframes are decoded, picked evenly over the duration
+        duration = getattr(f, 'duration', None)
+        n = self.keyframes
+        pick = f'fps={n}/{duration:.3f}' if duration else 'thumbnail'
+        return ['ffmpeg', '-v', 'error', '-y', '-skip_frame', 'nokey', '-i', f.path,
+                '-vf', f'{pick},{self._scale_filter()},tile={n if duration else 1}x1',
+                '-an', '-frames:v', '1', '-q:v', '4', dst]
+
+    def _render(self, args: list[str], dst: str) -> bool:
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        tmp = dst + f'.{os.getpid()}.{threading.get_ident()}.tmp.jpg'
+        args = args[:-1] + [tmp]
+        try:
+            sp.run(args, stdout=sp.DEVNULL, stderr=sp.DEVNULL, check=True)
+            os.replace(tmp, dst)
+        except (OSError, sp.CalledProcessError):
+            if os.path.exists(tmp):  os.remove(tmp)
+            return False
+
+        self._account(os.path.getsize(dst))
+        return True
+
+    def get(self, f: File, build: bool = True) -> str | None:
+        """Return the thumbnail path of the file, rendering it if needed"""
+        key = self._key(f)
+        if key is None:
+            return None
+
+        dst = self._path_of(key)
+        if os.path.isfile(dst):
+            os.utime(dst)  # mark as recently used
+            return dst
+        if not build:
+            return None
+
+        return dst if self._render(self._render_args(f, dst), dst) else None
+
+    def build(self, files: Iterable[File], workers: int | None = None) -> list[str | None]:
+        """Return the thumbnail paths of the files, the missing ones are rendered in parallel"""
+        files = list(files)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            ret = list(tqdm(executor.map(self.get, files), total=len(files), desc='Building thumbnails'))
+
+        failed = sum(p is None for p in ret)
+        if failed:
+            print(f'Warning: failed to build {colored(failed, "yellow")} thumbnails')
+        return ret
+
+    def contact_sheets(self,
+                       thumbnails: list[str],
+                       columns: int = SHEET_COLUMNS,
+                       max_cells: int = SHEET_MAX_CELLS) -> list[str]:
+        """Tile the thumbnails into sheets of at most max_cells, return the sheet paths"""
+        sheets = []
+        for start in range(0, len(thumbnails), max_cells):
+            chunk = thumbnails[start:start + max_cells]
+            cols = min(columns, len(chunk))
+            rows = -(-len(chunk) // cols)
+
+            key = 'sheet-' + hashlib.blake2b('\n'.join([*chunk, f'{cols}x{rows}']).encode(),
+                                             digest_size=16).hexdigest()
+            dst = self._path_of(key)
+            if os.path.isfile(dst):
+                os.utime(dst)
+                sheets.append(dst)
+                continue
+
+            with tempfile.NamedTemporaryFile('w', suffix='.txt') as fp:
+                fp.writelines(f"file '{p}'\n" for p in chunk)
+                fp.flush()
+                args = ['ffmpeg', '-v', 'error', '-y', '-f', 'concat', '-safe', '0', '-i', fp.name,
+                        '-vf', f'tile={cols}x{rows}', '-frames:v', '1', '-q:v', '4', dst]
+                if self._render(args, dst):
+                    sheets.append(dst)
+
+        return sheets
+
+    # ----------------------------------
+    def _account(self, nbytes: int):
+        with self._lock:
+            if self._nbytes is None:
+                self._nbytes = self._scan()[1]
+            else:
+                self._nbytes += nbytes
+            over = self._nbytes > self.max_bytes
+
+        if over:  self.evict()
+
+    def _scan(self) -> tuple[list[tuple[float, int, str]], int]:
+        entries = []
+        for root, _, names in os.walk(self.path):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries, sum(size for _, size, _ in entries)
+
+    def evict(self, max_bytes: int | None = None):
+        """Remove the least recently used thumbnails until the cache fits in max_bytes"""
+        if max_bytes is None:
+            # Leave some room so that eviction doesn't run on every write
+            max_bytes = int(self.max_bytes * 0.9)
+
+        with self._lock:
+            entries, nbytes = self._scan()
+            for _, size, path in sorted(entries):
+                if nbytes <= max_bytes:  break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                nbytes -= size
+            self._nbytes = nbytes
+
+    @property
+    def nbytes(self) -> int:
+        return self._scan()[1]
@@ -1,10 +1,24 @@
 
 from functools import total_ordering
+from random import Random
+
+# Answer every prompt with its default, for non-interactive runs
+ASSUME_YES = False
+
+def set_assume_yes(flag: bool = True):
+    global ASSUME_YES
+    ASSUME_YES = flag
+
+def ask(msg: str, default: str = '') -> str:
+    """input() that returns the default answer right away when ASSUME_YES is set"""
+    if ASSUME_YES:
+        return default
+    return input(msg)
 
 def need_confirm(msg="Need confirm to continue"):
     def decorator(func):
         def wrapped(*args, **kwargs):
-            _in = input(msg + ' [Y/n] ')
+            _in = ask(msg + ' [Y/n] ', 'Y')
             if _in.upper() == 'N':
                 pass
             elif _in.upper() in ('Y', ''):
@@ -14,6 +28,25 @@ def need_confirm(msg="Need confirm to continue"):
 
     return decorator
 
+def tqdm(*args, **kwargs):
+    """tqdm.tqdm, imported on first use as it is slow to import"""
+    from tqdm import tqdm as _tqdm
+    return _tqdm(*args, **kwargs)
+
+def reservoir_sample(iterable, k: int, rng: Random | None = None) -> list:
+    """Pick k items uniformly at random in one pass, without materializing the iterable"""
+    if rng is None:  rng = Random()
+
+    ret = []
+    for idx, item in enumerate(iterable):
+        if idx < k:
+            ret.append(item)
+        else:
+            j = rng.randint(0, idx)
+            if j < k:
+                ret[j] = item
+    return ret
+
 def get_readable_filesize(fsize):
     
     try:
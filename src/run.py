@@ -1,24 +1,236 @@
 
+import sys
+import json
+import argparse
+import contextlib
+import datetime as dt
+from functools import partial
+
 from termcolor import colored
 
 from core.manager import Manager
-from core.enums import SortAttr, Category
-import argparse 
-
-parser = argparse.ArgumentParser()
-parser.add_argument('folder', default='', nargs=1)
-parser.add_argument('-r', '--recursive', action='store_true')
-args = parser.parse_args()
-
-folder = args.folder[0]
-print('Changing current working directory to', colored(folder, 'green'))
-m= Manager(
-    folder=folder,
-    recursive=args.recursive,
-    auto_probe = False,
-)
-# manager.organize(dry_run=False)
-# manager.summary()
-# manager.save()
-
-# manager.videos.exlongs.open()
+from core.catalog import Catalog
+from core.filelists import FileList
+from core.cache import BACKENDS, RootCache
+from core.export import export_files, to_record
+from core.utils import set_assume_yes, get_readable_filesize
+from core.enums import SortAttr, Category, MediaLengthType, Orientation, ImageType
+
+COMMANDS = ('scan', 'probe', 'verify', 'summary', 'du', 'query', 'dedupe', 'broken', 'organize', 'export')
+
+
+# ----------------------------------
+# Interactive use, e.g. python -i run.py <folder> [-r]
+if len(sys.argv) > 1 and sys.argv[1] not in COMMANDS and not sys.argv[1].startswith('-'):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('folder', default='', nargs=1)
+    parser.add_argument('-r', '--recursive', action='store_true')
+    args = parser.parse_args()
+
+    folder = args.folder[0]
+    print('Changing current working directory to', colored(folder, 'green'))
+    m = Manager(
+        folder=folder,
+        recursive=args.recursive,
+        auto_probe = False,
+    )
+    # m.organize(dry_run=False)
+    # m.summary()
+    # m.save_cache()
+
+    # m.videos.exlongs.open()
+
+else:
+    # ----------------------------------
+    # Batch mode, every prompt could be answered with --yes
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('roots', nargs='+', help='Root folders, loaded concurrently')
+    common.add_argument('-r', '--recursive', action='store_true')
+    common.add_argument('-w', '--workers', type=int, default=None,
+                        help='Threads used to load roots and probe files')
+    common.add_argument('--cache-backend', choices=BACKENDS, default=RootCache.backend,
+                        help="'none' neither reads nor writes any cache")
+    common.add_argument('--sniff-extensionless', action='store_true',
+                        help='Classify files without extension from their content')
+    common.add_argument('-y', '--yes', action='store_true',
+                        help='Answer every prompt with its default (skip existing files when moving)')
+    common.add_argument('--json', action='store_true',
+                        help='Write machine-readable output to stdout, the logs go to stderr')
+
+    parser = argparse.ArgumentParser(description='Scan, probe and organize media folders')
+    subparsers = parser.add_subparsers(dest='cmd', required=True)
+
+    subparsers.add_parser('scan', parents=[common], help='Load the roots and refresh the cache')
+
+    p = subparsers.add_parser('probe', parents=[common], help='Probe the unprobed files')
+    p.add_argument('-f', '--force', action='store_true', help='Probe the probed files again')
+    p.add_argument('-c', '--concurrent', action='store_true',
+                   help='Use the asyncio orchestrator with per-device limits')
+    p.add_argument('--checkpoint-interval', type=float, default=60.,
+                   help='Seconds between cache checkpoints')
+
+    p = subparsers.add_parser('verify', parents=[common],
+                              help='Fully decode the media files to find the corrupted ones')
+    p.add_argument('-f', '--force', action='store_true', help='Verify the unchanged files again')
+    p.add_argument('--checkpoint-interval', type=float, default=60.,
+                   help='Seconds between cache checkpoints')
+
+    p = subparsers.add_parser('summary', parents=[common], help='Print the summary tables')
+    p.add_argument('--cat', type=Category.__getitem__, default=None)
+
+    p = subparsers.add_parser('du', parents=[common], help='Report the size and file counts per folder')
+    p.add_argument('-d', '--depth', type=int, default=1, help='Subfolder levels to report, 0 for the root only')
+
+    p = subparsers.add_parser('query', parents=[common], help='List the files matching all predicates')
+    p.add_argument('--cat', type=Category.__getitem__, action='append', default=None)
+    p.add_argument('--since', type=dt.date.fromisoformat, default=None, help='Modified on or after')
+    p.add_argument('--until', type=dt.date.fromisoformat, default=None, help='Modified on or before')
+    p.add_argument('--min-size', type=int, default=None, help='In bytes')
+    p.add_argument('--max-size', type=int, default=None, help='In bytes')
+    p.add_argument('--min-duration', type=float, default=None, help='In seconds')
+    p.add_argument('--max-duration', type=float, default=None, help='In seconds')
+    p.add_argument('--length-type', type=MediaLengthType.__getitem__, action='append', default=None)
+    p.add_argument('--orientation', type=Orientation.__getitem__, action='append', default=None)
+    p.add_argument('--image-type', type=ImageType.__getitem__, action='append', default=None)
+    p.add_argument('--folder', default=None, help='Folder prefix, relative to each root')
+    p.add_argument('--name', default=None, help='Glob pattern on the file name')
+    p.add_argument('--sort', type=SortAttr, action='append', default=None,
+                   help='SortAttr value, e.g. size, could be repeated for secondary keys')
+    p.add_argument('--desc', action='store_true', help='Sort in descending order')
+
+    p = subparsers.add_parser('dedupe', parents=[common], help='Report the files with the same content')
+    p.add_argument('--no-verify', action='store_true',
+                   help='Trust the fingerprints, without hashing the whole content')
+
+    p = subparsers.add_parser('broken', parents=[common], help='Report the broken media files')
+    p.add_argument('--quarantine', action='store_true', help='Move them into the @broken-* folders')
+    p.add_argument('-n', '--dry-run', action='store_true')
+
+    p = subparsers.add_parser('organize', parents=[common], help='Move the files to their target folders')
+    p.add_argument('-n', '--dry-run', action='store_true')
+
+    p = subparsers.add_parser('export', parents=[common], help='Export the metadata of all files')
+    p.add_argument('-o', '--output', required=True, help='.parquet / .arrow / .csv / .ndjson')
+    p.add_argument('--format', default=None, help='Override the format inferred from the extension')
+
+    args = parser.parse_args()
+
+    set_assume_yes(args.yes)
+    RootCache.set_backend(args.cache_backend)
+    save = args.cache_backend != 'none'
+
+    def _range(lo, hi):
+        return None if lo is None and hi is None else (lo, hi)
+
+    def _output(obj):
+        print(json.dumps(obj, default=str), file=sys.__stdout__)
+
+    # With --json, stdout only carries the result
+    with contextlib.redirect_stdout(sys.stderr if args.json else sys.stdout):
+        catalog = Catalog(
+            args.roots,
+            recursive=args.recursive,
+            use_cache=save,
+            workers=args.workers,
+            manager_cls=partial(Manager, sniff_extensionless=args.sniff_extensionless))
+
+        if args.cmd == 'scan':
+            if save:  catalog.save_cache()
+            if args.json:
+                _output([m.stats for m in catalog.managers.values()])
+            else:
+                for root, m in catalog.managers.items():
+                    stats = m.stats
+                    print(f'{root}: {stats["count"]} files'
+                          f' [{get_readable_filesize(stats["size"]).strip()}]'
+                          + (f', {stats["broken"]} broken' if stats['broken'] else ''))
+
+        elif args.cmd == 'probe':
+            catalog.probe(force=args.force, concurrent=args.concurrent, workers=args.workers,
+                          checkpoint_interval=args.checkpoint_interval if save else None)
+            if save:  catalog.save_cache()
+            if args.json:
+                _output({root: {'count': len(m), 'probed': len(m.probed)}
+                         for root, m in catalog.managers.items()})
+
+        elif args.cmd == 'verify':
+            errors = catalog.verify(force=args.force, workers=args.workers,
+                                    checkpoint_interval=args.checkpoint_interval if save else None)
+            if save:  catalog.save_cache()
+            if args.json:
+                _output([row for m in catalog.managers.values()
+                         for row in m.broken_report(show=False)])
+            elif errors:
+                for m in catalog.managers.values():
+                    m.broken_report()
+
+        elif args.cmd == 'summary':
+            if args.json:
+                _output([m.stats for m in catalog.managers.values()])
+            else:
+                catalog.summary(args.cat)
+
+        elif args.cmd == 'du':
+            if args.json:
+                _output({root: m.du(depth=args.depth, show=False)
+                         for root, m in catalog.managers.items()})
+            else:
+                catalog.du(depth=args.depth)
+
+        elif args.cmd == 'query':
+            result = catalog.query(
+                category=args.cat,
+                mdate=_range(args.since, args.until),
+                size=_range(args.min_size, args.max_size),
+                duration=_range(args.min_duration, args.max_duration),
+                length_type=args.length_type,
+                orientation=args.orientation,
+                image_type=args.image_type,
+                folder=args.folder,
+                name=args.name)
+
+            files = FileList(filelist=[f for m in result.managers.values()
+                                       for fl in m.data.values() for f in fl.filelist])
+            if args.sort is not None:  files.sort(*args.sort, reverse=args.desc)
+
+            for f in files.filelist:
+                if args.json:
+                    _output(to_record(f))
+                else:
+                    print(f.path)
+
+        elif args.cmd == 'dedupe':
+            groups = catalog.duplicates(verify=not args.no_verify)
+            if args.json:
+                _output([{'size': g[0].size, 'paths': [f.path for f in g]} for g in groups])
+            else:
+                wasted = sum(g[0].size * (len(g) - 1) for g in groups)
+                for g in groups:
+                    print(colored(f'[{g[0].size_human}] x {len(g)}', 'yellow'))
+                    for f in g:
+                        print(' ' * 4 + f.path)
+                print(f'{len(groups)} groups of duplicates, {get_readable_filesize(wasted).strip()} wasted')
+
+        elif args.cmd == 'broken':
+            rows = [row for m in catalog.managers.values() for row in m.broken_report(show=not args.json)]
+            if args.json:
+                _output(rows)
+            elif not rows:
+                print('No broken file found')
+            # The cache is saved by quarantine_broken itself
+            if args.quarantine:  catalog.quarantine_broken(dry_run=args.dry_run)
+
+        elif args.cmd == 'organize':
+            # The cache is saved by organize itself
+            count = catalog.organize(dry_run=args.dry_run)
+            if args.json:
+                _output({'planned' if args.dry_run else 'moved': count})
+
+        elif args.cmd == 'export':
+            count = export_files(
+                (f for m in catalog.managers.values() for fl in m.data.values() for f in fl.filelist),
+                args.output, fmt=args.format)
+            if args.json:
+                _output({'path': args.output, 'count': count})
+            else:
+                print(f'Exported {count} files to {colored(args.output, "green")}')
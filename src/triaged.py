@@ -0,0 +1,61 @@
+
+import sys
+import argparse
+
+from core.server import SOCKET_PATH, TriageClient, serve
+
+parser = argparse.ArgumentParser(description='Resident triage daemon and its client')
+parser.add_argument('-s', '--socket', default=SOCKET_PATH)
+subparsers = parser.add_subparsers(dest='op', required=True)
+
+p = subparsers.add_parser('serve', help='Start the daemon in foreground')
+p.add_argument('roots', nargs='*', help='Folders to load at startup')
+p.add_argument('-r', '--recursive', action='store_true')
+
+p = subparsers.add_parser('load', help='Load (or reload) a folder in the daemon')
+p.add_argument('root')
+p.add_argument('-r', '--recursive', action=argparse.BooleanOptionalAction, default=None,
+               help="Defaults to the daemon's own --recursive")
+p.add_argument('--reload', action='store_true')
+
+subparsers.add_parser('roots', help='List the loaded folders')
+subparsers.add_parser('stop', help='Stop the daemon')
+
+for op in ('summary', 'details', 'organize'):
+    p = subparsers.add_parser(op, help=f'Run {op} (organize is always a dry run)')
+    p.add_argument('root')
+    p.add_argument('-f', '--filter', action='append', default=[], metavar='NAME[=ARG]',
+                   help='Filter to apply in order, e.g. by_cat=VIDEO, by_mdate=2024-01-31, probed')
+    p.add_argument('--sort', default=None, help='SortAttr value, e.g. size')
+    p.add_argument('--show-path', action='store_true')
+    p.add_argument('--no-color', action='store_true')
+
+args = parser.parse_args()
+
+if args.op == 'serve':
+    serve(args.socket, roots=args.roots, recursive=args.recursive)
+    sys.exit()
+
+with TriageClient(args.socket) as client:
+    if args.op == 'load':
+        ret = client.load(args.root, recursive=args.recursive, reload=args.reload)
+    elif args.op == 'roots':
+        ret = client.roots()
+    elif args.op == 'stop':
+        ret = client.stop()
+    else:
+        filters = [f.split('=', 1) for f in args.filter]
+        ret = getattr(client, args.op)(args.root, filters, sort=args.sort,
+                                       show_path=args.show_path, color=not args.no_color)
+
+if not ret.pop('ok'):
+    print(ret['error'])
+    sys.exit(1)
+
+if 'output' in ret:
+    print(ret['output'], end='')
+elif 'roots' in ret:
+    for root, count in ret['roots'].items():
+        print(f'{root} ({count} files)')
+elif 'count' in ret:
+    print(f"{ret['count']} files loaded")
@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+
+# Keep the caches of the tests out of the real home
+os.environ['HOME'] = tempfile.mkdtemp(prefix='mfo-home-')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import datetime as dt
+
+import pytest
+
+
+@pytest.fixture
+def make_file(tmp_path):
+    """Create a file under tmp_path with given size and modification date, return its path"""
+    def _make(rel: str, size: int = 100, mdate: dt.date = dt.date(2024, 1, 31)):
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(os.urandom(size))
+        ts = dt.datetime.combine(mdate, dt.time(12)).timestamp()
+        os.utime(path, (ts, ts))
+        return str(path)
+    return _make
+
+
+@pytest.fixture
+def assume_yes():
+    from core.utils import set_assume_yes
+    set_assume_yes(True)
+    yield
+    set_assume_yes(False)
+
+
+FAKE_FFPROBE = '''#!/bin/sh
+for last; do :; done
+case "$last" in
+  *bad*) echo "$last: Invalid data found when processing input" >&2; exit 1;;
+  *) echo '{"streams": [{"codec_type": "audio", "duration": "400.5"},
+      {"codec_type": "video", "width": 1920, "height": 1080, "duration": "400.5"}]}';;
+esac
+'''
+
+
+@pytest.fixture
+def fake_ffprobe(tmp_path_factory, monkeypatch):
+    """Put an ffprobe on the PATH which fails on the files named *bad*"""
+    folder = tmp_path_factory.mktemp('bin')
+    path = folder / 'ffprobe'
+    path.write_text(FAKE_FFPROBE)
+    path.chmod(0o755)
+    monkeypatch.setenv('PATH', f'{folder}{os.pathsep}{os.environ["PATH"]}')
+    return str(path)
+
+
+@pytest.fixture
+def no_cache():
+    from core.cache import RootCache
+    RootCache.set_backend('none')
+    yield
+    RootCache.set_backend('records')
+
+
+@pytest.fixture
+def probe_cache(tmp_path, monkeypatch):
+    """A probe cache of the test only, in place of the shared one"""
+    from core.probe_cache import ProbeCache
+    cache = ProbeCache(str(tmp_path / 'cache' / 'probe.pkl'))
+    monkeypatch.setattr(ProbeCache, '_shared', cache)
+    return cache
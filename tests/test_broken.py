@@ -0,0 +1,30 @@
+import os
+
+from core.enums import Category
+from core.files import AudioFile
+from core.filelists.audio_filelist import AudioFileList
+
+
+def test_broken_files_are_quarantined_not_organized(tmp_path, make_file):
+    files = [AudioFile(make_file(p), cat=Category.AUDIO) for p in ('ok.mp3', 'x/bad.mp3', 'y/bad.mp3')]
+    for f in files[1:]:
+        f.broken, f.probe_error = True, 'no audio stream'
+    fl = AudioFileList(filelist=files, root=str(tmp_path))
+
+    assert fl.organize() == 1
+    assert fl.quarantine_broken(dry_run=True) == 2
+    assert not (tmp_path / '@broken-audios').exists()
+
+    assert fl.quarantine_broken() == 2
+    assert sorted(os.listdir(tmp_path / '@broken-audios')) == ['bad-0.mp3', 'bad.mp3']
+    assert fl.quarantine_broken() == 0
+
+
+def test_broken_files_are_counted_apart(tmp_path, make_file):
+    files = [AudioFile(make_file(p), cat=Category.AUDIO) for p in ('ok.mp3', 'bad.mp3')]
+    files[1].broken = True
+    fl = AudioFileList(filelist=files, root=str(tmp_path))
+
+    stats = fl.stats
+    assert stats['count'] == 1
+    assert stats['broken']['count'] == 1
@@ -0,0 +1,180 @@
+import os
+import pickle
+
+import pytest
+
+from core import cache as cache_module
+from core.cache import RootCache
+from core.files import File
+from core.manager import Manager
+from core.orchestrator import ProbeOrchestrator
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    """Re-open the cache partitions from disk, as a new process would"""
+    def _reset():
+        monkeypatch.setattr(RootCache, '_instances', {})
+    _reset()
+    return _reset
+
+
+def test_moved_files_are_renamed_and_missing_ones_pruned(tmp_path, make_file, fresh_cache, capsys):
+    root = tmp_path / 'root'
+    make_file('root/a.mp4')
+    make_file('root/b.mp4')
+    manager = Manager(str(root), chdir=False)
+    manager.save_cache()
+    assert manager.cache.keys() == {'a.mp4', 'b.mp4'}
+
+    (root / 'sub').mkdir()
+    a = next(f for f in manager.videos.filelist if f.name == 'a.mp4')
+    manager.videos._move_file(a, str(root / 'sub' / 'a.mp4'))
+    manager.save_cache()
+    assert '1 updated, 1 renamed, 0 pruned' in capsys.readouterr().out
+    assert manager.cache.keys() == {'sub/a.mp4', 'b.mp4'}
+
+    # Unchanged files are not written again
+    manager.save_cache()
+    assert '0 updated, 0 renamed, 0 pruned' in capsys.readouterr().out
+
+    os.remove(root / 'b.mp4')
+    fresh_cache()
+    manager = Manager(str(root), chdir=False)
+    manager.save_cache()
+    assert '0 renamed, 1 pruned' in capsys.readouterr().out
+
+    fresh_cache()
+    assert Manager(str(root), recursive=True, chdir=False).cache.keys() == {'sub/a.mp4'}
+
+
+def test_stale_keys_outside_the_scan_are_kept(tmp_path, make_file, fresh_cache):
+    root = tmp_path / 'root'
+    make_file('root/a.mp4')
+    make_file('root/sub/b.mp4')
+    Manager(str(root), recursive=True, chdir=False).save_cache()
+
+    # The subfolder is not walked without recursive, its entries stay
+    os.remove(root / 'a.mp4')
+    fresh_cache()
+    manager = Manager(str(root), chdir=False)
+    manager.save_cache()
+
+    fresh_cache()
+    assert Manager(str(root), recursive=True, chdir=False).cache.keys() == {'sub/b.mp4'}
+
+
+def _entry(key, size=1):
+    return {'path': key, 'cat': 'NA', 'fstat': {'st_size': size}}
+
+
+def test_journal_is_replayed_and_compacted(tmp_path):
+    cache = RootCache(str(tmp_path))
+    cache.append({'a': _entry('a'), 'sub/b': _entry('sub/b')})
+    cache.append({'a': _entry('a', 2)}, ['sub/b'])
+    assert os.path.isfile(cache.journal_path) and not cache.shards()
+
+    reopened = RootCache(str(tmp_path))
+    assert not os.path.isfile(reopened.journal_path)
+    reopened = RootCache(str(tmp_path))
+    reopened.load()
+    assert {k: v['fstat'] for k, v in reopened.entries.items()} == {'a': {'st_size': 2}}
+
+
+def test_record_cut_short_by_a_crash(tmp_path):
+    cache = RootCache(str(tmp_path))
+    cache.append({'a': _entry('a')})
+    cache.append({'b': _entry('b')})
+    with open(cache.journal_path, 'r+b') as f:
+        f.truncate(os.path.getsize(cache.journal_path) - 5)
+
+    reopened = RootCache(str(tmp_path))
+    reopened.load()
+    assert reopened.entries.keys() == {'a'}
+
+
+def test_checkpointed_probe_is_resumed(tmp_path, make_file, fake_ffprobe, probe_cache, fresh_cache, monkeypatch):
+    for name in ('a.mp4', 'b.mp4', 'c.mp3'):
+        make_file(f'root/{name}')
+    root = str(tmp_path / 'root')
+    manager = Manager(root, chdir=False)
+
+    # Interrupted after the first file, which is already in the journal
+    calls = 0
+    probe = File.probe
+
+    def interrupted(f, *args, **kwargs):
+        nonlocal calls
+        if (calls := calls + 1) > 1:  raise KeyboardInterrupt
+        probe(f, *args, **kwargs)
+
+    monkeypatch.setattr(File, 'probe', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        manager.probe(checkpoint_interval=0)
+    monkeypatch.setattr(File, 'probe', probe)
+
+    fresh_cache()
+    manager = Manager(root, chdir=False)
+    files = [f for fl in manager.data.values() for f in fl.filelist]
+    assert sum(f.probed for f in files) == 1
+
+    # Only the files left are probed again
+    assert ProbeOrchestrator(files).run() == 2
+
+
+def test_entries_are_split_by_top_level_directory(tmp_path):
+    cache = RootCache(str(tmp_path))
+    cache.update({key: _entry(key) for key in ('a', 'b', 'x/c', 'x/y/d', 'z/e')})
+    cache.save()
+    assert sorted(cache.shards()) == ['.', 'x', 'z']
+
+    # Only the shards asked for are read
+    reopened = RootCache(str(tmp_path))
+    reopened.load(['x'])
+    assert reopened.entries.keys() == {'x/c', 'x/y/d'}
+    reopened.load_for(['b'])
+    assert reopened.entries.keys() == {'a', 'b', 'x/c', 'x/y/d'}
+
+    # An emptied shard is dropped, the others are not rewritten
+    mtime = os.path.getmtime(reopened._shard_stem('x') + '.rec')
+    reopened.update({}, ['a', 'b'])
+    reopened.save()
+    assert sorted(reopened.shards()) == ['x', 'z']
+    assert os.path.getmtime(reopened._shard_stem('x') + '.rec') == mtime
+
+
+def test_legacy_partition_is_migrated(tmp_path):
+    root = str(tmp_path / 'legacy')
+    entries = {'a.mp4': _entry('a.mp4'), 'sub/b.mp4': _entry('sub/b.mp4')}
+
+    cache_path = RootCache(root)._legacy_path
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, 'wb') as f:
+        pickle.dump((root, entries), f)
+
+    cache = RootCache(root)
+    cache.load()
+    assert cache.entries.keys() == entries.keys()
+    assert not os.path.isfile(cache_path)
+    assert sorted(cache.shards()) == ['.', 'sub']
+
+
+def test_legacy_global_cache_is_migrated(tmp_path, monkeypatch):
+    legacy = tmp_path / 'cache.pkl'
+    root = str(tmp_path / 'root')
+    with open(legacy, 'wb') as f:
+        pickle.dump({root: {'./a.mp4': _entry('./a.mp4'), 'sub/b.mp4': _entry('sub/b.mp4')},
+                     str(tmp_path / 'other'): {'c.mp4': _entry('c.mp4')}}, f)
+    monkeypatch.setattr(cache_module, 'LEGACY_CACHE_PKL', str(legacy))
+    monkeypatch.setattr(RootCache, '_legacy_cache', None)
+
+    cache = RootCache(root)
+    cache.load()
+    assert cache.entries.keys() == {'a.mp4', 'sub/b.mp4'}
+    assert cache.entries['a.mp4']['path'] == 'a.mp4'
+
+    # Migrated once, the partition is read from its shards from now on
+    monkeypatch.setattr(RootCache, '_legacy_cache', {})
+    reopened = RootCache(root)
+    reopened.load()
+    assert reopened.entries.keys() == {'a.mp4', 'sub/b.mp4'}
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from core import orchestrator
+from core.catalog import Catalog
+from core.enums import Category
+
+
+@pytest.fixture
+def catalog(tmp_path, make_file, no_cache):
+    make_file('one/a.mp4')
+    make_file('one/sub/b.mp4')
+    make_file('two/c.mp4')
+    make_file('two/d.txt')
+    return Catalog([str(tmp_path / 'one'), str(tmp_path / 'two')],
+                   recursive=True, use_cache=False)
+
+
+def test_roots_are_loaded_apart(catalog, tmp_path):
+    assert catalog.roots == [str(tmp_path / 'one'), str(tmp_path / 'two')]
+    assert len(catalog) == 4
+    assert len(catalog.by_root(str(tmp_path / 'two'))) == 2
+
+
+def test_manager_of_picks_the_deepest_root(catalog, tmp_path):
+    inner = catalog.add_root(str(tmp_path / 'one' / 'sub'))
+    assert catalog.manager_of(str(tmp_path / 'one' / 'sub' / 'b.mp4')) is inner
+    assert catalog.manager_of(str(tmp_path / 'one' / 'a.mp4')) is catalog.by_root(str(tmp_path / 'one'))
+    assert catalog.manager_of(str(tmp_path / 'elsewhere' / 'x.mp4')) is None
+
+
+def test_add_file(catalog, tmp_path, make_file):
+    catalog.add_file(make_file('two/e.mp4'))
+    assert len(catalog.by_root(str(tmp_path / 'two')).videos) == 2
+
+    with pytest.raises(ValueError):
+        catalog.add_file(make_file('three/f.mp4'))
+    assert len(catalog.roots) == 2
+
+
+def test_by_cat_organizes_under_each_root(catalog, tmp_path, monkeypatch, assume_yes):
+    monkeypatch.chdir(tmp_path)
+    videos = catalog[Category.VIDEO]
+    assert len(videos) == 3 and videos.roots == catalog.roots
+
+    videos.organize()
+    assert os.path.isdir(tmp_path / 'one' / '@video')
+    assert os.path.isdir(tmp_path / 'two' / '@video')
+    assert not os.path.exists(tmp_path / '@video')
+    assert os.path.isfile(tmp_path / 'two' / 'd.txt')
+
+
+def test_filters_keep_the_overlapping_roots(catalog, tmp_path):
+    sub = catalog.by_folder(str(tmp_path / 'one' / 'sub'))
+    assert sub.roots == [str(tmp_path / 'one')]
+    assert len(sub) == 1
+
+
+def test_concurrent_probe_spans_all_roots(catalog, fake_ffprobe, monkeypatch):
+    runs = []
+    run = orchestrator.ProbeOrchestrator.run
+    monkeypatch.setattr(orchestrator.ProbeOrchestrator, 'run',
+                        lambda self: runs.append(len(self.files)) or run(self))
+
+    catalog.probe(concurrent=True, checkpoint_interval=None)
+    assert runs == [4]
+    videos = [f for m in catalog.managers.values() for f in m.videos.filelist]
+    assert all(f.probed and f.duration == 400.5 for f in videos)
+    assert len(catalog[Category.VIDEO].unprobed) == 0
@@ -0,0 +1,51 @@
+import pytest
+
+from core.manager import Manager
+from core.utils import get_readable_filesize
+
+
+@pytest.fixture
+def docs(tmp_path, make_file, no_cache):
+    for i in range(30):
+        make_file(f'd{i:02d}.txt', size=10 * (i + 1))
+    docs = Manager(str(tmp_path), use_cache=False, chdir=False).docs
+    docs.filelist.sort(key=lambda f: f.name)
+    return docs
+
+
+def _rows(out):
+    lines = out.splitlines()
+    return lines[2:-2], lines[-1]
+
+
+def test_all_rows_and_total(docs, capsys):
+    docs.details(color=False)
+    rows, total = _rows(capsys.readouterr().out)
+    assert len(rows) == 30
+    assert total.startswith('Total 30 files')
+    assert get_readable_filesize(sum(10 * (i + 1) for i in range(30))).strip() in total
+
+
+def test_limit_and_offset_total_the_shown_rows(docs, capsys):
+    docs.details(color=False, limit=5, offset=10)
+    rows, total = _rows(capsys.readouterr().out)
+    assert [r.split()[0] for r in rows] == [f'd{i:02d}.txt' for i in range(10, 15)]
+    assert total.startswith('Total 5 of 30 files')
+    assert get_readable_filesize(sum(10 * (i + 1) for i in range(10, 15))).strip() in total
+
+
+def test_columns_are_aligned_past_the_sampled_rows(docs, capsys, monkeypatch):
+    monkeypatch.setattr(type(docs), '_details_sample_size', 3)
+    docs.details(color=False)
+    header, sep, *_ = capsys.readouterr().out.splitlines()
+    assert len(sep) >= len('Total 30 of 30 files')
+    assert header.startswith('Filename')
+
+
+def test_pager_stops_on_quit(docs, capsys, monkeypatch):
+    answers = iter(['', 'q'])
+    monkeypatch.setattr('builtins.input', lambda _: next(answers))
+    docs.details(color=False, page_size=10, pager=True)
+    rows, total = _rows(capsys.readouterr().out)
+    assert len(rows) == 20
+    assert total.startswith('Total 20 of 30 files')
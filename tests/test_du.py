@@ -0,0 +1,59 @@
+import os
+
+from core.enums import Category
+from core.files import VideoFile
+from core.filelists.video_filelist import VideoFileList
+from core.manager import Manager
+
+
+def _videos(root, paths):
+    return VideoFileList(filelist=[VideoFile(p, cat=Category.VIDEO) for p in paths], root=str(root))
+
+
+def test_moves_through_a_derived_list_update_the_parent(tmp_path, make_file):
+    fl = _videos(tmp_path, [make_file('a.mp4'), make_file('b.mp4')])
+    assert fl.folder_stats()['count'] == 2
+
+    fl.healthy.by_size(0).move_to(str(tmp_path / 'elsewhere'), verbose=False)
+    assert fl.folder_stats('elsewhere')['count'] == 2
+    assert str(tmp_path / 'elsewhere') in fl.folders
+
+
+def test_moves_only_touch_the_lists_holding_the_file(tmp_path, make_file):
+    fl = _videos(tmp_path, [make_file('a/x.mp4', size=10), make_file('a/y.mp4', size=20)])
+    other = _videos(tmp_path, [make_file('b/z.mp4', size=30)])
+    derived = fl.by_size(20)
+    for lst in (fl, other, derived):
+        lst.folder_stats()
+    indexes = [lst._folder_index for lst in (fl, other, derived)]
+
+    (tmp_path / 'b').mkdir(exist_ok=True)
+    y = derived.filelist[0]
+    y.move(str(tmp_path / 'b' / 'y.mp4'))
+
+    assert fl.folder_stats('a') == {'count': 1, 'size': 10, 'duration': 0., 'probed': 0, 'broken': 0}
+    assert fl.folder_stats('b')['size'] == 20
+    assert derived.folder_stats('a')['count'] == 0 and derived.folder_stats('b')['count'] == 1
+    assert other.folder_stats('b')['count'] == 1
+    assert fl.folder_stats()['count'] == 2
+
+    # Updated in place, none of them rebuilt
+    assert all(lst._folder_index is index for lst, index in zip((fl, other, derived), indexes))
+
+
+def test_du_rolls_up_the_tree(tmp_path, make_file, no_cache):
+    make_file('a/x.mp4', size=100)
+    make_file('a/b/y.mp4', size=200)
+    make_file('a/b/c/z.mp3', size=300)
+    make_file('w.txt', size=5)
+    manager = Manager(str(tmp_path), recursive=True, use_cache=False, chdir=False)
+
+    rows = {row['folder']: row for row in manager.du(depth=None, show=False)}
+    assert rows['.']['count'] == 4 and rows['.']['size'] == 605
+    assert rows['a']['size'] == 600 and rows['a']['categories'] == {'VIDEO': 2, 'AUDIO': 1}
+    assert rows[os.path.join('a', 'b')]['unprobed'] == 2
+    assert set(r['folder'] for r in manager.du(depth=1, show=False)) == {'.', 'a'}
+
+    manager.add_file(make_file('a/b/new.mp4', size=1000))
+    rows = {row['folder']: row for row in manager.du('a', show=False)}
+    assert rows['.']['size'] == 1600 and rows['b']['count'] == 3
@@ -0,0 +1,45 @@
+import datetime as dt
+
+import pytest
+
+from core.enums import Category
+from core.export import infer_format
+from core.manager import Manager
+
+
+@pytest.fixture
+def manager(tmp_path, make_file, fake_ffprobe, no_cache):
+    make_file('root/a.mp4', size=1234, mdate=dt.date(2024, 2, 1))
+    make_file('root/b.mp3', size=567)
+    make_file('root/bad.mp4')
+    make_file('root/c.txt', size=89)
+    manager = Manager(str(tmp_path / 'root'), use_cache=False, chdir=False)
+    manager.probe(checkpoint_interval=None)
+    assert manager.videos.probed.len == 2
+    return manager
+
+
+def _snapshot(manager):
+    return {
+        f.path: (cat, f.size, f.mtime, getattr(f, 'duration', None), getattr(f, 'width', None),
+                 getattr(f, 'length_type', None), f.probed, getattr(f, 'broken', False))
+        for cat, fl in manager.data.items() for f in fl.filelist
+    }
+
+
+@pytest.mark.parametrize('ext', ['.ndjson', '.csv', '.parquet'])
+def test_roundtrip(manager, tmp_path, ext):
+    if ext == '.parquet':  pytest.importorskip('pyarrow')
+    path = str(tmp_path / f'files{ext}')
+    manager.export(path)
+
+    loaded = Manager.from_export(manager.cwd, path, use_cache=False)
+    assert _snapshot(loaded) == _snapshot(manager)
+    assert len(loaded.videos.broken) == 1
+    assert loaded.videos.largest(1).filelist[0].size == 1234
+
+
+def test_unknown_extension():
+    assert infer_format('x.JSONL') == 'ndjson'
+    with pytest.raises(ValueError):
+        infer_format('x.xlsx')
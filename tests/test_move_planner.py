@@ -0,0 +1,44 @@
+import os
+import datetime as dt
+
+from core.enums import Category
+from core.files import VideoFile
+from core.filelists.video_filelist import VideoFileList
+
+
+def _videos(root, paths):
+    return VideoFileList(filelist=[VideoFile(p, cat=Category.VIDEO) for p in paths], root=str(root))
+
+
+def test_dry_run_plans_without_creating_folders(tmp_path, make_file):
+    fl = _videos(tmp_path, [make_file('a.mp4'), make_file('b.mp4', mdate=dt.date(2024, 2, 1))])
+
+    assert fl.organize(dry_run=True) == 2
+    assert not (tmp_path / '@video').exists()
+    assert all(os.path.dirname(f.path) == str(tmp_path) for f in fl.filelist)
+
+
+def test_organize_moves_into_date_folders(tmp_path, make_file):
+    fl = _videos(tmp_path, [make_file('a.mp4'), make_file('b.mp4', mdate=dt.date(2024, 2, 1))])
+
+    assert fl.organize() == 2
+    assert sorted(os.path.relpath(f.path, tmp_path) for f in fl.filelist) == [
+        '@video/2024-01-31/a.mp4', '@video/2024-02-01/b.mp4']
+    assert fl.folder_stats('@video')['count'] == 2
+    assert fl.folder_stats()['count'] == 2
+
+
+def test_collisions_in_the_plan_get_unique_names(tmp_path, make_file):
+    fl = _videos(tmp_path, [make_file('x/dup.mp4'), make_file('y/dup.mp4')])
+
+    assert fl.organize() == 2
+    assert sorted(os.listdir(tmp_path / '@video' / '2024-01-31')) == ['dup-0.mp4', 'dup.mp4']
+
+
+def test_existing_files_are_skipped_by_default(tmp_path, make_file, assume_yes):
+    existing = make_file('@video/2024-01-31/a.mp4')
+    fl = _videos(tmp_path, [make_file('a.mp4'), make_file('b.mp4')])
+
+    assert fl.organize() == 1
+    assert os.path.isfile(tmp_path / 'a.mp4')
+    assert sorted(os.listdir(os.path.dirname(existing))) == ['a.mp4', 'b.mp4']
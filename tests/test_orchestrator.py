@@ -0,0 +1,66 @@
+import pytest
+
+from core.files import File
+from core.manager import Manager
+from core.orchestrator import ProbeOrchestrator
+
+
+@pytest.fixture
+def manager(tmp_path, make_file, probe_cache, no_cache):
+    make_file('root/a.mp4')
+    make_file('root/b.mp3')
+    make_file('root/bad.mp4')
+    return Manager(str(tmp_path / 'root'), use_cache=False, chdir=False)
+
+
+@pytest.fixture
+def no_ffprobe(tmp_path, monkeypatch):
+    monkeypatch.setenv('PATH', str(tmp_path / 'nobin'))
+    monkeypatch.setattr(File, '_probe_launch_error', None)
+
+
+@pytest.mark.parametrize('concurrent', [False, True])
+def test_probe(manager, fake_ffprobe, probe_cache, concurrent):
+    manager.probe(concurrent=concurrent, checkpoint_interval=None)
+
+    assert all(f.probed for f in manager.videos.filelist + manager.audios.filelist)
+    assert manager.audios.filelist[0].duration == 400.5
+    bad, = manager.videos.broken.filelist
+    assert bad.name == 'bad.mp4' and bad.probe_error.endswith('Invalid data found when processing input')
+    # Only the healthy results are shared
+    assert len(probe_cache.entries) == 2
+
+
+def test_orchestrator_counts(manager, fake_ffprobe):
+    files = manager.videos.filelist + manager.audios.filelist
+    orchestrator = ProbeOrchestrator(files, device_limits={'ssd': 1}, window=1)
+    assert orchestrator.run() == 3
+    assert orchestrator.failed == 0 and orchestrator.unprobed == 0
+    assert ProbeOrchestrator(files).run() == 0
+
+
+@pytest.mark.parametrize('concurrent', [False, True])
+def test_missing_ffprobe_leaves_files_unprobed(manager, no_ffprobe, probe_cache, capsys, concurrent):
+    manager.probe(concurrent=concurrent, checkpoint_interval=None)
+
+    files = manager.videos.filelist + manager.audios.filelist
+    assert not any(f.probed or getattr(f, 'broken', False) for f in files)
+    assert not probe_cache.dirty and not probe_cache.entries
+    # Warned once per list when probing list by list
+    assert capsys.readouterr().out.count('Warning: could not run') == (1 if concurrent else 2)
+
+
+def test_orchestrator_stops_on_launch_error(manager, no_ffprobe):
+    files = manager.videos.filelist + manager.audios.filelist
+    orchestrator = ProbeOrchestrator(files, window=1)
+    assert orchestrator.run() == 0
+    assert orchestrator.launch_error.startswith('FileNotFoundError')
+    assert orchestrator.unprobed == 3 and orchestrator.done == 3
+
+
+def test_auto_probe_without_ffprobe(tmp_path, make_file, no_ffprobe, probe_cache, no_cache, capsys):
+    make_file('root/a.mp4')
+    make_file('root/b.mp4')
+    manager = Manager(str(tmp_path / 'root'), auto_probe=True, use_cache=False, chdir=False)
+    assert manager.videos.len == 2 and not manager.videos.probed.len
+    assert capsys.readouterr().out.count('Warning: could not run') == 1
@@ -0,0 +1,44 @@
+import os
+
+from core.manager import Manager
+from core.probe_cache import ProbeCache, fingerprint
+
+
+def test_fingerprint_follows_the_content(tmp_path, make_file):
+    a = make_file('a.mp4', size=200_000)
+    os.rename(a, tmp_path / 'b.mp4')
+    assert fingerprint(str(tmp_path / 'b.mp4')) == fingerprint(str(tmp_path / 'b.mp4'), 200_000)
+    assert fingerprint(str(tmp_path / 'b.mp4')) != fingerprint(make_file('c.mp4', size=200_000))
+
+
+def test_saves_of_other_instances_are_merged(tmp_path):
+    path = str(tmp_path / 'probe.pkl')
+    first, second = ProbeCache(path), ProbeCache(path)
+    first.put('a', {'duration': 1.})
+    second.put('b', {'duration': 2.})
+    first.save()
+    second.save()
+
+    assert ProbeCache(path).entries == {'a': {'duration': 1.}, 'b': {'duration': 2.}}
+    assert second.entries.keys() == {'a', 'b'} and not second.dirty
+
+    # Nothing to write, the file is left as it is
+    first.save()
+    assert len(ProbeCache(path)) == 2
+
+
+def test_result_reused_after_a_move(tmp_path, make_file, fake_ffprobe, probe_cache):
+    make_file('root/a.mp4')
+    manager = Manager(str(tmp_path / 'root'), use_cache=False, chdir=False)
+    manager.probe(checkpoint_interval=None)
+    probe_cache.save()
+    assert len(ProbeCache(probe_cache.path)) == 1
+
+    # Without ffprobe, the moved file still gets its metadata
+    os.remove(fake_ffprobe)
+    f = manager.videos.filelist[0]
+    f.move(str(tmp_path / 'root' / 'b.mp4'))
+    other = Manager(str(tmp_path / 'root'), use_cache=False, chdir=False)
+    other.probe(checkpoint_interval=None)
+    g = other.videos.filelist[0]
+    assert g.name == 'b.mp4' and g.probed and g.duration == 400.5
@@ -0,0 +1,51 @@
+import datetime as dt
+
+import pytest
+
+from core.enums import Category
+from core.manager import Manager
+from core.query import Query
+
+
+@pytest.fixture
+def videos(tmp_path, make_file, no_cache):
+    for i in range(20):
+        make_file(f'{"ab"[i % 2]}/v{i:02d}.mp4', size=100 * (i + 1),
+                  mdate=dt.date(2024, 1, 1) + dt.timedelta(days=i))
+    return Manager(str(tmp_path), recursive=True, use_cache=False, chdir=False).videos
+
+
+QUERIES = [
+    dict(size=(500, 900)),
+    dict(size=(None, 300), name='v0*'),
+    dict(mdate=(dt.date(2024, 1, 5), dt.date(2024, 1, 8))),
+    dict(mdate=dt.date(2024, 1, 10), size=(1, None)),
+    dict(size=(1000, None), mdate=(None, dt.date(2024, 1, 15))),
+    dict(name='v1?.mp4'),
+    dict(size=(1, 10)),
+    dict(category=Category.IMAGE),
+]
+
+
+@pytest.mark.parametrize('kwargs', QUERIES)
+def test_planned_query_matches_a_linear_scan(videos, kwargs):
+    q = Query(**kwargs)
+    expected = [f for f in videos.filelist if q.match(f)]
+    assert sorted(f.path for f in q.run(videos).filelist) == sorted(f.path for f in expected)
+
+
+def test_folder_predicate(videos, tmp_path):
+    q = Query(folder=str(tmp_path / 'a'), size=(1, None))
+    assert len(q.run(videos)) == 10
+    assert all('/a/' in f.path for f in q.run(videos).filelist)
+
+
+def test_plan_drives_the_most_selective_index(videos):
+    name, rows = Query(size=(100, 200), mdate=(dt.date(2024, 1, 1), dt.date(2024, 1, 15))).plan(videos)
+    assert name == 'size' and len(rows) == 2
+
+    name, rows = Query(size=(100, 2000), mdate=dt.date(2024, 1, 3)).plan(videos)
+    assert name in ('mtime', 'mdate') and len(rows) == 1
+
+    assert Query(name='*.mp4').plan(videos)[0] == 'scan'
+    assert Query(category=Category.AUDIO).plan(videos) == ('category', [])
@@ -0,0 +1,95 @@
+import os
+import datetime as dt
+
+import pytest
+
+from core import records
+from core.cache import RootCache, SHARD_EXTS
+from core.enums import Category, MediaLengthType, Orientation
+from core.files import File, AudioFile, VideoFile
+
+
+def _entry(**kwargs):
+    return {
+        'path': '/media/a.mp4',
+        'name': 'a.mp4',
+        'cat': 'VIDEO',
+        'probed': True,
+        'fstat': {'st_size': 1234, 'st_mtime': dt.datetime(2024, 1, 31, 12, 30)},
+        **kwargs,
+    }
+
+
+def test_roundtrip_keeps_every_field():
+    entry = _entry(duration=12.5, width=1920, height=None, orientation='LAND',
+                   length_type='S', broken=False, fingerprint='1234-abc')
+    assert records.decode(records.encode(entry)) == entry
+
+
+def test_roundtrip_keeps_extras_and_renamed_files():
+    entry = _entry(name='renamed.mp4', probe_error='no video stream', verified=None)
+    assert records.decode(records.encode(entry)) == entry
+
+
+def test_roundtrip_full_fstat(make_file):
+    f = VideoFile(make_file('v.mp4'), cat=Category.VIDEO)
+    f.duration, f.length_type, f.orientation = 400.5, MediaLengthType.M, Orientation.PORT
+
+    g = VideoFile.from_record(f.to_record())
+    assert {**g.to_dict(), 'fstat': None} == {**f.to_dict(), 'fstat': None}
+    assert g.fstat == {k: f.fstat[k] for k in records.STAT_INTS + records.STAT_TIMES}
+    assert g.length_type is MediaLengthType.M and g.orientation is Orientation.PORT
+
+
+def test_batch_roundtrip():
+    entries = [_entry(path=f'/media/{idx}.mp4', name=f'{idx}.mp4', duration=float(idx))
+               for idx in range(10)]
+    assert records.decode_batch(records.encode_batch(entries)) == entries
+
+
+def test_version_mismatch_is_refused():
+    data = bytearray(records.encode(_entry()))
+    data[0] = records.RECORD_VERSION + 1
+    with pytest.raises(ValueError, match='Unsupported record version'):
+        records.decode(bytes(data))
+
+
+def test_loads_files_uses_the_category_type(make_file):
+    files = [AudioFile(make_file('a.mp3'), cat=Category.AUDIO),
+             File(make_file('b.bin'), cat=Category.NA)]
+    loaded = records.loads_files(records.dumps_files(files))
+    assert [type(f) for f in loaded] == [AudioFile, File]
+    assert [f.path for f in loaded] == [f.path for f in files]
+
+
+# ----------------------------------
+@pytest.fixture
+def backend():
+    yield RootCache.set_backend
+    RootCache.set_backend('records')
+
+
+def test_pickle_shard_is_read_and_replaced(tmp_path, backend):
+    root = str(tmp_path / 'root')
+    entries = {'a.mp4': _entry(path='a.mp4'), 'sub/b.mp4': _entry(path='sub/b.mp4', name='b.mp4')}
+
+    backend('pickle')
+    cache = RootCache(root)
+    cache.update(entries)
+    cache.save()
+    stems = cache._stored_stems()
+    assert all(os.path.isfile(stem + SHARD_EXTS['pickle']) for stem in stems)
+
+    backend('records')
+    cache = RootCache(root)
+    cache.load()
+    assert cache.entries == entries
+
+    cache.update(entries)
+    cache.save()
+    assert all(os.path.isfile(stem + SHARD_EXTS['records']) for stem in stems)
+    assert not any(os.path.isfile(stem + SHARD_EXTS['pickle']) for stem in stems)
+
+    cache = RootCache(root)
+    cache.load()
+    assert cache.entries == entries
@@ -0,0 +1,62 @@
+import pytest
+
+from core import registry
+from core.enums import Category, EXTENSIONS
+from core.files import VideoFile
+from core.manager import Manager
+
+
+@pytest.fixture(autouse=True)
+def restore_registry():
+    extensions, types = dict(EXTENSIONS), dict(registry.TYPES)
+    yield
+    EXTENSIONS.clear()
+    EXTENSIONS.update(extensions)
+    registry.TYPES.clear()
+    registry.TYPES.update(types)
+
+
+def test_infer_by_extension(tmp_path):
+    assert registry.infer('/x/a.MP4') is Category.VIDEO
+    assert registry.infer('/x/a.z07') is Category.ZIP
+    assert registry.infer('/x/a.webm') is Category.NA
+
+    path = tmp_path / 'noext'
+    path.write_bytes(b'\x89PNG\r\n\x1a\n' + b'\0' * 16)
+    assert registry.infer(str(path)) is Category.NA
+    assert registry.infer(str(path), sniff_extensionless=True) is Category.IMAGE
+
+
+def test_registered_extensions_are_used_when_loading(tmp_path, make_file, no_cache):
+    registry.register(Category.VIDEO, ['webm', '.FLV'])
+    make_file('a.webm')
+    make_file('b.flv')
+
+    manager = Manager(str(tmp_path), use_cache=False, chdir=False)
+    assert sorted(f.name for f in manager.videos.filelist) == ['a.webm', 'b.flv']
+    manager.add_file(make_file('c.webm'))
+    assert manager.videos.len == 3 and manager.data[Category.NA].len == 0
+
+
+def test_registered_file_type(tmp_path, make_file, no_cache):
+    class MyVideo(VideoFile):
+        pass
+
+    registry.register(Category.VIDEO, file_type=MyVideo)
+    assert registry.file_type(Category.VIDEO) is MyVideo
+    assert registry.filelist_type(Category.VIDEO)._file_type is MyVideo
+
+    make_file('a.mp4')
+    manager = Manager(str(tmp_path), use_cache=False, chdir=False)
+    assert isinstance(manager.videos.filelist[0], MyVideo)
+
+
+def test_signatures():
+    assert registry.sniff_header(b'\0\0\0\x18ftypisom') is Category.VIDEO
+    assert registry.sniff_header(b'hello') is Category.NA
+
+    registry.register_signature(b'hello', Category.TXT)
+    try:
+        assert registry.sniff_header(b'hello world') is Category.TXT
+    finally:
+        registry.SIGNATURES.pop()
@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+
+from core.cache import RootCache
+from core.server import TriageServer, TriageClient
+
+
+@pytest.fixture
+def client(tmp_path):
+    RootCache.set_backend('none')
+    server = TriageServer(str(tmp_path / 'daemon.sock'))
+
+    def _serve():
+        while not server.stopped:
+            server.handle_request()
+
+    thread = threading.Thread(target=_serve, daemon=True)
+    thread.start()
+    with TriageClient(str(tmp_path / 'daemon.sock')) as c:
+        c.server = server
+        yield c
+        c.stop()
+    thread.join()
+    server.server_close()
+    RootCache.set_backend('records')
+
+
+@pytest.fixture
+def root(tmp_path, make_file):
+    make_file('root/b.mp4', size=300)
+    make_file('root/a.mp4', size=100)
+    make_file('root/c.txt', size=200)
+    return str(tmp_path / 'root')
+
+
+def test_load_and_roots(client, root):
+    assert client.load(root) == {'ok': True, 'count': 3}
+    assert client.roots() == {'ok': True, 'roots': {root: 3}}
+
+
+def test_errors_keep_the_connection(client, root, tmp_path):
+    ret = client.load(str(tmp_path / 'missing'))
+    assert not ret['ok'] and 'FileNotFoundError' in ret['error']
+
+    ret = client.summary(root, [['by_cat', 'NOPE']])
+    assert not ret['ok'] and 'KeyError' in ret['error']
+
+    ret = client.request('frobnicate')
+    assert not ret['ok'] and 'Unknown operation' in ret['error']
+
+    assert client.request('ping') == {'ok': True}
+
+
+def test_filters_and_sort(client, root):
+    ret = client.details(root, [['by_cat', 'VIDEO']], sort='size', color=False)
+    assert ret['ok'] and ret['count'] == 2
+    lines = ret['output'].splitlines()
+    assert lines[2].startswith('a.mp4') and lines[3].startswith('b.mp4')
+
+
+def test_sort_does_not_reorder_the_resident_lists(client, root):
+    client.load(root)
+    videos = client.server.managers[root].videos
+    before = [f.name for f in videos.filelist]
+
+    client.details(root, [['by_cat', 'VIDEO']], sort='size')
+    client.details(root, [], sort='name')
+    assert [f.name for f in videos.filelist] == before
+
+
+def test_organize_is_a_dry_run(client, root, tmp_path):
+    ret = client.organize(root)
+    assert ret['ok'] and 'Will move' in ret['output']
+    assert sorted(p.name for p in (tmp_path / 'root').iterdir()) == ['a.mp4', 'b.mp4', 'c.txt']
+
+
+def test_recursive_defaults_to_the_daemon(client, tmp_path, make_file):
+    make_file('deep/sub/x.mp4')
+    client.server.recursive = True
+    assert client.load(str(tmp_path / 'deep'))['count'] == 1
+    assert client.load(str(tmp_path / 'deep'), recursive=False, reload=True)['count'] == 0
@@ -0,0 +1,41 @@
+from core.enums import Category
+from core.manager import Manager
+from core.sniff import read_header, sniff_files
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\0' * 32
+MP4 = b'\0\0\0\x18ftypisom' + b'\0' * 32
+
+
+def test_sniff_files_keeps_the_order(tmp_path):
+    paths = []
+    for i, data in enumerate([PNG, b'plain text', MP4, b'']):
+        path = tmp_path / f'f{i}'
+        path.write_bytes(data)
+        paths.append(str(path))
+    paths.append(str(tmp_path / 'missing'))
+
+    assert [cat for _, cat in sniff_files(paths, workers=2)] == [
+        Category.IMAGE, Category.NA, Category.VIDEO, Category.NA, Category.NA]
+    assert read_header(str(tmp_path / 'missing'), 8) == b''
+
+
+def test_unknown_files_are_rehomed(tmp_path, no_cache):
+    (tmp_path / 'photo').write_bytes(PNG)
+    (tmp_path / 'clip.bin').write_bytes(MP4)
+    (tmp_path / 'notes').write_bytes(b'plain text')
+
+    manager = Manager(str(tmp_path), use_cache=False, chdir=False, sniff_extensionless=True)
+    assert [f.name for f in manager.images.filelist] == ['photo']
+    assert sorted(f.name for f in manager.data[Category.NA].filelist) == ['clip.bin', 'notes']
+
+    manager.sniff_unknown()
+    assert [f.name for f in manager.videos.filelist] == ['clip.bin']
+    assert [f.name for f in manager.data[Category.NA].filelist] == ['notes']
+    assert manager.videos.filelist[0].cat is Category.VIDEO
+    assert manager.data[Category.NA].by_size(0).len == 1
+
+
+def test_sniffing_is_off_by_default(tmp_path, no_cache):
+    (tmp_path / 'photo').write_bytes(PNG)
+    manager = Manager(str(tmp_path), use_cache=False, chdir=False)
+    assert manager.images.len == 0 and manager.data[Category.NA].len == 1
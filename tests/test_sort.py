@@ -0,0 +1,50 @@
+import datetime as dt
+
+from core.enums import SortAttr
+from core.files import File
+from core.filelists import FileList
+
+
+def _file(name, size, mtime=dt.datetime(2024, 1, 31)):
+    return File(f'/media/{name}', preassigned_attrs={
+        'name': name, 'fstat': {'st_size': size, 'st_mtime': mtime}})
+
+
+def _names(fl):
+    return [f.name for f in fl.filelist]
+
+
+def _filelist():
+    return FileList(filelist=[_file('c', 1), _file('z', 2), _file('a', 1), _file('y', 2), _file('b', 1)])
+
+
+def test_chained_sorts_are_stable():
+    fl = _filelist()
+    fl.sort(SortAttr.NAME)
+    fl.sort(SortAttr.SIZE)
+    assert _names(fl) == ['a', 'b', 'c', 'y', 'z']
+
+    fl.sort(SortAttr.NAME, reverse=True)
+    fl.sort(SortAttr.SIZE)
+    assert _names(fl) == ['c', 'b', 'a', 'z', 'y']
+
+
+def test_reverse_keeps_ties_in_current_order():
+    fl = _filelist()
+    fl.sort(SortAttr.NAME)
+    fl.sort(SortAttr.SIZE, reverse=True)
+    assert _names(fl) == ['y', 'z', 'a', 'b', 'c']
+
+
+def test_multi_key_with_reverse_per_key():
+    fl = _filelist()
+    fl.sort(SortAttr.SIZE, SortAttr.NAME, reverse=[True, False])
+    assert _names(fl) == ['y', 'z', 'a', 'b', 'c']
+
+
+def test_sort_after_adding_files():
+    fl = _filelist()
+    fl.sort(SortAttr.SIZE)
+    fl.add_file(_file('x', 0))
+    fl.sort(SortAttr.SIZE, SortAttr.NAME)
+    assert _names(fl) == ['x', 'a', 'b', 'c', 'y', 'z']
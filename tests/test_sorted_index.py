@@ -0,0 +1,62 @@
+import datetime as dt
+import os
+from operator import itemgetter
+
+from core.manager import Manager
+from core.sorted_index import SortedIndex
+
+
+def test_range_count_top_bottom():
+    index = SortedIndex(itemgetter(0))
+    rows = [(k, str(k)) for k in (5, 3, None, 9, 1, 7, 3)]
+    for row in rows:
+        index.add(row)
+
+    assert len(index) == 6
+    assert [k for k, _ in index.range(3, 7)] == [3, 3, 5, 7]
+    assert index.count(3, 7) == 4
+    assert index.count(10) == 0 and index.range(None, 0) == []
+    assert [k for k, _ in index.top(2)] == [9, 7]
+    assert [k for k, _ in index.bottom(2)] == [1, 3]
+    assert index.top(0) == [] and len(index.top(100)) == 6
+
+
+def test_buffered_adds_are_merged():
+    index = SortedIndex(lambda x: x)
+    for k in range(100, 0, -1):
+        index.add(k)
+    assert index.range() == list(range(1, 101))
+
+    # A few more go through insort, many more through the merge
+    for k in (0, 50, 200):
+        index.add(k)
+    for k in range(300, 250, -1):
+        index.add(k)
+    keys = index.range()
+    assert keys == sorted(keys) and len(keys) == 153
+
+
+def test_filelist_indexes_follow_adds_and_moves(tmp_path, make_file, no_cache):
+    for i in range(5):
+        make_file(f'v{i}.mp4', size=1000 * (i + 1), mdate=dt.date(2024, 1, 1 + i))
+    videos = Manager(str(tmp_path), use_cache=False, chdir=False).videos
+
+    assert [f.size for f in videos.by_size(2000, 4000).filelist] == [2000, 3000, 4000]
+    assert videos.largest(1).filelist[0].size == 5000
+
+    videos.add_file(make_file('big.mp4', size=9000, mdate=dt.date(2023, 6, 1)))
+    assert videos.largest(1).filelist[0].name == 'big.mp4'
+    assert videos.by_mtime(None, dt.datetime(2023, 12, 31)).filelist[0].name == 'big.mp4'
+
+    # A move keeps size and mtime, the indexed file reports its new path
+    (tmp_path / 'sub').mkdir()
+    f = videos.smallest(1).filelist[0]
+    videos._move_file(f, str(tmp_path / 'sub' / 'small.mp4'))
+    assert videos.smallest(1).filelist[0].path == str(tmp_path / 'sub' / 'small.mp4')
+    assert os.path.isfile(tmp_path / 'sub' / 'small.mp4')
+
+    # Dropped files leave the indexes on the rebuild
+    videos.filelist = [f for f in videos.filelist if f.size != 9000]
+    videos._reindex()
+    assert videos.largest(1).filelist[0].size == 5000
+    assert videos.by_size(6000).filelist == []
@@ -0,0 +1,48 @@
+import pytest
+
+from core import thumbnails
+from core.filelists import FileList
+from core.manager import Manager
+from core.thumbnails import ThumbnailCache
+
+
+@pytest.fixture
+def manager(tmp_path, make_file, no_cache, monkeypatch):
+    make_file('root/a.mp3')
+    make_file('root/b.mp4')
+    opened = []
+    monkeypatch.setattr(FileList, '_popen', classmethod(lambda cls, cmd: opened.append(cmd)))
+    manager = Manager(str(tmp_path / 'root'), use_cache=False, chdir=False)
+    manager.opened = opened
+    return manager
+
+
+@pytest.fixture
+def renders(tmp_path, monkeypatch):
+    cache = ThumbnailCache(str(tmp_path / 'thumbs'))
+    monkeypatch.setattr(ThumbnailCache, '_shared', cache)
+
+    args = []
+    def run(cmd, **kwargs):
+        args.append(cmd)
+        with open(cmd[-1], 'wb') as f:
+            f.write(b'jpg')
+    monkeypatch.setattr(thumbnails.sp, 'run', run)
+    return args
+
+
+def test_no_thumbnails_of_audio_files(manager, renders):
+    with pytest.raises(ValueError):
+        manager.audios.open(thumbnails=True)
+    with pytest.raises(ValueError):
+        manager.audios.open(contact_sheet=True)
+
+    assert ThumbnailCache.shared().get(manager.audios.filelist[0]) is None
+    assert renders == [] and manager.opened == []
+
+
+def test_video_thumbnails_are_rendered_once(manager, renders):
+    manager.videos.open(thumbnails=True)
+    manager.videos.open(thumbnails=True)
+    assert len(renders) == 1 and renders[0][0] == 'ffmpeg'
+    assert len(manager.opened) == 2 and manager.opened[0][0] == 'feh'
@@ -0,0 +1,60 @@
+from collections import Counter
+from random import Random
+
+import pytest
+
+from core.enums import SortAttr
+from core.manager import Manager
+from core.utils import reservoir_sample
+
+
+@pytest.fixture
+def manager(tmp_path, make_file, no_cache):
+    for i in range(6):
+        make_file(f'v{i}.mp4', size=100 * (i + 1))
+    make_file('a.mp3', size=2000)
+    make_file('d.txt', size=50)
+    manager = Manager(str(tmp_path), use_cache=False, chdir=False)
+
+    # Only some of the videos are probed
+    for i, f in enumerate(sorted(manager.videos.filelist, key=lambda f: f.name)[:3]):
+        f.width, f.height, f.probed = 100 * (3 - i), 100, True
+    return manager
+
+
+def _names(fl):
+    return [f.name for f in fl.filelist]
+
+
+def test_top_by_index_and_by_heap(manager):
+    assert _names(manager.videos.top(2)) == ['v5.mp4', 'v4.mp4']
+    assert _names(manager.videos.top(2, reverse=False)) == ['v0.mp4', 'v1.mp4']
+
+    # The files missing the attribute are left out, at either end
+    assert _names(manager.videos.top(5, SortAttr.WIDTH)) == ['v0.mp4', 'v1.mp4', 'v2.mp4']
+    assert _names(manager.videos.top(1, SortAttr.WIDTH, reverse=False)) == ['v2.mp4']
+    assert _names(manager.videos.top(5, SortAttr.NAME)) == ['v5.mp4', 'v4.mp4', 'v3.mp4', 'v2.mp4', 'v1.mp4']
+
+
+def test_top_across_categories(manager):
+    assert _names(manager.top(3)) == ['a.mp3', 'v5.mp4', 'v4.mp4']
+    assert _names(manager.top(2, reverse=False)) == ['d.txt', 'v0.mp4']
+
+
+def test_sample(manager):
+    fl = manager.videos
+    picked = fl.sample(3, seed=1)
+    assert len(picked) == 3 and len(set(_names(picked))) == 3
+    assert _names(picked) == _names(fl.sample(3, seed=1))
+    assert sorted(_names(fl.sample(10))) == sorted(_names(fl))
+
+    assert len(manager.sample(5, seed=2)) == 5
+    assert len(manager.sample(100)) == 8
+
+
+def test_reservoir_sample_is_uniform():
+    counts = Counter()
+    for seed in range(2000):
+        counts.update(reservoir_sample(iter(range(10)), 2, Random(seed)))
+    # Each item is picked 400 times on average
+    assert all(300 < counts[i] < 500 for i in range(10))
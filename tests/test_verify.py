@@ -0,0 +1,26 @@
+from core.enums import Category
+from core.files import AudioFile
+from core.filelists.audio_filelist import AudioFileList
+
+
+def test_missing_decoder_records_nothing(tmp_path, make_file, monkeypatch):
+    monkeypatch.setenv('PATH', str(tmp_path / 'nowhere'))
+    fl = AudioFileList(filelist=[AudioFile(make_file('a.mp3'), cat=Category.AUDIO)], root=str(tmp_path))
+
+    assert fl.verify() == 0
+    f = fl.filelist[0]
+    assert (f.broken, f.verified, f.verify_error) == (False, None, None)
+    assert not fl.broken_list
+
+
+def test_clean_decode_clears_the_verify_flag_only(make_file):
+    f = AudioFile(make_file('a.mp3'), cat=Category.AUDIO)
+    f._apply_verify_result('fp', 'Invalid data')
+    assert f.broken
+
+    f._apply_verify_result('fp', None)
+    assert not f.broken and f.verify_error is None
+
+    f.probe_error = 'no audio stream'
+    f._apply_verify_result('fp', None)
+    assert f.broken